@@ -0,0 +1,63 @@
+# benchmarks/bench_canopy.py
+"""
+Compare a full recompute of the canopy shading map with the incremental update
+of the columns that changed, at several churn rates.
+
+Run with: python -m benchmarks.bench_canopy
+"""
+
+import time
+
+import numpy as np
+
+from benchmarks.population import seed_organisms
+from src.cells.cell_type import CellType
+from src.core.canopy import CanopyMap
+from src.core.world import World
+
+ORGANISMS = 50_000
+TICKS = 50
+# Cells born or dying per tick
+CHURN = (10, 100, 1_000, 10_000)
+
+
+def main() -> None:
+    world = World(seed=0)
+    seed_organisms(world, ORGANISMS)
+    canopy = CanopyMap(world)
+    grid = world.grid
+    cells = world.cells.alive_indices()
+    rng = np.random.default_rng(0)
+
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        canopy.recompute()
+    full = (time.perf_counter() - start) / TICKS
+
+    print(f"{len(cells)} cells on a {world.width}x{world.height} grid, per tick:")
+    print(f"  full recompute      {full * 1e3:8.3f} ms")
+    print(f"  {'churn':>8} {'columns':>8} {'incremental':>12} {'speedup':>8}")
+    for churn in CHURN:
+        elapsed = 0.0
+        columns = 0
+        for _ in range(TICKS):
+            # Toggle cells between present and gone, like deaths and rebirths
+            changed = rng.choice(cells, churn, replace=False)
+            xs, ys = world.cells.x[changed], world.cells.y[changed]
+            present = grid.cell_type[ys, xs] != CellType.EMPTY
+            grid.cell_type[ys, xs] = np.where(
+                present, CellType.EMPTY, world.cells.type_code[changed]
+            )
+            canopy.mark_dirty(xs)
+            start = time.perf_counter()
+            columns += canopy.update()
+            elapsed += time.perf_counter() - start
+        elapsed /= TICKS
+        print(
+            f"  {churn:>8} {columns // TICKS:>8} {elapsed * 1e3:10.3f}ms "
+            f"{full / elapsed:7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/bench_checkpoint.py
+"""
+Measure checkpoints: the time to save a world and the size of the file, the
+time to restore it memory-mapped against reading it, and the time the tick
+loop stalls for a periodic checkpoint written in the background.
+
+Run with: python -m benchmarks.bench_checkpoint
+"""
+
+import os
+import tempfile
+import time
+
+from benchmarks.population import seed_organisms
+from src.core.world import World
+from src.simulation.checkpoint import load_checkpoint, save_checkpoint
+from src.simulation.event import EventQueue
+from src.simulation.scheduler import Scheduler
+
+# (width, height, organisms) of the worlds saved
+WORLDS = ((1800, 1400, 50_000), (8000, 8000, 50_000))
+# Ticks run with periodic checkpoints, and the interval between them
+TICKS = 40
+INTERVAL = 5
+
+
+def timed(action) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = action()
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "world.ckpt")
+    print(
+        f"{'world':>11} {'cells':>7} {'size':>9} {'save':>10} "
+        f"{'load mmap':>10} {'load read':>10}"
+    )
+    for width, height, organisms in WORLDS:
+        world = World(width=width, height=height, seed=0)
+        seed_organisms(world, organisms, genomes=True)
+        save, size = timed(lambda: save_checkpoint(path, world))
+        mapped, _ = timed(lambda: load_checkpoint(path, mmap=True))
+        read, _ = timed(lambda: load_checkpoint(path, mmap=False))
+        print(
+            f"{width:>5}x{height:<5} {len(world.cells):>7} {size / 1e6:7.1f}MB "
+            f"{save * 1e3:8.1f}ms {mapped * 1e3:8.1f}ms {read * 1e3:8.1f}ms"
+        )
+        del world
+    os.remove(path)
+
+    world = World(seed=0)
+    seed_organisms(world, WORLDS[0][2], genomes=True)
+    plain, _ = timed(lambda: Scheduler(world, events=EventQueue()).run(TICKS))
+    world = World(seed=0)
+    seed_organisms(world, WORLDS[0][2], genomes=True)
+    scheduler = Scheduler(world, events=EventQueue())
+    checkpointer = scheduler.enable_checkpoints(directory, interval=INTERVAL)
+    checkpointing, _ = timed(lambda: scheduler.run(TICKS))
+    scheduler.disable_checkpoints()
+    taken = TICKS // INTERVAL - checkpointer.skipped
+    print(f"{TICKS} ticks, a checkpoint every {INTERVAL}:")
+    print(f"  without checkpoints     {plain * 1e3:8.1f} ms")
+    print(f"  with checkpoints        {checkpointing * 1e3:8.1f} ms")
+    print(
+        f"  {taken} written, {checkpointer.skipped} skipped, "
+        f"{checkpointer.stall / max(taken, 1) * 1e3:.1f} ms stall each"
+    )
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    main()
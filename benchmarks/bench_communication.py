@@ -0,0 +1,67 @@
+# benchmarks/bench_communication.py
+"""
+Measure a tick of the AntennaNetwork with every antenna broadcasting, and check
+the links it finds against a naive pairwise scan on the smallest population.
+
+Run with: python -m benchmarks.bench_communication
+"""
+
+import time
+
+import numpy as np
+
+from benchmarks.population import seed_organisms
+from src.cells.cell_type import AntennaMode, CellType
+from src.core.world import World
+from src.dynamics.communication import AntennaNetwork
+from src.dynamics.transport import TransportEngine
+
+# Organisms seeded; each has two antennas
+ORGANISMS = (6_250, 12_500, 25_000, 50_000)
+TICKS = 20
+
+
+def naive_links(network: AntennaNetwork, antennas: np.ndarray) -> int:
+    store = network.world.cells
+    xs = store.x[antennas].astype(np.int64)
+    ys = store.y[antennas].astype(np.int64)
+    bands = (store.frequency[antennas] / network.band_width).astype(np.int64)
+    links = 0
+    for position in range(len(antennas)):
+        distance = (xs - xs[position]) ** 2 + (ys - ys[position]) ** 2
+        heard = (distance <= network.broadcast_range**2) & (bands == bands[position])
+        links += int(heard.sum()) - 1
+    return links
+
+
+def main() -> None:
+    print(
+        f"{'antennas':>9} {'links':>8} {'delivered':>10} {'step':>10} {'per antenna':>12}"
+    )
+    for organisms in ORGANISMS:
+        world = World(seed=0)
+        seed_organisms(world, organisms)
+        store = world.cells
+        store.state[store.alive_indices(CellType.ANTENNA)] = (
+            AntennaMode.COMMUNICATION_HANDLER
+        )
+        network = AntennaNetwork(world, TransportEngine(store))
+        antennas = network.broadcasters()
+        links = len(network.find_links(antennas)[0])
+        if organisms == ORGANISMS[0]:
+            assert links == naive_links(network, antennas)
+
+        times = []
+        for tick in range(TICKS):
+            start = time.perf_counter()
+            report = network.step(tick)
+            times.append(time.perf_counter() - start)
+        step = float(np.median(times))
+        print(
+            f"{len(antennas):>9} {links:>8} {report['delivered']:>10} "
+            f"{step * 1e3:8.3f}ms {step / len(antennas) * 1e9:10.0f}ns"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/bench_energy.py
+"""
+Compare the EnergyManager's single pass over its registered sources with
+separate calls of the producer kernels, check that both deliver the same
+energy, and print the per-source totals.
+
+Run with: python -m benchmarks.bench_energy
+"""
+
+import time
+
+import numpy as np
+
+from benchmarks.population import seed_organisms
+from src.cells.kernels import antenna_tick, leaf_tick, root_tick
+from src.core.canopy import CanopyMap
+from src.core.fields import EnvironmentFields
+from src.core.world import World
+from src.dynamics.energy import EnergyManager
+
+ORGANISMS = 20_000
+TICKS = 50
+
+
+def build() -> tuple[World, EnvironmentFields, CanopyMap]:
+    world = World(seed=0)
+    seed_organisms(world, ORGANISMS)
+    world.update_environment()
+    world.distribute_sunlight()
+    fields = EnvironmentFields(world)
+    fields.advance(1)
+    return world, fields, CanopyMap(world)
+
+
+def main() -> None:
+    world, fields, canopy = build()
+    cells = world.cells
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        leaf_tick(cells, fields.layer("light"), canopy.layer)
+        root_tick(cells, fields.layer("organic_matter"))
+        antenna_tick(cells)
+    separate = (time.perf_counter() - start) / TICKS
+    expected = cells.energy[: cells.size].copy()
+
+    world, fields, canopy = build()
+    manager = EnergyManager(world, fields, canopy)
+    start = time.perf_counter()
+    for tick in range(TICKS):
+        manager.update_energy_distribution(tick)
+    single = (time.perf_counter() - start) / TICKS
+    cells = world.cells
+
+    print(f"{len(cells)} cells, production per tick:")
+    print(f"  separate kernels {separate * 1e3:8.3f} ms")
+    print(f"  EnergyManager    {single * 1e3:8.3f} ms")
+    same = np.array_equal(expected, cells.energy[: cells.size])
+    print(f"  same energy      {same}")
+    print("energy per tick by source:")
+    for name, amount in manager.report()["per_tick"].items():
+        print(f"  {name:<16} {amount:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# benchmarks/bench_fields.py
+"""
+Measure the per-tick cost of the per-pixel environment fields for several
+resolutions, update intervals and diffusion solvers, and compare the bulk field
+gather of the leaf kernel with per-cell sampling.
+
+Run with: python -m benchmarks.bench_fields
+"""
+
+import time
+
+import numpy as np
+
+from benchmarks.population import seed_organisms
+from src.core.fields import EnvironmentFields
+from src.core.world import World
+
+TICKS = 40
+SETTINGS = (
+    # (resolution, interval, solver)
+    (1, 1, "stencil"),
+    (1, 1, "fft"),
+    (1, 10, "stencil"),
+    (1, 10, "fft"),
+    (4, 1, "stencil"),
+    (4, 10, "stencil"),
+    (4, 10, "fft"),
+)
+ORGANISMS = 50_000
+
+
+def time_fields(resolution: int, interval: int, solver: str) -> tuple[float, float]:
+    world = World(seed=0)
+    fields = EnvironmentFields(world, resolution, interval, solver)
+    organic_matter = fields.layer("organic_matter")
+    organic_matter[world.height // 2, world.width // 2] += 1e4
+    total = organic_matter.sum(dtype=np.float64)
+    start = time.perf_counter()
+    for tick in range(TICKS):
+        fields.update(tick)
+    elapsed = (time.perf_counter() - start) / TICKS
+    drift = abs(organic_matter.sum(dtype=np.float64) - total) / total
+    return elapsed, drift
+
+
+def main() -> None:
+    world = World(seed=0)
+    print(f"fields on a {world.width}x{world.height} grid, per tick:")
+    print(
+        f"  {'resolution':>10} {'interval':>8} {'solver':>8} {'time':>10} {'drift':>9}"
+    )
+    for resolution, interval, solver in SETTINGS:
+        elapsed, drift = time_fields(resolution, interval, solver)
+        print(
+            f"  {resolution:>10} {interval:>8} {solver:>8} "
+            f"{elapsed * 1e3:8.2f}ms {drift:9.1e}"
+        )
+
+    seed_organisms(world, ORGANISMS)
+    fields = EnvironmentFields(world)
+    fields.advance(1)
+    store = world.cells
+    cells = store.alive_indices()
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        fields.gather_many(("light", "organic_matter"), store.x[cells], store.y[cells])
+    bulk = (time.perf_counter() - start) / TICKS
+    light, organic_matter = fields.layer("light"), fields.layer("organic_matter")
+    xs, ys = store.x[cells].tolist(), store.y[cells].tolist()
+    start = time.perf_counter()
+    for x, y in zip(xs, ys):
+        float(light[y, x]), float(organic_matter[y, x])
+    single = time.perf_counter() - start
+    print(f"sampling light and organic matter for {len(cells)} cells:")
+    print(f"  per cell   {single * 1e3:10.2f} ms")
+    print(f"  gather     {bulk * 1e3:10.2f} ms")
+    print(f"  speedup    {single / bulk:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
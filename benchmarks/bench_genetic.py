@@ -0,0 +1,65 @@
+# benchmarks/bench_genetic.py
+"""
+Benchmark batch mutation in the GenomePool against the per-object BaseCell.mutate
+loop, and report the memory saved by deduplicating a clonal population.
+
+Run with: python -m benchmarks.bench_genetic
+"""
+
+import time
+
+import numpy as np
+
+from src.cells.leaf_cell import LeafCell
+from src.dynamics.genetic import GENOME_LENGTH, GenomePool
+from src.utils.rng import RandomService
+
+POPULATION = 100_000
+FOUNDERS = 100
+TICKS = 20
+
+
+def main() -> None:
+    service = RandomService(0)
+    founders = service.stream("founders").integers(
+        0, 256, size=(FOUNDERS, GENOME_LENGTH), dtype=np.uint8
+    )
+
+    # Per-object baseline: every reproducing cell mutates its own list
+    cells = []
+    for i in range(POPULATION):
+        cell = LeafCell((0, 0), 0.0)
+        cell.genome = founders[i % FOUNDERS].tolist()
+        cells.append(cell)
+    rng = service.stream("mutation", 0)
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        for cell in cells:
+            cell.mutate(rng)
+    object_time = (time.perf_counter() - start) / TICKS
+
+    pool = GenomePool()
+    handles = pool.intern_many(founders[np.arange(POPULATION) % FOUNDERS])
+    print(f"{POPULATION} genomes from {FOUNDERS} founders:")
+    print(f"  pool rows  {len(pool):>10}")
+    print(f"  pool bytes {pool.nbytes:>10}")
+    print(f"  list bytes {POPULATION * (56 + 8 * GENOME_LENGTH):>10} (approx.)")
+
+    rng = service.stream("mutation", 1)
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        offspring = pool.mutate_many(handles, rng=rng)
+        pool.release(handles)
+        handles = offspring
+    pool_time = (time.perf_counter() - start) / TICKS
+
+    print(f"mutation of {POPULATION} genomes, per tick:")
+    print(f"  per-object {object_time * 1e3:10.2f} ms")
+    print(f"  pool       {pool_time * 1e3:10.2f} ms")
+    print(f"  speedup    {object_time / pool_time:10.1f}x")
+    print(f"  pool rows after {TICKS} generations: {len(pool)}")
+    assert pool.references == POPULATION
+
+
+if __name__ == "__main__":
+    main()
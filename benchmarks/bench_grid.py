@@ -0,0 +1,52 @@
+# benchmarks/bench_grid.py
+"""
+Compare construction time and memory of the legacy nested-list grid with the
+array-backed Grid.
+
+Run with: python -m benchmarks.bench_grid
+"""
+
+import time
+import tracemalloc
+
+from src.core.grid import Grid
+
+SIZES = [(1800, 1400), (4000, 4000)]
+
+
+def nested_list_grid(width: int, height: int) -> list:
+    return [[None for _ in range(width)] for _ in range(height)]
+
+
+def measure(factory, width: int, height: int) -> tuple[float, int]:
+    """
+    Build one grid and return (seconds, peak traced bytes).
+
+    Timing and memory are measured in separate builds because tracemalloc slows
+    down the many small allocations of the nested list considerably.
+    """
+    start = time.perf_counter()
+    grid = factory(width, height)
+    elapsed = time.perf_counter() - start
+    del grid
+
+    tracemalloc.start()
+    grid = factory(width, height)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del grid
+    return elapsed, peak
+
+
+def main() -> None:
+    print(f"{'size':>11} {'impl':>12} {'time (s)':>10} {'memory (MB)':>12}")
+    for width, height in SIZES:
+        for name, factory in (("nested list", nested_list_grid), ("Grid", Grid)):
+            elapsed, peak = measure(factory, width, height)
+            print(
+                f"{width:>5}x{height:<5} {name:>12} {elapsed:>10.3f} {peak / 2**20:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/bench_interaction.py
+"""
+Measure how the interaction phase scales with the population and the number
+of contacts, against a naive pairwise adjacency test on small populations.
+
+Run with: python -m benchmarks.bench_interaction
+"""
+
+import time
+
+import numpy as np
+
+from benchmarks.population import seed_organisms
+from src.cells.cell_type import CellType
+from src.core.world import World
+from src.dynamics.interaction import InteractionEngine, organism_of
+from src.dynamics.transport import TransportEngine
+
+POPULATIONS = (500, 2_000, 8_000, 32_000)
+NAIVE_LIMIT = 20_000
+TICKS = 10
+
+
+def naive_contacts(world: World, transport: TransportEngine) -> int:
+    # Compare every pair of cells, as a per-object implementation would
+    store = world.cells
+    cells = store.alive_indices()
+    xs = store.x[cells].astype(np.int64)
+    ys = store.y[cells].astype(np.int64)
+    owners = organism_of(store, transport, cells)
+    count = 0
+    for i in range(len(cells)):
+        adjacent = np.abs(xs[i + 1 :] - xs[i]) + np.abs(ys[i + 1 :] - ys[i]) == 1
+        count += int((adjacent & (owners[i + 1 :] != owners[i])).sum())
+    return count
+
+
+def main() -> None:
+    print(f"  {'cells':>8} {'contacts':>9} {'step':>10} {'per cell':>9} {'naive':>10}")
+    for organisms in POPULATIONS:
+        world = World(seed=0)
+        seed_organisms(world, organisms)
+        # Grow a leaf above every brain, as the brain phase does; it touches the
+        # organism above, if any
+        store = world.cells
+        for brain in store.alive_indices(CellType.BRAIN).tolist():
+            x, y = int(store.x[brain]), int(store.y[brain]) - 1
+            if y >= 0:
+                world.add_cell(CellType.LEAF, (x, y), 0.0, brain)
+        transport = TransportEngine(world.cells)
+        engine = InteractionEngine(world, transport)
+        contacts = len(engine.find_contacts()[0])
+        start = time.perf_counter()
+        for tick in range(TICKS):
+            engine.step(tick)
+        elapsed = (time.perf_counter() - start) / TICKS
+        cells = len(world.cells)
+
+        naive = "-"
+        if cells <= NAIVE_LIMIT:
+            start = time.perf_counter()
+            assert naive_contacts(world, transport) == contacts
+            naive = f"{(time.perf_counter() - start) * 1e3:8.1f}ms"
+        print(
+            f"  {cells:>8} {contacts:>9} {elapsed * 1e3:8.3f}ms "
+            f"{elapsed / cells * 1e9:7.0f}ns {naive:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
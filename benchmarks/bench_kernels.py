@@ -0,0 +1,101 @@
+# benchmarks/bench_kernels.py
+"""
+Compare the per-object producer actions with the batched kernels and check
+that both deliver the same energy on a fixed seed.
+
+Run with: python -m benchmarks.bench_kernels
+"""
+
+import random
+import time
+
+import numpy as np
+
+from src.cells.antenna_cell import AntennaCell
+from src.cells.cell_store import CellStore, NO_CONNECTION
+from src.cells.cell_type import CellType
+from src.cells.conduit_cell import ConduitCell
+from src.cells.kernels import antenna_tick, leaf_tick, root_tick
+from src.cells.leaf_cell import LeafCell
+from src.cells.root_cell import RootCell
+
+SEED = 1234
+NUM_CONDUITS = 1_000
+NUM_PRODUCERS = 100_000
+TICKS = 10
+
+
+def build(seed: int):
+    """
+    Build the same random population as objects and in a CellStore.
+    """
+    random.seed(seed)
+    store = CellStore()
+    conduits = []
+    for i in range(NUM_CONDUITS):
+        conduits.append(ConduitCell((i, 0), 0.0))
+        store.add(CellType.CONDUIT, (i, 0), 0.0)
+
+    producers = []
+    kinds = ((CellType.LEAF, LeafCell), (CellType.ROOT, RootCell))
+    kinds += ((CellType.ANTENNA, AntennaCell),)
+    for i in range(NUM_PRODUCERS):
+        code, cls = random.choice(kinds)
+        position = (i % 1800, 1 + i // 1800)
+        cell = cls(position, 0.0)
+        target = random.randrange(NUM_CONDUITS)
+        # Leave about 1% of cells unconnected
+        if random.random() < 0.99:
+            cell.connected_conduit = conduits[target]
+        else:
+            target = NO_CONNECTION
+        producers.append(cell)
+        store.add(code, position, 0.0, target)
+    return conduits, producers, store
+
+
+# Kernel order used by run_batched
+TYPE_ORDER = {LeafCell: 0, RootCell: 1, AntennaCell: 2}
+
+
+def run_objects(producers, ticks: int) -> float:
+    # Group by type so the order of additions matches the batched kernels
+    ordered = sorted(producers, key=lambda cell: TYPE_ORDER[type(cell)])
+    start = time.perf_counter()
+    for _ in range(ticks):
+        for cell in ordered:
+            cell.perform_action()
+    return time.perf_counter() - start
+
+
+def run_batched(store: CellStore, ticks: int) -> float:
+    start = time.perf_counter()
+    for _ in range(ticks):
+        leaf_tick(store)
+        root_tick(store)
+        antenna_tick(store)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    conduits, producers, store = build(SEED)
+
+    object_time = run_objects(producers, TICKS)
+    batched_time = run_batched(store, TICKS)
+
+    object_conduits = np.array([c.energy for c in conduits])
+    object_total = object_conduits.sum() + sum(c.energy for c in producers)
+    batched_total = store.energy[: store.size].sum()
+    print(f"producers: {NUM_PRODUCERS}, ticks: {TICKS}")
+    print(f"per-object: {object_time:.3f} s, batched: {batched_time:.3f} s")
+    print(f"speedup: {object_time / batched_time:.1f}x")
+    print(f"energy total per-object: {object_total:.6f}")
+    print(f"energy total batched:    {batched_total:.6f}")
+    print(
+        "conduit energies identical:",
+        np.array_equal(object_conduits, store.energy[:NUM_CONDUITS]),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# benchmarks/bench_ledger.py
+"""
+Measure the cost of the energy ledger on the Scheduler, disabled and enabled,
+and print the leaks it finds.
+
+Run with: python -m benchmarks.bench_ledger
+"""
+
+import time
+
+from benchmarks.population import seed_organisms
+from src.core.world import World
+from src.simulation.scheduler import Scheduler
+
+ORGANISMS = 20_000
+TICKS = 50
+# Ledger checks made by a tick with the default phases: two per phase, two per
+# tick, one per energy source, transport and interaction step, two for the
+# brains and two per death and birth batch
+CHECKS_PER_TICK = 2 * 7 + 2 + 3 + 1 + 1 + 2 + 2 + 2
+
+
+def run(ledger: bool) -> tuple[float, Scheduler]:
+    world = World(seed=0)
+    seed_organisms(world, ORGANISMS)
+    scheduler = Scheduler(world)
+    if ledger:
+        scheduler.enable_ledger()
+    scheduler.run(TICKS)
+    return scheduler.elapsed / TICKS, scheduler
+
+
+def main() -> None:
+    disabled, _ = run(False)
+    enabled, scheduler = run(True)
+    report = scheduler.ledger.report()
+
+    scheduler.disable_ledger()
+    start = time.perf_counter()
+    for _ in range(100_000):
+        for _ in range(CHECKS_PER_TICK):
+            if scheduler.ledger is not None:
+                pass
+    checks = (time.perf_counter() - start) / 100_000
+
+    print(f"{len(scheduler.world.cells)} cells, {TICKS} ticks, per tick:")
+    print(f"  ledger disabled  {disabled * 1e3:10.3f} ms")
+    print(f"  ledger enabled   {enabled * 1e3:10.3f} ms")
+    print(
+        f"  disabled checks  {checks * 1e6:10.3f} us "
+        f"({checks / disabled:.1e} of a tick)"
+    )
+    print("leaks found, total residual by (phase, cell type):")
+    for (phase, cell_type), residual in report["leaks"].items():
+        print(f"  {phase:<14} {cell_type:<8} {residual:14.1f}")
+
+
+if __name__ == "__main__":
+    main()
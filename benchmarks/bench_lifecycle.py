@@ -0,0 +1,62 @@
+# benchmarks/bench_lifecycle.py
+"""
+Measure the production and transport phases after a mass die-off, with and
+without compacting the cell store.
+
+Run with: python -m benchmarks.bench_lifecycle
+"""
+
+import time
+
+import numpy as np
+
+from benchmarks.population import seed_organisms
+from src.cells.cell_type import CellType
+from src.core.world import World
+from src.simulation.scheduler import Scheduler
+
+ORGANISMS = 20_000
+SURVIVORS = 0.05
+TICKS = 200
+
+
+def die_off(compact: bool) -> tuple[Scheduler, float]:
+    world = World(seed=0)
+    seed_organisms(world, ORGANISMS)
+    scheduler = Scheduler(world)
+    lifecycle = scheduler.lifecycle
+    # Keep every slot until we decide below
+    lifecycle.compaction_threshold = 1.0
+    cells = world.cells
+    conduits = cells.alive_indices(CellType.CONDUIT)
+    rng = np.random.default_rng(0)
+    lifecycle.kill(conduits[rng.random(len(conduits)) > SURVIVORS])
+    lifecycle.apply(scheduler.tick)
+    # Unconnected producers die on the next tick
+    scheduler.step()
+    if compact:
+        lifecycle.compact()
+
+    times = []
+    for _ in range(TICKS):
+        start = time.perf_counter()
+        scheduler.run_production(scheduler.tick)
+        scheduler.run_transport(scheduler.tick)
+        times.append(time.perf_counter() - start)
+    return scheduler, float(np.median(times))
+
+
+def main() -> None:
+    sparse, sparse_time = die_off(compact=False)
+    dense, dense_time = die_off(compact=True)
+    cells = sparse.world.cells
+    print(f"{ORGANISMS} organisms, {SURVIVORS:.0%} of conduits survive:")
+    print(f"  living cells {len(cells)} in {cells.size} slots")
+    print(f"  after compaction {dense.world.cells.size} slots")
+    print("production + transport per tick (median):")
+    print(f"  sparse     {sparse_time * 1e3:10.3f} ms")
+    print(f"  compacted  {dense_time * 1e3:10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# benchmarks/bench_metrics.py
+"""
+Measure the cost of SimulationMetrics on the default world, as the share of
+the tick time spent sampling after each tick, and check that it stays within
+BUDGET with every metric enabled at the default intervals. Also time the
+exports.
+
+The share is an upper bound: the per-type index arrays built by a sample are
+reused by the phases of the next tick, which then run faster.
+
+Run with: python -m benchmarks.bench_metrics
+"""
+
+import os
+import tempfile
+import time
+
+from benchmarks.population import seed_organisms
+from src.core.world import World
+from src.simulation.event import EventQueue
+from src.simulation.scheduler import Scheduler
+from src.utils.metrics import DEFAULT_HISTOGRAM_INTERVAL, DEFAULT_INTERVAL
+
+ORGANISMS = 50_000
+TICKS = 200
+# Ticks run before timing, as the first ticks of a seeded world are slower
+WARMUP = 5
+# Largest share of the tick time metrics may take at the default intervals
+BUDGET = 0.02
+# (interval, histogram interval) pairs measured
+INTERVALS = ((DEFAULT_INTERVAL, DEFAULT_HISTOGRAM_INTERVAL), (1, 10), (1, 1))
+
+
+def overhead(interval: int, histogram_interval: int) -> tuple[float, float]:
+    # Time spent in after_tick and in the ticks themselves
+    world = World(seed=0)
+    seed_organisms(world, ORGANISMS, genomes=True)
+    scheduler = Scheduler(world, events=EventQueue())
+    scheduler.run(WARMUP)
+    metrics = scheduler.enable_metrics(interval, histogram_interval)
+    after_tick = metrics.after_tick
+    sampling = 0.0
+
+    def timed_after_tick(tick: int) -> None:
+        nonlocal sampling
+        start = time.perf_counter()
+        after_tick(tick)
+        sampling += time.perf_counter() - start
+
+    metrics.after_tick = timed_after_tick
+    start = time.perf_counter()
+    scheduler.run(TICKS)
+    total = time.perf_counter() - start
+    return sampling, total, metrics
+
+
+def main() -> None:
+    print(f"{TICKS} ticks of {ORGANISMS} organisms:")
+    print(
+        f"  {'interval':>8} {'histogram':>10} {'metrics':>10} {'tick':>10} {'share':>7}"
+    )
+    shares = []
+    for interval, histogram_interval in INTERVALS:
+        sampling, total, metrics = overhead(interval, histogram_interval)
+        shares.append(sampling / (total - sampling))
+        print(
+            f"  {interval:>8} {histogram_interval:>10} "
+            f"{sampling / TICKS * 1e3:8.3f}ms {(total - sampling) / TICKS * 1e3:8.1f}ms "
+            f"{shares[-1]:7.2%}"
+        )
+    assert shares[0] < BUDGET, f"metrics take {shares[0]:.2%} of the tick time"
+
+    registry = metrics.registry
+    directory = tempfile.mkdtemp()
+    for name, action in (
+        ("csv", lambda: registry.write_csv(directory)),
+        ("columnar", lambda: registry.write_columnar(f"{directory}/metrics.npz")),
+        ("prometheus", registry.prometheus_text),
+    ):
+        start = time.perf_counter()
+        action()
+        print(f"  export {name:<12} {(time.perf_counter() - start) * 1e3:8.3f} ms")
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    main()
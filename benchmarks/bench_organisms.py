@@ -0,0 +1,93 @@
+# benchmarks/bench_organisms.py
+"""
+Measure the OrganismRegistry: organism lookups against resolving them from the
+conduit forest, aggregates, and the incremental update after deaths against a
+full rebuild. Also count the ticks an organism takes to disappear after its
+brain dies, with and without the registry.
+
+Run with: python -m benchmarks.bench_organisms
+"""
+
+import time
+
+import numpy as np
+
+from benchmarks.population import seed_organisms
+from src.cells.cell_type import CellType
+from src.core.world import World
+from src.dynamics.interaction import organism_of
+from src.simulation.event import EventQueue
+from src.simulation.scheduler import Scheduler
+
+ORGANISMS = 50_000
+REPEATS = 10
+# Brains and conduits killed per batch
+KILLED = (10, 100, 1_000)
+
+
+def timed(action, repeats: int = REPEATS) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        action()
+    return (time.perf_counter() - start) / repeats
+
+
+def extinction_ticks(registry: bool) -> int:
+    # Ticks until every cell of the organisms whose brains are killed is gone
+    world = World(width=400, height=300, seed=0)
+    seed_organisms(world, 500, length=16)
+    scheduler = Scheduler(world, events=EventQueue())
+    if not registry:
+        scheduler.lifecycle.organisms = None
+    store = world.cells
+    # Cells born from now on have a birth tick above 0
+    scheduler.step()
+    brains = store.alive_indices(CellType.BRAIN)[:50]
+    members = scheduler.organisms.members(brains)
+    scheduler.mark_dying(brains)
+    ticks = 0
+    # Slots are reused by newborn cells, so only count the cells seeded at tick 0
+    while (store.alive[members] & (store.birth_tick[members] == 0)).any():
+        scheduler.step()
+        ticks += 1
+    return ticks
+
+
+def main() -> None:
+    world = World(seed=0)
+    seed_organisms(world, ORGANISMS)
+    scheduler = Scheduler(world, events=EventQueue())
+    registry = scheduler.organisms
+    store = world.cells
+    cells = store.alive_indices()
+
+    print(f"{len(cells)} cells in {ORGANISMS} organisms:")
+    resolve = timed(lambda: organism_of(store, scheduler.transport, cells))
+    lookup = timed(lambda: registry.organism_of(cells))
+    print(f"  resolve all organisms   {resolve * 1e3:8.3f} ms")
+    print(f"  registry lookup         {lookup * 1e3:8.3f} ms")
+    print(f"  aggregates              {timed(registry.aggregates) * 1e3:8.3f} ms")
+    print(f"  full rebuild            {timed(registry.rebuild) * 1e3:8.3f} ms")
+
+    rng = np.random.default_rng(0)
+    print(f"  {'killed':>8} {'cell type':>10} {'died':>8} {'lifecycle':>10}")
+    for cell_type in (CellType.CONDUIT, CellType.BRAIN):
+        for killed in KILLED:
+            victims = rng.choice(store.alive_indices(cell_type), killed, replace=False)
+            deaths = scheduler.lifecycle.deaths
+            scheduler.mark_dying(victims)
+            start = time.perf_counter()
+            scheduler.lifecycle.apply(0)
+            elapsed = time.perf_counter() - start
+            print(
+                f"  {killed:>8} {cell_type.name:>10} "
+                f"{scheduler.lifecycle.deaths - deaths:>8} {elapsed * 1e3:8.3f}ms"
+            )
+
+    print("ticks until the organisms of 50 dead brains are gone:")
+    print(f"  with the registry     {extinction_ticks(True):4d}")
+    print(f"  without               {extinction_ticks(False):4d}")
+
+
+if __name__ == "__main__":
+    main()
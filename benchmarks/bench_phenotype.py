@@ -0,0 +1,83 @@
+# benchmarks/bench_phenotype.py
+"""
+Benchmark the PhenotypeDecoder cache on a population of brains sharing a few
+hundred genomes, by genome and by GenomePool handle as the brain kernel looks
+them up, and the partial recompilation of mutated offspring.
+
+Run with: python -m benchmarks.bench_phenotype
+"""
+
+import time
+
+import numpy as np
+
+from src.dynamics.genetic import GENOME_LENGTH, GenomePool
+from src.dynamics.phenotype import COMPILERS, SEGMENTS, PhenotypeDecoder
+from src.utils.rng import RandomService
+
+BRAINS = 10_000
+GENOMES = 300
+TICKS = 10
+OFFSPRING = 10_000
+
+
+def compile_uncached(genome: np.ndarray) -> dict:
+    return {name: COMPILERS[name](genome[genes]) for name, genes in SEGMENTS.items()}
+
+
+def main() -> None:
+    rng = RandomService(0).stream("phenotype")
+    genomes = rng.integers(0, 256, size=(GENOMES, GENOME_LENGTH), dtype=np.uint8)
+    brains = [genomes[i % GENOMES].tolist() for i in range(BRAINS)]
+
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        for genome in brains:
+            compile_uncached(np.asarray(genome, dtype=np.uint8))
+    uncached = (time.perf_counter() - start) / TICKS
+
+    decoder = PhenotypeDecoder()
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        for genome in brains:
+            decoder.decode(genome)
+    cached = (time.perf_counter() - start) / TICKS
+
+    print(f"{BRAINS} brains sharing {GENOMES} genomes, decode per tick:")
+    print(f"  uncached   {uncached * 1e3:10.2f} ms")
+    print(f"  cached     {cached * 1e3:10.2f} ms")
+    print(f"  speedup    {uncached / cached:10.1f}x")
+    print(f"  stats      {decoder.stats()}")
+
+    # The brain kernel gathers the programs of a whole batch by handle
+    pool = GenomePool()
+    handles = pool.intern_many(genomes[np.arange(BRAINS) % GENOMES])
+    decoder = PhenotypeDecoder()
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        decoder.programs(pool, handles)
+    batched = (time.perf_counter() - start) / TICKS
+    print(f"  by handle  {batched * 1e3:10.2f} ms")
+    print(f"  stats      {decoder.stats()}")
+
+    # Offspring with a single mutated gene recompile one segment out of three
+    parents = rng.integers(0, GENOMES, size=OFFSPRING)
+    children = genomes[parents].copy()
+    genes = rng.integers(0, GENOME_LENGTH, size=OFFSPRING)
+    children[np.arange(OFFSPRING), genes] += 1
+    decoder = PhenotypeDecoder(max_bytes=64 * 1024 * 1024)
+    for genome in genomes:
+        decoder.decode(genome)
+    start = time.perf_counter()
+    for child, parent in zip(children, parents):
+        decoder.decode(child, parent=genomes[parent])
+    partial = (time.perf_counter() - start) / OFFSPRING
+    stats = decoder.stats()
+    print(f"{OFFSPRING} offspring with one mutated gene:")
+    print(f"  per decode {partial * 1e6:10.2f} us")
+    print(f"  segments compiled {stats['segments_compiled'] - 3 * GENOMES}")
+    print(f"  segments reused   {stats['segments_reused']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# benchmarks/bench_profiler.py
+"""
+Measure the Profiler on the default world: the cost of a scope, the tick time
+with profiling disabled, with the scoped timers and with stack sampling too,
+and print the per-cell-type report of the profiled run. The collapsed stacks
+are written next to each other for flamegraph.pl.
+
+Run with: python -m benchmarks.bench_profiler
+"""
+
+import os
+import tempfile
+import time
+
+from benchmarks.population import seed_organisms
+from src.cells.cell_type import CellType
+from src.core.world import World
+from src.simulation.event import EventQueue
+from src.simulation.scheduler import Scheduler
+from src.utils.profiler import Profiler
+
+ORGANISMS = 50_000
+TICKS = 20
+# Ticks run before timing, as the first ticks of a seeded world are slower
+WARMUP = 5
+# Scopes opened and closed to time one
+SCOPES = 100_000
+SAMPLE_INTERVAL = 0.001
+
+
+def scope_cost() -> float:
+    profiler = Profiler()
+    profiler.begin("tick")
+    start = time.perf_counter()
+    for _ in range(SCOPES):
+        profiler.begin("batch", CellType.LEAF, 1)
+        profiler.end()
+    return (time.perf_counter() - start) / SCOPES
+
+
+def tick_time(mode: str) -> tuple[float, Profiler | None]:
+    world = World(seed=0)
+    seed_organisms(world, ORGANISMS, genomes=True)
+    scheduler = Scheduler(world, events=EventQueue())
+    scheduler.run(WARMUP)
+    profiler = None
+    if mode != "disabled":
+        profiler = scheduler.enable_profiling()
+    if mode == "sampling":
+        profiler.start_sampling(SAMPLE_INTERVAL)
+    start = time.perf_counter()
+    scheduler.run(TICKS)
+    elapsed = time.perf_counter() - start
+    if profiler is not None:
+        profiler.stop_sampling()
+    return elapsed / TICKS, profiler
+
+
+def main() -> None:
+    print(f"begin/end of a scope      {scope_cost() * 1e9:8.0f} ns")
+    print(f"{TICKS} ticks of {ORGANISMS} organisms:")
+    for mode in ("disabled", "timers", "sampling"):
+        elapsed, profiler = tick_time(mode)
+        print(f"  {mode:<22} {elapsed * 1e3:8.1f} ms per tick")
+
+    report = profiler.report()
+    scopes = sum(report["scopes"][path]["calls_per_tick"] for path in report["scopes"])
+    print(f"  {scopes:.0f} scopes and {sum(profiler.samples.values())} stack samples")
+    print(
+        f"  {'cell type':<10} {'ms/tick':>8} {'calls/tick':>11} "
+        f"{'cells/tick':>11} {'ns/cell':>8}"
+    )
+    for name, row in report["cell_types"].items():
+        print(
+            f"  {name:<10} {row['ms_per_tick']:8.3f} {row['calls_per_tick']:11.1f} "
+            f"{row['cells_per_tick']:11.0f} {row['ns_per_cell']:8.1f}"
+        )
+
+    directory = tempfile.mkdtemp()
+    for name, samples in (("scopes", False), ("samples", True)):
+        path = os.path.join(directory, f"{name}.collapsed")
+        profiler.write_collapsed(path, samples)
+        print(f"  {name} written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# benchmarks/bench_recorder.py
+"""
+Measure the Recorder on the default world: the size of the history per tick
+against full frames, the time the tick loop spends recording, and the time a
+HistoryReader takes to seek to a tick and to stream frames.
+
+Run with: python -m benchmarks.bench_recorder
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.population import seed_organisms
+from src.core.world import World
+from src.simulation.event import EventQueue
+from src.simulation.recorder import KEYFRAME, HistoryReader
+from src.simulation.scheduler import Scheduler
+
+ORGANISMS = 50_000
+TICKS = 60
+KEYFRAME_INTERVAL = 20
+# Ticks run before timing, as the first ticks of a seeded world are slower
+WARMUP = 5
+
+
+def scheduler() -> Scheduler:
+    world = World(seed=0)
+    seed_organisms(world, ORGANISMS, genomes=True)
+    scheduler = Scheduler(world, events=EventQueue())
+    scheduler.run(WARMUP)
+    return scheduler
+
+
+def main() -> None:
+    path = os.path.join(tempfile.mkdtemp(), "run.hist")
+    plain = scheduler()
+    start = time.perf_counter()
+    plain.run(TICKS)
+    plain_time = time.perf_counter() - start
+
+    recorded = scheduler()
+    grid = recorded.world.grid
+    grid_frame = grid.cell_id.nbytes + grid.cell_type.nbytes
+    grid_frame += sum(layer.nbytes for layer in grid.layers.values())
+    start = time.perf_counter()
+    recorder = recorded.enable_recording(path, KEYFRAME_INTERVAL)
+    recorded.run(TICKS)
+    recorded.disable_recording()
+    recorded_time = time.perf_counter() - start
+
+    print(f"{TICKS} ticks of {len(recorded.world.cells)} cells:")
+    print(f"  without recording       {plain_time / TICKS * 1e3:8.1f} ms per tick")
+    print(f"  with recording          {recorded_time / TICKS * 1e3:8.1f} ms per tick")
+    print(
+        f"  capture and diff        {recorder.encoding / TICKS * 1e3:8.1f} ms per tick"
+    )
+    print(f"  blocked on the queue    {recorder.stall / TICKS * 1e3:8.1f} ms per tick")
+
+    with HistoryReader(path) as reader:
+        sizes = np.diff(np.append(reader.offsets, os.path.getsize(path)))
+        keyframes = reader.kinds == KEYFRAME
+        print(
+            f"bytes per tick ({recorder.keyframes} keyframes, {recorder.deltas} deltas):"
+        )
+        print(f"  full grid frame         {grid_frame / 1e6:8.2f} MB")
+        print(f"  keyframe                {sizes[keyframes].mean() / 1e6:8.2f} MB")
+        print(f"  delta                   {sizes[~keyframes].mean() / 1e6:8.2f} MB")
+        print(f"  history                 {sizes.sum() / len(sizes) / 1e6:8.2f} MB")
+
+        tick = int(reader.ticks[KEYFRAME_INTERVAL - 1])
+        start = time.perf_counter()
+        reader.frame(tick)
+        seek = time.perf_counter() - start
+        start = time.perf_counter()
+        frames = sum(1 for _ in reader.frames())
+        stream = time.perf_counter() - start
+        print(f"  seek to tick {tick:<10} {seek * 1e3:8.1f} ms")
+        print(f"  stream                  {stream / frames * 1e3:8.1f} ms per frame")
+    os.remove(path)
+    os.rmdir(os.path.dirname(path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+# benchmarks/bench_scheduler.py
+"""
+Measure headless throughput of the Scheduler.
+
+Run with: python -m benchmarks.bench_scheduler
+"""
+
+from benchmarks.population import seed_organisms
+from src.core.world import World
+from src.simulation.scheduler import Scheduler
+
+ORGANISMS = 20_000
+TICKS = 100
+
+
+def main() -> None:
+    world = World()
+    seed_organisms(world, ORGANISMS)
+    scheduler = Scheduler(world)
+    print(f"{len(world.cells)} cells, {TICKS} ticks")
+    report = scheduler.run(TICKS)
+    print(f"ticks/s:        {report['ticks_per_second']:.1f}")
+    print(f"cell updates/s: {report['cell_updates_per_second']:.3e}")
+    for name, ms in report["phase_ms"].items():
+        print(f"  {name:<14} {ms:8.3f} ms/tick")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# benchmarks/bench_sectors.py
+"""
+Measure the per-tick cost of the sector environment update (seasons, random and
+weather events, sunlight, organic matter) for growing sector grids.
+
+Run with: python -m benchmarks.bench_sectors
+"""
+
+import time
+
+from src.core.environment import Environment
+from src.core.world import World
+from src.simulation.event import EventQueue
+
+GRIDS = (8, 64, 256)
+TICKS = 200
+
+
+def time_update(num_sectors: int, queued: bool) -> float:
+    world = World(num_sectors=num_sectors, seed=0)
+    environment = Environment(world)
+    events = None
+    if queued:
+        events = EventQueue(world.rng.stream("events"))
+        world.schedule_random_events(events)
+        environment.schedule_weather_events(events)
+    start = time.perf_counter()
+    for tick in range(TICKS):
+        if events is not None:
+            events.run_due(tick)
+        world.update_environment()
+        environment.update_environment()
+    return (time.perf_counter() - start) / TICKS
+
+
+def main() -> None:
+    print("environment update per tick:")
+    print(f"  {'sectors':>9} {'polled':>10} {'queued':>10}")
+    for n in GRIDS:
+        polled = time_update(n, queued=False)
+        queued = time_update(n, queued=True)
+        print(f"  {n:>4}x{n:<4} {polled * 1e3:8.3f}ms {queued * 1e3:8.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# benchmarks/bench_transport.py
+"""
+Benchmark the TransportEngine on a deep conduit chain and a wide conduit tree,
+against the per-object ConduitCell.receive_and_forward loop.
+
+Run with: python -m benchmarks.bench_transport
+"""
+
+import time
+
+import numpy as np
+
+from src.cells.brain_cell import BrainCell
+from src.cells.cell_store import CellStore
+from src.cells.cell_type import CellType
+from src.cells.conduit_cell import ConduitCell
+from src.dynamics.transport import TransportEngine
+
+CHAIN_LENGTH = 10_000
+TREE_FANOUT = 100
+TREE_DEPTH = 2
+TICKS = 100
+
+
+def chain_store(length: int) -> CellStore:
+    """
+    One brain at index 0 fed by a chain of `length` conduits; index 1 is
+    adjacent to the brain and index `length` is the far end.
+    """
+    store = CellStore()
+    store.add(CellType.BRAIN, (0, 0), 0.0)
+    indices = np.arange(1, length + 1)
+    store.add_many(CellType.CONDUIT, indices, np.zeros(length), 100.0, indices - 1)
+    return store
+
+
+def tree_store(fanout: int, depth: int) -> CellStore:
+    """
+    One brain at index 0 with `fanout` conduit children per node, `depth` levels deep.
+    """
+    store = CellStore()
+    store.add(CellType.BRAIN, (0, 0), 0.0)
+    parents = np.array([0])
+    for _ in range(depth + 1):
+        children_parents = np.repeat(parents, fanout)
+        xs = np.arange(len(children_parents))
+        parents = store.add_many(
+            CellType.CONDUIT, xs, np.zeros(len(xs)), 100.0, children_parents
+        )
+    return store
+
+
+def object_chain(length: int):
+    brain = BrainCell((0, 0), 0.0)
+    conduits = [ConduitCell((i, 0), 100.0) for i in range(1, length + 1)]
+    for upstream, downstream in zip(conduits[1:], conduits):
+        upstream.connect_to_next_conduit(downstream)
+    conduits[0].connect_to_brain(brain)
+    return conduits
+
+
+def time_engine(store: CellStore, mode: str, ticks: int) -> float:
+    engine = TransportEngine(store)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        engine.step(mode)
+    return (time.perf_counter() - start) / ticks
+
+
+def main() -> None:
+    # Per-object baseline; the brain-adjacent conduit is skipped because
+    # BrainCell.process_signals does not exist yet.
+    conduits = object_chain(CHAIN_LENGTH)[1:]
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        for conduit in conduits:
+            conduit.receive_and_forward()
+    object_time = (time.perf_counter() - start) / TICKS
+
+    print(f"chain of {CHAIN_LENGTH} conduits, per tick:")
+    print(f"  per-object receive_and_forward: {object_time * 1e3:8.3f} ms")
+    for mode in ("hop", "direct"):
+        elapsed = time_engine(chain_store(CHAIN_LENGTH), mode, TICKS)
+        print(f"  engine {mode:>6}:                  {elapsed * 1e3:8.3f} ms")
+
+    store = chain_store(CHAIN_LENGTH)
+    start = time.perf_counter()
+    engine = TransportEngine(store)
+    compile_time = time.perf_counter() - start
+    start = time.perf_counter()
+    engine.remove(CHAIN_LENGTH // 2)
+    store.kill(CHAIN_LENGTH // 2)
+    engine.connect(CHAIN_LENGTH // 2 + 1, CHAIN_LENGTH // 2 - 1)
+    update_time = time.perf_counter() - start
+    print(f"  full compile:                    {compile_time * 1e3:8.3f} ms")
+    print(f"  kill + reconnect mid-chain:      {update_time * 1e3:8.3f} ms")
+
+    store = chain_store(CHAIN_LENGTH)
+    engine = TransportEngine(store)
+    engine.step("direct")
+    print(f"  brain energy after 1 direct tick: {store.energy[0]:.0f}")
+
+    size = sum(TREE_FANOUT ** (level + 1) for level in range(TREE_DEPTH + 1))
+    print(f"tree of {size} conduits (fanout {TREE_FANOUT}), per tick:")
+    for mode in ("hop", "direct"):
+        elapsed = time_engine(tree_store(TREE_FANOUT, TREE_DEPTH), mode, TICKS)
+        print(f"  engine {mode:>6}:                  {elapsed * 1e3:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
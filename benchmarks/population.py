@@ -0,0 +1,41 @@
+# benchmarks/population.py
+"""
+Helpers to seed a World with simple organisms for benchmarks.
+"""
+
+import numpy as np
+
+from src.cells.cell_type import CellType
+from src.core.world import World
+from src.dynamics.genetic import GENOME_LENGTH
+
+
+def seed_organisms(
+    world: World, count: int, length: int = 8, seed: int = 0, genomes: bool = False
+) -> None:
+    """
+    Add `count` organisms to the world. Each has a brain on top of a vertical
+    chain of `length` conduits, with a leaf to the left and a root to the right
+    of every conduit; every fourth root is an antenna instead.
+
+    Args:
+        world (World): The world to populate.
+        count (int): The number of organisms.
+        length (int): The number of conduits of each organism.
+        seed (int): Seed for the random placement of organisms.
+        genomes (bool): Give every brain a random genome.
+    """
+    rng = np.random.default_rng(seed)
+    columns = world.width // 4
+    rows = world.height // (length + 2)
+    slots = rng.choice(columns * rows, size=count, replace=False)
+    for slot in slots.tolist():
+        x = (slot % columns) * 4 + 1
+        y = (slot // columns) * (length + 2) + 1
+        genome = rng.integers(0, 256, size=GENOME_LENGTH) if genomes else None
+        target = world.add_cell(CellType.BRAIN, (x, y), 500.0, genome=genome)
+        for depth in range(1, length + 1):
+            target = world.add_cell(CellType.CONDUIT, (x, y + depth), 0.0, target)
+            side = CellType.ANTENNA if depth % 4 == 0 else CellType.ROOT
+            world.add_cell(CellType.LEAF, (x - 1, y + depth), 0.0, target)
+            world.add_cell(side, (x + 1, y + depth), 0.0, target)
@@ -1,8 +1,8 @@
 # src/cells/antenna_cell.py
 
-from src.cells.base_cell import BaseCell
+from src.cells.base_cell import BaseCell, merge_signals
 from src.cells.conduit_cell import ConduitCell
-import random
+from src.utils.rng import default_service
 
 
 class AntennaCell(BaseCell):
@@ -11,15 +11,36 @@ class AntennaCell(BaseCell):
     or handles communication, depending on its current mode.
     """
 
-    def __init__(self, position: tuple[int, int], energy: float):
+    def __init__(self, position: tuple[int, int], energy: float, rng=None):
+        """
+        Initialize the antenna cell with position and energy.
+
+        Args:
+            position (tuple[int, int]): The (x, y) position of the cell on the grid.
+            energy (float): The initial energy level of the cell.
+            rng (np.random.Generator | None): The random stream used for the radio
+                frequency; the default service's "antenna" stream if omitted.
+        """
+        if rng is None:
+            rng = default_service().stream("antenna")
         super().__init__(position, energy)
         self.mode: str = "energy_gatherer"  # Initial mode
         self.connected_conduit: ConduitCell | None = (
             None  # Reference to connected conduit cell
         )
-        self.radio_frequency: float = random.uniform(
-            0.1, 10.0
+        self.radio_frequency: float = float(
+            rng.uniform(0.1, 10.0)
         )  # Random radio frequency
+        self.signals: dict = {}  # Signals heard from other antennas, by band
+
+    def initialize_genome(self) -> list:
+        """
+        Initialize the genome of the antenna cell. Antenna cells do not need a genome.
+
+        Returns:
+            list: An empty genome list as it's not applicable for antenna cells.
+        """
+        return []
 
     def perform_action(self) -> None:
         """Perform the cell's action based on its current mode."""
@@ -43,9 +64,19 @@ class AntennaCell(BaseCell):
             self.connected_conduit.receive_energy(energy_gathered)
 
     def handle_communication(self) -> None:
-        """Handle communication using the cell's radio frequency."""
-        # Placeholder for communication logic
-        pass
+        """Forward the signals heard since the last action to the connected conduit."""
+        if self.connected_conduit and self.signals:
+            self.connected_conduit.receive_signals(self.signals)
+        self.signals = {}
+
+    def receive_signals(self, signals: dict) -> None:
+        """
+        Hear signals broadcast by other antennas on the cell's band.
+
+        Args:
+            signals (dict): The total payload received on each band.
+        """
+        merge_signals(self.signals, signals)
 
     def gather_mode(self, conduit_cell: ConduitCell) -> None:
         """
@@ -2,7 +2,23 @@
 
 from abc import ABC, abstractmethod
 
-import random
+import numpy as np
+
+from src.dynamics.genetic import MUTATION_RATE
+from src.utils.rng import default_service
+
+
+def merge_signals(into: dict, signals: dict) -> None:
+    """
+    Add signals to those already held by a cell. Signals map a frequency band to
+    the total payload received on it, as delivered by the AntennaNetwork.
+
+    Args:
+        into (dict): The signals held by the cell, updated in place.
+        signals (dict): The signals to add.
+    """
+    for band, payload in signals.items():
+        into[band] = into.get(band, 0.0) + payload
 
 
 class BaseCell(ABC):
@@ -21,6 +37,8 @@ class BaseCell(ABC):
         """
         self.position = position
         self.energy = energy
+        self.alive = True
+        self.spatial_index = None  # Set when the cell is placed in a World
         self.genome = self.initialize_genome()
 
     @abstractmethod
@@ -47,6 +65,8 @@ class BaseCell(ABC):
         Args:
             new_position (tuple[int, int]): The new (x, y) position of the cell.
         """
+        if self.spatial_index is not None:
+            self.spatial_index.move(self, new_position)
         self.position = new_position
 
     def consume_energy(self, amount: float) -> None:
@@ -69,14 +89,22 @@ class BaseCell(ABC):
         """
         self.energy += amount
 
-    def mutate(self) -> None:
+    def mutate(self, rng: np.random.Generator | None = None) -> None:
         """
         Mutate the cell's genome to simulate genetic evolution.
+
+        Args:
+            rng (np.random.Generator | None): The random stream to draw from; the
+                default service's "mutation" stream if omitted.
         """
+        if rng is None:
+            rng = default_service().stream("mutation")
         # Simple mutation logic; can be replaced with more complex mechanisms
-        for i in range(len(self.genome)):
-            if random.random() < 0.01:  # 1% chance to mutate each genome element
-                self.genome[i] = random.randint(0, 255)
+        mask = rng.random(len(self.genome)) < MUTATION_RATE
+        for i, value in zip(
+            np.flatnonzero(mask), rng.integers(0, 256, size=int(mask.sum()))
+        ):
+            self.genome[i] = int(value)
 
     def info(self) -> dict:
         """
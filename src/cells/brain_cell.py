@@ -1,33 +1,37 @@
 # src/cells/brain_cell.py
 
-from src.cells.base_cell import BaseCell
+from src.cells.base_cell import BaseCell, merge_signals
 from src.cells.seed_cell import SeedCell
-import random
+from src.cells.cell_type import CellType
+from src.dynamics.genetic import GENOME_LENGTH
+from src.dynamics.phenotype import Phenotype, PhenotypeDecoder
 
 
 class BrainCell(BaseCell):
     """
     The BrainCell class manages the genome, cell creation, and evolutionary mutation.
+
+    The genome is decoded into a Phenotype through a decoder shared by every brain,
+    so brains with the same genome compile it only once.
     """
 
+    decoder = PhenotypeDecoder()
+
     def __init__(self, position: tuple[int, int], energy: float):
         super().__init__(position, energy)
         self.genome = self.initialize_genome()
+        self.build_step = 0  # Number of cells built so far
+        self.signals: dict = {}  # Signals received through the conduits, by band
 
-    def initialize_genome(self) -> dict:
+    def initialize_genome(self) -> list:
         """
         Initialize the genome of the brain cell.
 
         Returns:
-            dict: The genome structure represented by a dictionary.
-        """
-        # Placeholder for the genome structure
-        return {
-            "gene1": 0,
-            "gene2": 0,
-            "gene3": 0,
-            # Add more genes as needed
-        }
+            list: The genome structure represented by a list of GENOME_LENGTH
+                integers, the same packed form the genome pool stores.
+        """
+        return [0] * GENOME_LENGTH
 
     def perform_action(self) -> None:
         """
@@ -41,8 +45,9 @@ class BrainCell(BaseCell):
 
         # Check if the cell has energy to act
         if self.energy > 0:
-            # Create a new cell behind the brain cell
-            new_position = (self.position[0], self.position[1] - 1)
+            # Create a new cell next to the brain cell, behind it by default
+            dx, dy = self.phenotype.direction(self.build_step)
+            new_position = (self.position[0] + dx, self.position[1] + dy)
             new_cell = self.create_cell(new_position)
 
             # Apply mutation to the new cell if it's a SeedCell
@@ -64,8 +69,16 @@ class BrainCell(BaseCell):
         # Use the genome to determine the type of cell to create
         cell_type = self.determine_cell_type()
         new_cell = cell_type(position, 100)
+        self.build_step += 1
         return new_cell
 
+    @property
+    def phenotype(self) -> Phenotype:
+        """
+        The compiled phenotype of the brain cell's genome.
+        """
+        return self.decoder.decode(self.genome)
+
     def determine_cell_type(self) -> type:
         """
         Determine the type of cell to create based on the brain cell's genome.
@@ -73,11 +86,28 @@ class BrainCell(BaseCell):
         Returns:
             type: The class of the cell to be created.
         """
-        # Implement logic to determine the cell type based on the genome.
-        # For now, return a placeholder cell type.
+        from src.cells.antenna_cell import AntennaCell
+        from src.cells.conduit_cell import ConduitCell
         from src.cells.leaf_cell import LeafCell
+        from src.cells.root_cell import RootCell
 
-        return LeafCell
+        classes = {
+            CellType.LEAF: LeafCell,
+            CellType.ROOT: RootCell,
+            CellType.CONDUIT: ConduitCell,
+            CellType.ANTENNA: AntennaCell,
+        }
+        return classes[self.phenotype.cell_type(self.build_step)]
+
+    def process_signals(self, signals: dict) -> None:
+        """
+        Receive signals forwarded by the conduit chain, as delivered to brains by
+        the AntennaNetwork.
+
+        Args:
+            signals (dict): The total payload received on each band.
+        """
+        merge_signals(self.signals, signals)
 
     def on_death(self) -> None:
         """
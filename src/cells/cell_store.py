@@ -0,0 +1,527 @@
+# src/cells/cell_store.py
+
+import numpy as np
+
+from src.cells.cell_type import CellType
+from src.dynamics.genetic import NO_GENOME, GenomePool
+
+# Value stored in the connection column of cells that are not connected.
+NO_CONNECTION = -1
+
+# Value stored in the lineage column of cells that belong to no lineage.
+NO_LINEAGE = -1
+
+# Fill value of freshly allocated slots, for columns where it is not 0.
+_FILL = {
+    "connection": NO_CONNECTION,
+    "genome_handle": NO_GENOME,
+    "lineage": NO_LINEAGE,
+}
+
+
+class CellStore:
+    """
+    The CellStore class holds every cell of the simulation as a structure of arrays.
+
+    Each cell is a slot index into parallel columns (type code, x, y, energy, alive
+    flag, connection index, per-type state, genome handle, lineage, birth tick,
+    energy harvested and radio frequency). Hot paths operate on the columns in
+    bulk, while CellView objects expose the BaseCell API for per-cell code. Genomes
+    live in a shared GenomePool; each cell holds one reference on its genome,
+    released when it dies.
+
+    Columns are reallocated when the store grows, so callers should look them up on
+    the store rather than keep references across calls that add cells. Births and
+    deaths must go through add/add_many/kill/kill_many so that cached index arrays
+    are invalidated.
+
+    The slots of dead cells go on a free list and are reused by later births, so
+    callers must drop references to dead cells before adding new ones. compact()
+    moves the living cells to the front after mass die-offs.
+    """
+
+    COLUMNS = (
+        "type_code",
+        "x",
+        "y",
+        "energy",
+        "alive",
+        "connection",
+        "state",
+        "genome_handle",
+        "lineage",
+        "birth_tick",
+        "harvested",
+        "frequency",
+    )
+
+    def __init__(self, capacity: int = 1024, genome_capacity: int = 1024):
+        """
+        Initialize an empty store.
+
+        Args:
+            capacity (int): The number of cell slots to preallocate.
+            genome_capacity (int): The number of distinct genomes to preallocate.
+        """
+        self.size = 0
+        self.type_code = np.zeros(capacity, dtype=np.uint8)
+        self.x = np.zeros(capacity, dtype=np.int32)
+        self.y = np.zeros(capacity, dtype=np.int32)
+        self.energy = np.zeros(capacity, dtype=np.float64)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.connection = np.full(capacity, NO_CONNECTION, dtype=np.int32)
+        self.state = np.zeros(capacity, dtype=np.uint8)
+        self.genome_handle = np.full(capacity, NO_GENOME, dtype=np.int64)
+        self.genomes = GenomePool(capacity=genome_capacity)
+        self.lineage = np.full(capacity, NO_LINEAGE, dtype=np.int32)
+        self.birth_tick = np.zeros(capacity, dtype=np.int64)
+        self.harvested = np.zeros(capacity, dtype=np.float64)
+        # Radio frequency of antennas; 0 until assigned, see AntennaNetwork
+        self.frequency = np.zeros(capacity, dtype=np.float32)
+        self._free: list[int] = []
+        self._index_cache: dict[int | None, np.ndarray] = {}
+
+    @classmethod
+    def from_columns(
+        cls, columns: dict[str, np.ndarray], free: np.ndarray, genomes: GenomePool
+    ) -> "CellStore":
+        """
+        Build a store around existing columns, e.g. memory-mapped from a
+        checkpoint. The columns are used as they are until the store grows.
+
+        Args:
+            columns (dict[str, np.ndarray]): One array per name in COLUMNS, all of
+                the same length, which becomes the size of the store.
+            free (np.ndarray): The free list of dead slots.
+            genomes (GenomePool): The pool the genome handles refer to.
+
+        Returns:
+            CellStore: The store, holding the given arrays.
+        """
+        store = cls.__new__(cls)
+        for name in cls.COLUMNS:
+            setattr(store, name, columns[name])
+        store.size = len(store.type_code)
+        store.genomes = genomes
+        store._free = free.tolist()
+        store._index_cache = {}
+        return store
+
+    @property
+    def capacity(self) -> int:
+        """
+        The number of allocated cell slots.
+        """
+        return len(self.type_code)
+
+    def __len__(self) -> int:
+        """
+        Return the number of living cells.
+        """
+        return self.size - len(self._free)
+
+    @property
+    def free_slots(self) -> int:
+        """
+        The number of dead slots below `size` waiting to be reused.
+        """
+        return len(self._free)
+
+    def columns(self) -> dict[str, np.ndarray]:
+        """
+        Return the per-cell columns, trimmed to the used slots.
+
+        Returns:
+            dict[str, np.ndarray]: Views of each column keyed by name.
+        """
+        return {name: getattr(self, name)[: self.size] for name in self.COLUMNS}
+
+    def _grow(self, min_capacity: int) -> None:
+        # Double the capacity until it fits, copying each column once.
+        capacity = max(self.capacity, 1)
+        while capacity < min_capacity:
+            capacity *= 2
+        for name in self.COLUMNS:
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[: self.size] = old[: self.size]
+            new[self.size :] = _FILL.get(name, 0)
+            setattr(self, name, new)
+
+    def add(
+        self,
+        cell_type: int,
+        position: tuple[int, int],
+        energy: float,
+        connection: int = NO_CONNECTION,
+        genome=None,
+        state: int = 0,
+        lineage: int = NO_LINEAGE,
+        birth_tick: int = 0,
+    ) -> int:
+        """
+        Add a single cell.
+
+        Args:
+            cell_type (int): The CellType code of the cell.
+            position (tuple[int, int]): The (x, y) position of the cell on the grid.
+            energy (float): The initial energy level of the cell.
+            connection (int): The index of the cell it feeds into, if any.
+            genome: An optional sequence of GENOME_LENGTH gene values in the
+                range 0-255, interned into the genome pool.
+            state (int): The initial per-type state, e.g. an AntennaMode.
+            lineage (int): The lineage of the organism the cell belongs to.
+            birth_tick (int): The tick at which the cell is born.
+
+        Returns:
+            int: The index of the new cell.
+        """
+        if self._free:
+            index = self._free.pop()
+        else:
+            index = self.size
+            if index >= self.capacity:
+                self._grow(index + 1)
+            self.size = index + 1
+        self.type_code[index] = cell_type
+        self.x[index], self.y[index] = position
+        self.energy[index] = energy
+        self.alive[index] = True
+        self.connection[index] = connection
+        self.state[index] = state
+        self.genome_handle[index] = (
+            NO_GENOME if genome is None else self.genomes.intern(genome)
+        )
+        self.lineage[index] = lineage
+        self.birth_tick[index] = birth_tick
+        self.harvested[index] = 0
+        self.frequency[index] = 0
+        self._index_cache.clear()
+        return index
+
+    def add_many(
+        self,
+        cell_types,
+        xs: np.ndarray,
+        ys: np.ndarray,
+        energies,
+        connections=NO_CONNECTION,
+        states=0,
+        genome_handles=NO_GENOME,
+        lineages=NO_LINEAGE,
+        birth_tick: int = 0,
+    ) -> np.ndarray:
+        """
+        Add many cells in one operation.
+
+        Args:
+            cell_types: The CellType codes, either an array or a single code.
+            xs (np.ndarray): The x coordinates.
+            ys (np.ndarray): The y coordinates.
+            energies: The initial energy levels, either an array or a single value.
+            connections: The connection indices, either an array or a single value.
+            states: The per-type states, either an array or a single value.
+            genome_handles: Handles into the genome pool whose references are
+                handed over to the new cells, e.g. from GenomePool.mutate_many.
+            lineages: The lineages, either an array or a single value.
+            birth_tick (int): The tick at which the cells are born.
+
+        Returns:
+            np.ndarray: The indices of the new cells, free slots first.
+        """
+        count = len(xs)
+        reused = min(count, len(self._free))
+        start = self.size
+        end = start + count - reused
+        if end > self.capacity:
+            self._grow(end)
+        if reused:
+            indices = np.concatenate(
+                (np.array(self._free[-reused:][::-1]), np.arange(start, end))
+            )
+            del self._free[-reused:]
+        else:
+            # Common case: one contiguous block at the end
+            indices = slice(start, end)
+        self.type_code[indices] = cell_types
+        self.x[indices] = xs
+        self.y[indices] = ys
+        self.energy[indices] = energies
+        self.alive[indices] = True
+        self.connection[indices] = connections
+        self.state[indices] = states
+        self.genome_handle[indices] = genome_handles
+        self.lineage[indices] = lineages
+        self.birth_tick[indices] = birth_tick
+        self.harvested[indices] = 0
+        self.frequency[indices] = 0
+        self.size = end
+        self._index_cache.clear()
+        return indices if reused else np.arange(start, end)
+
+    def kill(self, index: int) -> None:
+        """
+        Mark a cell as dead and release its genome.
+
+        Args:
+            index (int): The index of the cell.
+        """
+        if self.alive[index]:
+            self.genomes.release(self.genome_handle[index])
+            self.genome_handle[index] = NO_GENOME
+            self._free.append(int(index))
+        self.alive[index] = False
+        self._index_cache.clear()
+
+    def kill_many(self, indices: np.ndarray) -> None:
+        """
+        Mark many cells as dead in one operation and release their genomes.
+
+        Args:
+            indices (np.ndarray): The indices of the cells.
+        """
+        living = indices[self.alive[indices]]
+        if not np.all(living[1:] > living[:-1]):
+            # Deduplicate unless already strictly increasing, e.g. from flatnonzero
+            living = np.unique(living)
+        self.genomes.release(self.genome_handle[living])
+        self.genome_handle[living] = NO_GENOME
+        self._free.extend(living.tolist())
+        self.alive[indices] = False
+        self._index_cache.clear()
+
+    def compact(self) -> np.ndarray:
+        """
+        Move the living cells to the front of the columns, keeping their order,
+        and drop the free list.
+
+        Connections are rewritten to the new indices; connections to dead cells
+        become NO_CONNECTION. Every other holder of cell indices must be updated
+        with the returned remap.
+
+        Returns:
+            np.ndarray: The new index of each old slot below the old size, or -1
+                for dead slots.
+        """
+        size = self.size
+        living = np.flatnonzero(self.alive[:size])
+        count = len(living)
+        remap = np.full(size, NO_CONNECTION, dtype=np.int64)
+        remap[living] = np.arange(count)
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            column[:count] = column[living]
+            column[count:size] = _FILL.get(name, 0)
+        connection = self.connection[:count]
+        linked = connection != NO_CONNECTION
+        connection[linked] = remap[connection[linked]]
+        self.size = count
+        self._free.clear()
+        self._index_cache.clear()
+        return remap
+
+    def set_type(self, indices, cell_type: int) -> None:
+        """
+        Change the type of cells in place, e.g. when a seed becomes a brain.
+
+        Args:
+            indices: The index or indices of the cells.
+            cell_type (int): The new CellType code.
+        """
+        self.type_code[indices] = cell_type
+        self._index_cache.clear()
+
+    def alive_indices(self, cell_type: int | None = None) -> np.ndarray:
+        """
+        Return the indices of living cells, optionally of a single type.
+
+        The result is cached until the next birth or death, so steady-state ticks
+        do not rebuild it. It must not be modified in place.
+
+        Args:
+            cell_type (int | None): A CellType code to filter by.
+
+        Returns:
+            np.ndarray: The indices of the matching cells.
+        """
+        indices = self._index_cache.get(cell_type)
+        if indices is None:
+            mask = self.alive[: self.size]
+            if cell_type is not None:
+                mask = mask & (self.type_code[: self.size] == cell_type)
+            indices = np.flatnonzero(mask)
+            self._index_cache[cell_type] = indices
+        return indices
+
+    def genome(self, index: int) -> np.ndarray:
+        """
+        Return the genome of a cell as a read-only view into the genome pool.
+
+        Args:
+            index (int): The index of the cell.
+
+        Returns:
+            np.ndarray: The genome bytes of the cell, empty if it has none.
+        """
+        handle = self.genome_handle[index]
+        if handle == NO_GENOME:
+            return np.empty(0, dtype=np.uint8)
+        return self.genomes.get(handle)
+
+    def set_genome(self, index: int, genome) -> None:
+        """
+        Replace the genome of a cell. The pooled row is copied on write, so cells
+        sharing the old genome are unaffected.
+
+        Args:
+            index (int): The index of the cell.
+            genome: A sequence of GENOME_LENGTH gene values in the range 0-255.
+        """
+        self.genome_handle[index] = self.genomes.write(
+            self.genome_handle[index], genome
+        )
+
+    def view(self, index: int) -> "CellView":
+        """
+        Return a proxy object exposing the BaseCell API for one cell.
+
+        Args:
+            index (int): The index of the cell.
+
+        Returns:
+            CellView: The proxy for the cell.
+        """
+        return CellView(self, index)
+
+
+class CellView:
+    """
+    The CellView class is a thin proxy over one slot of a CellStore. It exposes the
+    BaseCell API so that per-cell code keeps working while the data lives in columns.
+    """
+
+    __slots__ = ("store", "index")
+
+    def __init__(self, store: CellStore, index: int):
+        """
+        Initialize a view.
+
+        Args:
+            store (CellStore): The store holding the cell.
+            index (int): The index of the cell in the store.
+        """
+        self.store = store
+        self.index = index
+
+    @property
+    def cell_type(self) -> CellType:
+        """
+        The type of the cell.
+        """
+        return CellType(self.store.type_code[self.index])
+
+    @property
+    def position(self) -> tuple[int, int]:
+        """
+        The (x, y) position of the cell on the grid.
+        """
+        return int(self.store.x[self.index]), int(self.store.y[self.index])
+
+    @position.setter
+    def position(self, new_position: tuple[int, int]) -> None:
+        self.store.x[self.index], self.store.y[self.index] = new_position
+        # Indexes built over the cached alive indices are rebuilt after a move
+        self.store._index_cache.clear()
+
+    @property
+    def energy(self) -> float:
+        """
+        The energy level of the cell.
+        """
+        return float(self.store.energy[self.index])
+
+    @energy.setter
+    def energy(self, value: float) -> None:
+        self.store.energy[self.index] = value
+
+    @property
+    def alive(self) -> bool:
+        """
+        Whether the cell is alive.
+        """
+        return bool(self.store.alive[self.index])
+
+    @property
+    def connection(self) -> int:
+        """
+        The index of the cell this cell feeds into, or NO_CONNECTION.
+        """
+        return int(self.store.connection[self.index])
+
+    @property
+    def state(self) -> int:
+        """
+        The per-type state of the cell, e.g. an AntennaMode.
+        """
+        return int(self.store.state[self.index])
+
+    @property
+    def genome(self) -> list[int]:
+        """
+        The genome of the cell as a list of integers.
+        """
+        return self.store.genome(self.index).tolist()
+
+    def move(self, new_position: tuple[int, int]) -> None:
+        """
+        Move the cell to a new position.
+
+        Args:
+            new_position (tuple[int, int]): The new (x, y) position of the cell.
+        """
+        self.position = new_position
+
+    def consume_energy(self, amount: float) -> None:
+        """
+        Consume a specified amount of energy.
+
+        Args:
+            amount (float): The amount of energy to be consumed.
+        """
+        energy = self.store.energy[self.index] - amount
+        self.store.energy[self.index] = energy if energy > 0 else 0
+
+    def add_energy(self, amount: float) -> None:
+        """
+        Add a specified amount of energy.
+
+        Args:
+            amount (float): The amount of energy to be added.
+        """
+        self.store.energy[self.index] += amount
+
+    def info(self) -> dict:
+        """
+        Return the current state information of the cell.
+
+        Returns:
+            dict: A dictionary containing the cell's position, energy, and genome.
+        """
+        return {
+            "position": self.position,
+            "energy": self.energy,
+            "genome": self.genome,
+        }
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, CellView)
+            and other.store is self.store
+            and other.index == self.index
+        )
+
+    def __hash__(self) -> int:
+        return hash((id(self.store), self.index))
+
+    def __repr__(self) -> str:
+        return f"CellView({self.cell_type.name}, index={self.index})"
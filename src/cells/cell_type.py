@@ -0,0 +1,31 @@
+# src/cells/cell_type.py
+
+from enum import IntEnum
+
+
+class CellType(IntEnum):
+    """
+    Compact integer codes for each cell type, used by the array-backed grid and
+    cell storage. Code 0 is reserved for an empty grid position.
+    """
+
+    EMPTY = 0
+    LEAF = 1
+    ROOT = 2
+    CONDUIT = 3
+    ANTENNA = 4
+    BRAIN = 5
+    SEED = 6
+
+
+# Number of codes, including EMPTY; handy for sizing lookup tables and bincounts.
+NUM_CELL_TYPES = len(CellType)
+
+
+class AntennaMode(IntEnum):
+    """
+    State codes of an antenna cell, stored in the CellStore state column.
+    """
+
+    ENERGY_GATHERER = 0
+    COMMUNICATION_HANDLER = 1
@@ -1,7 +1,7 @@
 # src/cells/conduit_cell.py
 
-from typing import Tuple, Optional
-from src.cells.base_cell import BaseCell
+from typing import Callable, Tuple, Optional
+from src.cells.base_cell import BaseCell, merge_signals
 from src.cells.brain_cell import BrainCell
 
 
@@ -22,6 +22,17 @@ class ConduitCell(BaseCell):
         super().__init__(position, energy)
         self.connected_brain: Optional[BrainCell] = None
         self.next_conduit: Optional[ConduitCell] = None
+        self.death_observers: list[Callable[["ConduitCell"], None]] = []
+        self.signals: dict = {}  # Signals waiting to be forwarded, by band
+
+    def initialize_genome(self) -> list:
+        """
+        Initialize the genome of the conduit cell. Conduit cells do not need a genome.
+
+        Returns:
+            list: An empty genome list as it's not applicable for conduit cells.
+        """
+        return []
 
     def perform_action(self) -> None:
         """
@@ -49,8 +60,7 @@ class ConduitCell(BaseCell):
         Args:
             signals (dict): A dictionary of signals.
         """
-        # For now, assume signals are simply stored or forwarded
-        pass  # Logic for handling received signals would go here
+        merge_signals(self.signals, signals)
 
     def receive_and_forward(self) -> None:
         """
@@ -63,8 +73,8 @@ class ConduitCell(BaseCell):
         elif self.connected_brain:
             self.connected_brain.add_energy(energy_amount)
 
-        # Forward signals (assuming we have some signals to forward)
-        signals = {}  # Example signals
+        # Forward the signals received since the last action
+        signals, self.signals = self.signals, {}
         if self.next_conduit:
             self.next_conduit.receive_signals(signals)
         elif self.connected_brain:
@@ -88,6 +98,15 @@ class ConduitCell(BaseCell):
         """
         self.next_conduit = next_conduit
 
+    def add_death_observer(self, observer: Callable[["ConduitCell"], None]) -> None:
+        """
+        Register a callable to be notified when this ConduitCell dies.
+
+        Args:
+            observer (Callable[[ConduitCell], None]): Called with the dead conduit.
+        """
+        self.death_observers.append(observer)
+
     def move(self, new_position: Tuple[int, int]) -> None:
         """
         Override `move` method to prevent the cell from moving.
@@ -101,8 +120,13 @@ class ConduitCell(BaseCell):
         """
         Actions to perform when the ConduitCell dies.
         """
+        was_alive = self.alive
+        self.alive = False
         self.release_organic_matter()
         self.release_energy()
+        if was_alive:
+            for observer in self.death_observers:
+                observer(self)
 
     def release_organic_matter(self) -> None:
         """
@@ -0,0 +1,212 @@
+# src/cells/kernels.py
+
+import numpy as np
+
+from src.cells.cell_store import CellStore, NO_CONNECTION
+from src.cells.cell_type import AntennaMode, CellType
+from src.dynamics.genetic import GENOME_LENGTH, NO_GENOME
+from src.dynamics.phenotype import SEGMENTS, PhenotypeDecoder
+
+# Placeholder field values, matching LeafCell.get_sunlight_intensity and
+# RootCell.get_organic_matter_concentration.
+DEFAULT_SUNLIGHT_INTENSITY = 0.8
+DEFAULT_ORGANIC_MATTER_CONCENTRATION = 0.7
+
+# Conversion factors, matching the per-object generate_energy implementations.
+LEAF_ENERGY_FACTOR = 10.0
+ROOT_ENERGY_FACTOR = 5.0
+ANTENNA_GATHERED_ENERGY = 10.0
+
+# Brain costs and offspring, matching BrainCell.perform_action and create_cell.
+BRAIN_ACTION_COST = 10.0
+OFFSPRING_ENERGY = 100.0
+
+# Number of build and direction genes of a genome, read in a cycle by the brains.
+BUILD_GENES = SEGMENTS["build"].stop - SEGMENTS["build"].start
+DIRECTION_GENES = SEGMENTS["directions"].stop - SEGMENTS["directions"].start
+
+# Build steps after which both cycles repeat; brains keep their build step modulo
+# it in the state column.
+BUILD_CYCLE = int(np.lcm(BUILD_GENES, DIRECTION_GENES))
+
+
+def gather(field, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    """
+    Sample a per-pixel field at many positions.
+
+    Args:
+        field: A (height, width) array indexed as field[y, x], or a scalar used
+            for every position.
+        xs (np.ndarray): The x coordinates.
+        ys (np.ndarray): The y coordinates.
+
+    Returns:
+        np.ndarray: The sampled values as float64.
+    """
+    if np.ndim(field) == 0:
+        return np.full(len(xs), field, dtype=np.float64)
+    return field[ys, xs].astype(np.float64)
+
+
+def split_connected(store: CellStore, indices: np.ndarray):
+    """
+    Split cells into those with a connection and those without.
+
+    Args:
+        store (CellStore): The store holding the cells.
+        indices (np.ndarray): The indices of the cells.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The connected and the unconnected indices.
+    """
+    connected = store.connection[indices] != NO_CONNECTION
+    return indices[connected], indices[~connected]
+
+
+def push_energy(store: CellStore, indices: np.ndarray, amounts: np.ndarray) -> None:
+    """
+    Add energy to the cells that the given cells are connected to.
+
+    Several cells may feed the same target; their contributions accumulate in
+    index order, like successive receive_energy calls. The amounts are also added
+    to the senders' harvested column, which the evolution engine drains.
+
+    Args:
+        store (CellStore): The store holding the cells.
+        indices (np.ndarray): The indices of the sending cells.
+        amounts (np.ndarray): The energy sent by each cell.
+    """
+    np.add.at(store.energy, store.connection[indices], amounts)
+    store.harvested[indices] += amounts
+
+
+def leaf_tick(
+    store: CellStore, sunlight=DEFAULT_SUNLIGHT_INTENSITY, canopy=1.0
+) -> np.ndarray:
+    """
+    Run LeafCell.perform_action for every living leaf cell in one pass.
+
+    Args:
+        store (CellStore): The store holding the cells.
+        sunlight: The sunlight intensity field, or a scalar intensity.
+        canopy: The fraction of the sunlight reaching each pixel through the
+            cells above it, see CanopyMap, or a scalar fraction.
+
+    Returns:
+        np.ndarray: The indices of unconnected leaf cells, which should die.
+    """
+    connected, unconnected = split_connected(store, store.alive_indices(CellType.LEAF))
+    xs, ys = store.x[connected], store.y[connected]
+    intensity = gather(sunlight, xs, ys)
+    if np.ndim(canopy):
+        intensity *= gather(canopy, xs, ys)
+    else:
+        intensity *= canopy
+    push_energy(store, connected, intensity * LEAF_ENERGY_FACTOR)
+    return unconnected
+
+
+def root_tick(
+    store: CellStore, organic_matter=DEFAULT_ORGANIC_MATTER_CONCENTRATION
+) -> np.ndarray:
+    """
+    Run RootCell.perform_action for every living root cell in one pass.
+
+    Args:
+        store (CellStore): The store holding the cells.
+        organic_matter: The organic matter field, or a scalar concentration.
+
+    Returns:
+        np.ndarray: The indices of unconnected root cells, which should die.
+    """
+    connected, unconnected = split_connected(store, store.alive_indices(CellType.ROOT))
+    concentration = gather(organic_matter, store.x[connected], store.y[connected])
+    push_energy(store, connected, concentration * ROOT_ENERGY_FACTOR)
+    return unconnected
+
+
+def antenna_tick(store: CellStore) -> np.ndarray:
+    """
+    Run AntennaCell.perform_action for every living antenna cell in one pass.
+
+    Antennas in energy gatherer mode keep the gathered energy and also send it to
+    their conduit, as AntennaCell.gather_energy does.
+
+    Args:
+        store (CellStore): The store holding the cells.
+
+    Returns:
+        np.ndarray: The indices of unconnected antenna cells, which should die.
+    """
+    connected, unconnected = split_connected(
+        store, store.alive_indices(CellType.ANTENNA)
+    )
+    gatherers = connected[store.state[connected] == AntennaMode.ENERGY_GATHERER]
+    store.energy[gatherers] += ANTENNA_GATHERED_ENERGY
+    push_energy(store, gatherers, np.full(len(gatherers), ANTENNA_GATHERED_ENERGY))
+    return unconnected
+
+
+def brain_tick(store: CellStore) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Run the energy part of BrainCell.perform_action for every living brain cell.
+
+    Every brain pays its action cost; brains left with energy create a new cell,
+    see brain_builds, and brains left without energy die. Creating the new cells
+    is left to the caller, which knows about the grid.
+
+    Args:
+        store (CellStore): The store holding the cells.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The indices of the brains that create a
+            new cell, and the indices of the brains that should die.
+    """
+    brains = store.alive_indices(CellType.BRAIN)
+    energy = np.maximum(store.energy[brains] - BRAIN_ACTION_COST, 0)
+    store.energy[brains] = energy
+    active = energy > 0
+    return brains[active], brains[~active]
+
+
+def brain_builds(
+    store: CellStore, brains: np.ndarray, decoder: PhenotypeDecoder
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Run the cell choice of BrainCell.create_cell for many brains: the type and
+    position of the cell each brain creates at its build step, read from the
+    phenotype of its genome. The build step of the brains is advanced.
+
+    Phenotypes are looked up by genome handle in the decoder, see
+    PhenotypeDecoder.programs, so a genome is only compiled on a cache miss.
+    Brains without a genome build as the all-zero genome does: a leaf behind
+    them.
+
+    Args:
+        store (CellStore): The store holding the cells.
+        brains (np.ndarray): The indices of the brains creating a cell.
+        decoder (PhenotypeDecoder): The decoder caching the phenotypes.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: The CellType code, x and y
+            coordinates of each new cell.
+    """
+    steps = store.state[brains].astype(np.intp)
+    store.state[brains] = (steps + 1) % BUILD_CYCLE
+    handles = store.genome_handle[brains]
+    with_genome = handles != NO_GENOME
+    builds, directions = decoder.programs(store.genomes, handles[with_genome])
+    steps, known_steps = steps[~with_genome], steps[with_genome]
+
+    types = np.empty(len(brains), dtype=np.uint8)
+    offsets = np.empty((len(brains), 2), dtype=np.int8)
+    rows = np.arange(len(builds))
+    types[with_genome] = builds[rows, known_steps % BUILD_GENES]
+    offsets[with_genome] = directions[rows, known_steps % DIRECTION_GENES]
+    if len(steps):
+        zero = decoder.decode(np.zeros(GENOME_LENGTH, dtype=np.uint8))
+        types[~with_genome] = zero.build[steps % BUILD_GENES]
+        offsets[~with_genome] = zero.directions[steps % DIRECTION_GENES]
+    xs = store.x[brains] + offsets[:, 0]
+    ys = store.y[brains] + offsets[:, 1]
+    return types, xs, ys
@@ -8,8 +8,13 @@ class LeafCell(BaseCell):
     """
     The LeafCell class represents a cell type that performs photosynthesis to generate energy,
     which is then transferred to a connected conduit cell.
+
+    When a CanopyMap is attached to the class, the sunlight reaching a leaf is
+    shaded by the cells above it in its column.
     """
 
+    canopy = None  # A CanopyMap shared by all leaf cells, see get_sunlight_intensity
+
     def __init__(self, position: tuple[int, int], energy: float):
         """
         Initialize the leaf cell with position and energy.
@@ -17,6 +22,15 @@ class LeafCell(BaseCell):
         super().__init__(position, energy)
         self.connected_conduit: ConduitCell | None = None
 
+    def initialize_genome(self) -> list:
+        """
+        Initialize the genome of the leaf cell. Leaf cells do not need a genome.
+
+        Returns:
+            list: An empty genome list as it's not applicable for leaf cells.
+        """
+        return []
+
     def perform_action(self) -> None:
         """
         Perform the leaf cell's action, which includes generating energy and
@@ -50,8 +64,9 @@ class LeafCell(BaseCell):
         Returns:
             float: The intensity of sunlight.
         """
-        # Implement the logic to get the sunlight intensity at the current position
         sunlight_intensity = 0.8  # Example value for demonstration
+        if LeafCell.canopy is not None:
+            sunlight_intensity *= LeafCell.canopy.transmittance_at(self.position)
         return sunlight_intensity
 
     def connect_to_conduit(self, conduit_cell: ConduitCell) -> None:
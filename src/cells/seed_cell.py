@@ -1,13 +1,13 @@
 # src/cells/seed_cell.py
 
 from src.cells.base_cell import BaseCell
-from src.cells.brain_cell import BrainCell
 
 
 class SeedCell(BaseCell):
     """
     The SeedCell class represents a dormant brain cell type that consumes very little energy. It is
-    connected to a ConduitCell and becomes a BrainCell when the ConduitCell dies.
+    connected to a ConduitCell and becomes a BrainCell when the ConduitCell dies; it is notified
+    of the death by the ConduitCell rather than checking it on every tick.
     """
 
     def __init__(
@@ -22,9 +22,12 @@ class SeedCell(BaseCell):
             genome (list[int]): The genome structure represented by a list of integers.
             conduit_cell: A reference to the associated ConduitCell.
         """
-        super().__init__(position, energy)
+        # Set before BaseCell.__init__, which calls initialize_genome
         self.genome = genome
+        super().__init__(position, energy)
         self.conduit_cell = conduit_cell
+        self.brain_cell = None
+        conduit_cell.add_death_observer(self.on_conduit_death)
 
     def initialize_genome(self) -> list[int]:
         """
@@ -40,26 +43,37 @@ class SeedCell(BaseCell):
         """
         Perform the SeedCell's specific action based on its state.
 
-        Checks the state of the associated ConduitCell.
-        If the ConduitCell is dead, transitions this SeedCell to a BrainCell.
-        Consumes a minimal amount of energy.
+        Consumes a minimal amount of energy. The transition to a BrainCell is
+        triggered by on_conduit_death.
         """
-        # Check if the connected ConduitCell is dead
-        if not self.conduit_cell.alive:
-            self.become_brain_cell()
-
         # Minimal energy consumption
         self.consume_energy(0.1)
 
-    def become_brain_cell(self) -> None:
+    def on_conduit_death(self, conduit_cell) -> None:
+        """
+        Germinate when the associated ConduitCell dies.
+
+        Args:
+            conduit_cell: The ConduitCell that died.
+        """
+        if self.alive and self.brain_cell is None:
+            self.brain_cell = self.become_brain_cell()
+
+    def become_brain_cell(self):
         """
         Transition the SeedCell to a BrainCell.
+
+        Returns:
+            BrainCell: The new brain cell.
         """
         # Implement the logic for transforming this cell into a BrainCell.
-        # Assuming there is a BrainCell class that we can import and use.
+        # Imported here as BrainCell itself depends on SeedCell.
+        from src.cells.brain_cell import BrainCell
 
-        new_brain_cell = BrainCell(self.position, self.energy, self.genome)
+        new_brain_cell = BrainCell(self.position, self.energy)
+        new_brain_cell.genome = self.genome
         # Additional logic might be required to replace this cell in the grid structure
+        return new_brain_cell
 
     def info(self) -> dict:
         """
@@ -0,0 +1,165 @@
+# src/core/canopy.py
+
+import numpy as np
+
+from src.cells.cell_type import NUM_CELL_TYPES, CellType
+
+# Fraction of the light passing through a pixel, indexed by CellType code. Leaves
+# absorb most of it; seeds and brains match so that germination casts no change.
+CANOPY_TRANSMITTANCE = np.ones(NUM_CELL_TYPES, dtype=np.float32)
+CANOPY_TRANSMITTANCE[CellType.LEAF] = 0.6
+CANOPY_TRANSMITTANCE[CellType.ROOT] = 0.9
+CANOPY_TRANSMITTANCE[CellType.CONDUIT] = 0.9
+CANOPY_TRANSMITTANCE[CellType.ANTENNA] = 0.8
+CANOPY_TRANSMITTANCE[CellType.BRAIN] = 0.8
+CANOPY_TRANSMITTANCE[CellType.SEED] = 0.8
+
+# Fraction of dirty columns above which the whole map is recomputed at once.
+FULL_RECOMPUTE_FRACTION = 0.5
+
+
+class CanopyMap:
+    """
+    The CanopyMap class maintains the shading of every pixel by the cells above it
+    in its column, as a "canopy" layer of the world's grid. Light enters at row 0
+    and each occupied pixel passes on a fraction of it given by the type of its
+    cell, so the layer holds the fraction of the light reaching each pixel, not
+    counting the cell on it.
+
+    Recomputing a column costs O(height), so the map is updated incrementally:
+    only the columns where a cell was born, died or moved since the last update
+    are recomputed. Births and deaths are tracked from the "cell_birth" and
+    "cell_death" topics of an event queue; cells placed or moved outside the
+    lifecycle must be reported with mark_dirty.
+    """
+
+    def __init__(
+        self,
+        world,
+        events=None,
+        transmittance: np.ndarray = CANOPY_TRANSMITTANCE,
+        full_recompute_fraction: float = FULL_RECOMPUTE_FRACTION,
+    ):
+        """
+        Initialize the map from the current grid.
+
+        Args:
+            world (World): The world whose grid is shaded.
+            events (EventQueue | None): The queue emitting the lifecycle topics.
+            transmittance (np.ndarray): The fraction of light passing through
+                each CellType code.
+            full_recompute_fraction (float): The fraction of dirty columns above
+                which the whole map is recomputed.
+        """
+        self.world = world
+        self.grid = world.grid
+        self.transmittance = np.asarray(transmittance, dtype=np.float32)
+        self._transmittance = self.transmittance.astype(np.float64)
+        self.full_recompute_fraction = full_recompute_fraction
+        if "canopy" not in self.grid.layers:
+            self.grid.add_layer("canopy", fill=1)
+        self.dirty = np.zeros(self.grid.width, dtype=bool)
+        self.updates = 0
+        self.columns_recomputed = 0
+        self.recompute()
+        if events is not None:
+            events.subscribe("cell_birth", self.on_birth)
+            events.subscribe("cell_death", self.on_death)
+
+    @property
+    def layer(self) -> np.ndarray:
+        """
+        The (height, width) fraction of light reaching each pixel.
+        """
+        return self.grid.layers["canopy"]
+
+    def mark_dirty(self, xs) -> None:
+        """
+        Mark columns whose cells changed, to be recomputed on the next update.
+
+        Args:
+            xs: The x coordinates of the changed pixels, an array or a single one.
+        """
+        self.dirty[xs] = True
+
+    def on_birth(self, born: np.ndarray, parents: np.ndarray) -> None:
+        """
+        Mark the columns of newborn cells, as the "cell_birth" observer.
+
+        Args:
+            born (np.ndarray): The indices of the newborn cells.
+            parents (np.ndarray): The indices of their parent brains.
+        """
+        self.dirty[self.world.cells.x[born]] = True
+
+    def on_death(self, dead: np.ndarray) -> None:
+        """
+        Mark the columns of dead cells, as the "cell_death" observer.
+
+        Args:
+            dead (np.ndarray): The indices of the cells that died.
+        """
+        self.dirty[self.world.cells.x[dead]] = True
+
+    def _shade(self, cell_types: np.ndarray, out: np.ndarray) -> None:
+        # Exclusive product down each column: a pixel is shaded by the cells
+        # above it, not by its own. The product is taken in float64, as deep
+        # float32 canopies underflow into denormals, which are very slow
+        passed = np.cumprod(self._transmittance[cell_types], axis=0)
+        out[0] = 1
+        out[1:] = passed[:-1]
+
+    def recompute(self) -> None:
+        """
+        Recompute every column of the map.
+        """
+        self._shade(self.grid.cell_type, self.layer)
+        self.dirty[:] = False
+        self.columns_recomputed += self.grid.width
+
+    def update(self) -> int:
+        """
+        Recompute the columns marked dirty since the last update.
+
+        Returns:
+            int: The number of columns recomputed.
+        """
+        self.updates += 1
+        columns = np.flatnonzero(self.dirty)
+        if len(columns) == 0:
+            return 0
+        if len(columns) > self.full_recompute_fraction * self.grid.width:
+            self.recompute()
+            return self.grid.width
+        shade = np.empty((self.grid.height, len(columns)), dtype=np.float64)
+        self._shade(self.grid.cell_type[:, columns], shade)
+        self.layer[:, columns] = shade
+        self.dirty[columns] = False
+        self.columns_recomputed += len(columns)
+        return len(columns)
+
+    def gather(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        Return the fraction of light reaching many positions.
+
+        Args:
+            xs (np.ndarray): The x coordinates.
+            ys (np.ndarray): The y coordinates.
+
+        Returns:
+            np.ndarray: The fractions as float64.
+        """
+        return self.layer[ys, xs].astype(np.float64)
+
+    def transmittance_at(self, position: tuple[int, int]) -> float:
+        """
+        Return the fraction of light reaching a position.
+
+        Args:
+            position (tuple[int, int]): The (x, y) position.
+
+        Returns:
+            float: The fraction, in the range [0, 1].
+        """
+        x, y = position
+        return float(self.layer[y, x])
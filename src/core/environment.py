@@ -1,8 +1,8 @@
 # src/core/environment.py
-import random
+import numpy as np
 
 from src.core.world import World
-from src.core.sector import Sector
+from src.core.sector import WEATHER_EVENTS, Sector
 
 
 class Environment:
@@ -20,6 +20,8 @@ class Environment:
         self.world = world
         self.ecological_niches = {}
         self.weather_events = {}
+        self.events = None
+        self.weather_probability = 0.1
 
     def define_ecological_niches(self):
         """
@@ -41,14 +43,53 @@ class Environment:
 
         # Additional ecological niches can be added here
 
+    def schedule_weather_events(self, events, probability=0.1, start=0):
+        """
+        Fire weather events from an event queue instead of polling every sector.
+
+        A single queue entry covers every sector: the gap until any sector has an
+        event is geometric with the chance that at least one does.
+
+        Args:
+            events (EventQueue): The event queue driving the simulation.
+            probability (float): The per-tick chance of a weather event in a sector.
+            start (int): The first tick on which events may fire.
+        """
+        self.events = events
+        self.weather_probability = probability
+        any_event = 1 - (1 - probability) ** len(self.world.sectors)
+        events.schedule_geometric(any_event, self.fire_weather_events, start=start)
+
+    def fire_weather_events(self):
+        """
+        Apply the weather events of a tick on which at least one sector is hit.
+        """
+        self.world.sector_state.random_weather(
+            self.world.rng.stream("weather"),
+            self.weather_probability,
+            at_least_one=True,
+        )
+
     def handle_weather_events(self):
         """
         Simulate weather events and their impact on the environment.
         """
-        for sector in self.world.sectors:
-            if random.random() < 0.1:  # 10% chance of a weather event
-                event_type = random.choice(["storm", "drought", "heatwave"])
-                self.apply_weather_event(sector, event_type)
+        if self.events is not None:
+            return  # Fired by the event queue, see schedule_weather_events
+        # One batched draw and one masked update for all sectors
+        self.world.sector_state.random_weather(
+            self.world.rng.stream("weather"), self.weather_probability
+        )
+
+    def random_weather_event(self, sector: Sector):
+        """
+        Apply a randomly chosen weather event to a sector.
+
+        Args:
+            sector (Sector): The sector affected by the weather event.
+        """
+        event_type = WEATHER_EVENTS[sector.rng.integers(0, len(WEATHER_EVENTS))]
+        self.apply_weather_event(sector, event_type)
 
     def apply_weather_event(self, sector: Sector, event_type: str):
         """
@@ -58,15 +99,9 @@ class Environment:
             sector (Sector): The sector affected by the weather event.
             event_type (str): The type of weather event ('storm', 'drought', 'heatwave').
         """
-        if event_type == "storm":
-            sector.rainfall += 20
-            sector.sunlight_exposure -= 10
-        elif event_type == "drought":
-            sector.rainfall -= 20
-            sector.temperature += 5
-        elif event_type == "heatwave":
-            sector.temperature += 10
-            sector.sunlight_exposure += 5
+        sector.state.apply_weather(
+            np.array([sector.index]), np.array([WEATHER_EVENTS.index(event_type)])
+        )
 
     def update_environment(self):
         """
@@ -0,0 +1,254 @@
+# src/core/fields.py
+
+import numpy as np
+
+from src.cells.kernels import DEFAULT_ORGANIC_MATTER_CONCENTRATION, gather
+from src.core.diffusion import (
+    add_upsampled,
+    block_areas,
+    diffuse_fft,
+    diffuse_stencil,
+    diffuse_weighted,
+    downsample,
+)
+
+# Names of the continuous per-pixel fields, all layers of the world's grid.
+FIELDS = ("light", "organic_matter", "toxicity", "moisture")
+
+# Fields spread by the diffusion solver, with their default per-tick rates.
+DIFFUSION_RATES = {"organic_matter": 0.05, "toxicity": 0.1, "moisture": 0.02}
+
+# Diffusion solvers, see src/core/diffusion.py.
+SOLVERS = {"stencil": diffuse_stencil, "fft": diffuse_fft}
+
+# Default block size of the diffusion grid and ticks between two updates.
+DEFAULT_RESOLUTION = 4
+DEFAULT_INTERVAL = 10
+
+# Sector sunlight exposure and rainfall giving a light and moisture of 1.
+SUNLIGHT_SCALE = 100.0
+RAINFALL_SCALE = 20.0
+
+# Organic matter above which a pixel produces toxins, and the production and
+# decay rates of the toxins per tick.
+TOXIN_THRESHOLD = 2.0
+TOXIN_PRODUCTION = 0.01
+TOXIN_DECAY = 0.001
+
+# Fraction of the gap to the sector rainfall closed by the moisture per tick.
+MOISTURE_RELAXATION = 0.1
+
+
+class EnvironmentFields:
+    """
+    The EnvironmentFields class maintains continuous per-pixel environment fields
+    on the world's grid: light, organic matter, toxicity and moisture.
+
+    Light follows the sunlight exposure of the pixel's sector and moisture relaxes
+    towards its rainfall, so weather stays a sector-level process while its
+    effects blend across sector borders. Organic matter above a threshold produces
+    toxins, which decay. Organic matter, toxins and moisture diffuse with either
+    the explicit 5-point stencil or the FFT solver.
+
+    The fields are updated every `interval` ticks, advancing `interval` ticks of
+    sources and diffusion at once, and diffusion can run on a grid coarsened by
+    `resolution`. The coarse solve diffuses block means and adds the change back
+    to the full field, so mass is conserved and sub-block detail is kept; only
+    its spreading is approximated. When the grid is not a whole number of blocks,
+    the smaller edge blocks are weighted by their area with diffuse_weighted,
+    whatever the solver. Cells sample the fields in bulk with gather.
+    """
+
+    def __init__(
+        self,
+        world,
+        resolution: int = DEFAULT_RESOLUTION,
+        interval: int = DEFAULT_INTERVAL,
+        solver: str = "stencil",
+        diffusion_rates: dict[str, float] | None = None,
+        organic_matter: float = DEFAULT_ORGANIC_MATTER_CONCENTRATION,
+    ):
+        """
+        Initialize the fields, adding the missing layers to the world's grid.
+
+        Args:
+            world (World): The world whose grid holds the fields.
+            resolution (int): The block size of the diffusion grid, 1 for full
+                resolution.
+            interval (int): The number of ticks between two updates.
+            solver (str): The diffusion solver, "stencil" or "fft".
+            diffusion_rates (dict[str, float] | None): The per-tick diffusion rate
+                of each diffusing field; DIFFUSION_RATES if omitted.
+            organic_matter (float): The initial organic matter of every pixel,
+                used when the grid has no organic matter yet.
+        """
+        if solver not in SOLVERS:
+            raise ValueError(f"Unknown solver '{solver}', expected one of {SOLVERS}")
+        if resolution < 1 or interval < 1:
+            raise ValueError("Resolution and interval must be at least 1")
+        self.world = world
+        self.grid = world.grid
+        self.resolution = resolution
+        self.interval = interval
+        self.solver = solver
+        self.diffusion_rates = dict(
+            DIFFUSION_RATES if diffusion_rates is None else diffusion_rates
+        )
+        self.updates = 0
+
+        grid = self.grid
+        for name in FIELDS:
+            if name not in grid.layers:
+                grid.add_layer(name)
+        if not grid.layers["organic_matter"].any():
+            grid.layers["organic_matter"][:] = organic_matter
+
+        # Sector of each pixel row and column, see SpatialIndex.sector_indices
+        index = world.index
+        last = world.num_sectors - 1
+        self._sector_rows = np.minimum(
+            np.arange(grid.height) // index.bucket_height, last
+        )
+        self._sector_cols = np.minimum(
+            np.arange(grid.width) // index.bucket_width, last
+        )
+
+    def layer(self, name: str) -> np.ndarray:
+        """
+        Return a field by name. Fields are looked up on every call, so a layer
+        replaced on the grid, e.g. by add_layer, is picked up.
+
+        Args:
+            name (str): One of FIELDS.
+
+        Returns:
+            np.ndarray: The (height, width) field.
+        """
+        return self.grid.layers[name]
+
+    def _sector_values(self, values: np.ndarray) -> np.ndarray:
+        # Spread one value per sector over its pixels. Sector i * n + j covers
+        # column bucket i and row bucket j, so the (n, n) table is transposed
+        n = self.world.num_sectors
+        table = values.reshape(n, n).T
+        return table.take(self._sector_rows, axis=0).take(self._sector_cols, axis=1)
+
+    def update(self, tick: int) -> bool:
+        """
+        Update the fields if an update is due on this tick.
+
+        Args:
+            tick (int): The current tick.
+
+        Returns:
+            bool: True if the fields were updated.
+        """
+        if tick % self.interval:
+            return False
+        self.advance(self.interval)
+        return True
+
+    def advance(self, ticks: int) -> None:
+        """
+        Advance the sources and diffusion of the fields by a number of ticks.
+
+        Args:
+            ticks (int): The number of ticks to advance.
+        """
+        state = self.world.sector_state
+        light = self.layer("light")
+        sunlight = np.clip(state.sunlight_exposure / SUNLIGHT_SCALE, 0, 1)
+        light[:] = self._sector_values(sunlight)
+
+        moisture = self.layer("moisture")
+        closed = 1 - (1 - MOISTURE_RELAXATION) ** ticks
+        gap = self._sector_values(state.rainfall / RAINFALL_SCALE).astype(np.float32)
+        gap -= moisture
+        gap *= np.float32(closed)
+        moisture += gap
+
+        organic_matter = self.layer("organic_matter")
+        toxicity = self.layer("toxicity")
+        excess = organic_matter - organic_matter.dtype.type(TOXIN_THRESHOLD)
+        np.maximum(excess, 0, out=excess)
+        excess *= excess.dtype.type(TOXIN_PRODUCTION * ticks)
+        toxicity *= toxicity.dtype.type((1 - TOXIN_DECAY) ** ticks)
+        toxicity += excess
+
+        for name, rate in self.diffusion_rates.items():
+            if rate > 0:
+                self.diffuse(self.layer(name), rate, ticks)
+        self.updates += 1
+
+    def diffuse(self, field: np.ndarray, rate: float, ticks: int = 1) -> None:
+        """
+        Diffuse a field in place, on the coarse grid if resolution > 1.
+
+        Args:
+            field (np.ndarray): The (height, width) field.
+            rate (float): The per-tick diffusion rate on the full grid.
+            ticks (int): The number of ticks to advance.
+        """
+        solve = SOLVERS[self.solver]
+        factor = self.resolution
+        if factor == 1:
+            solve(field, rate, ticks)
+            return
+        # Blocks are `factor` pixels wide, so the same spread takes factor**2
+        # less diffusion on the coarse grid
+        coarse = downsample(field, factor)
+        before = coarse.copy()
+        height, width = field.shape
+        if height % factor or width % factor:
+            # Equal-weight solvers would not conserve the mass of smaller blocks
+            areas = block_areas(field.shape, factor) / factor**2
+            diffuse_weighted(coarse, areas, rate / factor**2, ticks)
+        else:
+            solve(coarse, rate / factor**2, ticks)
+        add_upsampled(field, coarse - before, factor)
+
+    def gather(self, name: str, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        Sample a field at many positions.
+
+        Args:
+            name (str): One of FIELDS.
+            xs (np.ndarray): The x coordinates.
+            ys (np.ndarray): The y coordinates.
+
+        Returns:
+            np.ndarray: The sampled values as float64.
+        """
+        return gather(self.layer(name), xs, ys)
+
+    def gather_many(self, names, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        Sample several fields at many positions, computing the pixel offsets once.
+
+        Args:
+            names: The names of the fields.
+            xs (np.ndarray): The x coordinates.
+            ys (np.ndarray): The y coordinates.
+
+        Returns:
+            np.ndarray: A (len(names), len(xs)) float64 array of samples.
+        """
+        offsets = ys.astype(np.intp) * self.grid.width + xs
+        samples = np.empty((len(names), len(offsets)), dtype=np.float64)
+        for row, name in enumerate(names):
+            samples[row] = self.layer(name).ravel().take(offsets)
+        return samples
+
+    def gather_cells(self, name: str, store, indices: np.ndarray) -> np.ndarray:
+        """
+        Sample a field at the positions of cells of a CellStore.
+
+        Args:
+            name (str): One of FIELDS.
+            store (CellStore): The cell store.
+            indices (np.ndarray): The indices of the cells.
+
+        Returns:
+            np.ndarray: The sampled values as float64.
+        """
+        return self.gather(name, store.x[indices], store.y[indices])
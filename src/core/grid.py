@@ -0,0 +1,239 @@
+# src/core/grid.py
+
+import numpy as np
+
+from src.cells.cell_type import CellType
+
+# Value stored in the occupancy layer for positions that hold no cell.
+NO_CELL = -1
+
+
+class Grid:
+    """
+    The Grid class stores the world's per-pixel state as typed NumPy layers.
+
+    Occupancy is kept in two layers: `cell_id` (the index of the occupying cell,
+    or NO_CELL) and `cell_type` (a CellType code). Additional float fields such as
+    organic matter and soil energy live alongside them, all shaped (height, width)
+    and indexed as layer[y, x].
+    """
+
+    def __init__(self, width: int, height: int):
+        """
+        Initialize an empty grid.
+
+        Args:
+            width (int): The number of columns of the grid.
+            height (int): The number of rows of the grid.
+        """
+        self.width = width
+        self.height = height
+        self.cell_id = np.full((height, width), NO_CELL, dtype=np.int32)
+        self.cell_type = np.zeros((height, width), dtype=np.uint8)
+        self.layers: dict[str, np.ndarray] = {}
+        self.organic_matter = self.add_layer("organic_matter")
+        self.energy = self.add_layer("energy")
+
+    @classmethod
+    def from_layers(
+        cls, cell_id: np.ndarray, cell_type: np.ndarray, layers: dict[str, np.ndarray]
+    ) -> "Grid":
+        """
+        Build a grid around existing arrays, e.g. memory-mapped from a checkpoint.
+
+        Args:
+            cell_id (np.ndarray): The (height, width) occupancy layer.
+            cell_type (np.ndarray): The (height, width) cell type layer.
+            layers (dict[str, np.ndarray]): The per-pixel fields by name,
+                including "organic_matter" and "energy".
+
+        Returns:
+            Grid: The grid, holding the given arrays.
+        """
+        grid = cls.__new__(cls)
+        grid.height, grid.width = cell_id.shape
+        grid.cell_id = cell_id
+        grid.cell_type = cell_type
+        grid.layers = dict(layers)
+        grid.organic_matter = grid.layers["organic_matter"]
+        grid.energy = grid.layers["energy"]
+        return grid
+
+    def add_layer(
+        self, name: str, dtype: type = np.float32, fill: float = 0
+    ) -> np.ndarray:
+        """
+        Allocate a new per-pixel field.
+
+        Args:
+            name (str): The name of the layer.
+            dtype (type): The NumPy dtype of the layer.
+            fill (float): The initial value of every pixel.
+
+        Returns:
+            np.ndarray: The newly allocated (height, width) array.
+        """
+        if name in self.layers:
+            raise ValueError(f"Layer '{name}' already exists")
+        layer = np.full((self.height, self.width), fill, dtype=dtype)
+        self.layers[name] = layer
+        return layer
+
+    def in_bounds(self, position: tuple[int, int]) -> bool:
+        """
+        Check whether a position lies inside the grid.
+
+        Args:
+            position (tuple[int, int]): The (x, y) position to check.
+
+        Returns:
+            bool: True if the position is inside the grid.
+        """
+        x, y = position
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def get(self, position: tuple[int, int]) -> int:
+        """
+        Return the id of the cell occupying a position.
+
+        Args:
+            position (tuple[int, int]): The (x, y) position to look up.
+
+        Returns:
+            int: The cell id, or NO_CELL if the position is empty.
+        """
+        x, y = position
+        return int(self.cell_id[y, x])
+
+    def type_at(self, position: tuple[int, int]) -> CellType:
+        """
+        Return the type of the cell occupying a position.
+
+        Args:
+            position (tuple[int, int]): The (x, y) position to look up.
+
+        Returns:
+            CellType: The type code, CellType.EMPTY if the position is empty.
+        """
+        x, y = position
+        return CellType(self.cell_type[y, x])
+
+    def is_empty(self, position: tuple[int, int]) -> bool:
+        """
+        Check whether a position is free.
+
+        Args:
+            position (tuple[int, int]): The (x, y) position to check.
+
+        Returns:
+            bool: True if no cell occupies the position.
+        """
+        x, y = position
+        return self.cell_id[y, x] == NO_CELL
+
+    def place(self, position: tuple[int, int], cell_id: int, cell_type: int) -> None:
+        """
+        Mark a position as occupied.
+
+        Args:
+            position (tuple[int, int]): The (x, y) position of the cell.
+            cell_id (int): The id of the cell.
+            cell_type (int): The CellType code of the cell.
+        """
+        x, y = position
+        self.cell_id[y, x] = cell_id
+        self.cell_type[y, x] = cell_type
+
+    def clear(self, position: tuple[int, int]) -> None:
+        """
+        Mark a position as empty.
+
+        Args:
+            position (tuple[int, int]): The (x, y) position to clear.
+        """
+        x, y = position
+        self.cell_id[y, x] = NO_CELL
+        self.cell_type[y, x] = CellType.EMPTY
+
+    def place_many(
+        self, xs: np.ndarray, ys: np.ndarray, cell_ids: np.ndarray, cell_types
+    ) -> None:
+        """
+        Mark many positions as occupied in one operation.
+
+        Args:
+            xs (np.ndarray): The x coordinates.
+            ys (np.ndarray): The y coordinates.
+            cell_ids (np.ndarray): The ids of the cells.
+            cell_types: The CellType codes, either an array or a single code.
+        """
+        self.cell_id[ys, xs] = cell_ids
+        self.cell_type[ys, xs] = cell_types
+
+    def clear_many(self, xs: np.ndarray, ys: np.ndarray) -> None:
+        """
+        Mark many positions as empty in one operation.
+
+        Args:
+            xs (np.ndarray): The x coordinates.
+            ys (np.ndarray): The y coordinates.
+        """
+        self.cell_id[ys, xs] = NO_CELL
+        self.cell_type[ys, xs] = CellType.EMPTY
+
+    def remap_ids(self, remap: np.ndarray) -> None:
+        """
+        Rewrite the cell ids after the cell store was compacted.
+
+        Args:
+            remap (np.ndarray): The new id of each old id, or NO_CELL for removed
+                cells, as returned by CellStore.compact.
+        """
+        occupied = self.cell_id != NO_CELL
+        ids = remap[self.cell_id[occupied]]
+        self.cell_id[occupied] = ids
+        removed = occupied.copy()
+        removed[occupied] = ids == NO_CELL
+        self.cell_type[removed] = CellType.EMPTY
+
+    def region(self, x: int, y: int, width: int, height: int, layer: str = "cell_id"):
+        """
+        Return a view of a rectangular region of a layer.
+
+        The view shares memory with the grid, so writes to it update the grid.
+
+        Args:
+            x (int): The left column of the region.
+            y (int): The top row of the region.
+            width (int): The width of the region.
+            height (int): The height of the region.
+            layer (str): "cell_id", "cell_type" or the name of a field layer.
+
+        Returns:
+            np.ndarray: A (height, width) view of the layer.
+        """
+        return self.layer(layer)[y : y + height, x : x + width]
+
+    def layer(self, name: str) -> np.ndarray:
+        """
+        Return a layer by name.
+
+        Args:
+            name (str): "cell_id", "cell_type" or the name of a field layer.
+
+        Returns:
+            np.ndarray: The full (height, width) layer.
+        """
+        if name == "cell_id":
+            return self.cell_id
+        if name == "cell_type":
+            return self.cell_type
+        return self.layers[name]
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Total memory held by all grid layers, in bytes.
+        """
+        total = self.cell_id.nbytes + self.cell_type.nbytes
+        return total + sum(layer.nbytes for layer in self.layers.values())
@@ -1,18 +1,173 @@
 # src/core/sector.py
 
-import random
+import numpy as np
+
+from src.utils.rng import RandomService, default_service
+
+# (temperature, rainfall) of each season: spring, summer, autumn, winter
+SEASONS = np.array([[15, 10], [25, 5], [10, 15], [0, 20]], dtype=np.float64)
+
+# Rows of SectorState.values
+SUNLIGHT, ORGANIC_MATTER, TEMPERATURE, RAINFALL = range(4)
+
+# Weather events and their deltas, one column per event, on the rows below
+WEATHER_EVENTS = ("storm", "drought", "heatwave")
+WEATHER_ROWS = np.array([RAINFALL, SUNLIGHT, TEMPERATURE])
+WEATHER_EFFECTS = np.array(
+    [[20, -20, 0], [-10, 0, 5], [0, 5, 10]],
+    dtype=np.float64,
+)
+
+# Organic matter above which accumulation turns toxic
+TOXICITY_THRESHOLD = 100
+
+
+class SectorState:
+    """
+    The SectorState class holds the environment of every sector as parallel NumPy
+    arrays, so seasons, weather and sunlight are updated for all sectors at once
+    whatever their number.
+
+    The arrays are the rows of a single (4, count) block, indexed by the SUNLIGHT,
+    ORGANIC_MATTER, TEMPERATURE and RAINFALL constants.
+    """
+
+    def __init__(self, count: int):
+        """
+        Initialize the state of `count` sectors to zero.
+
+        Args:
+            count (int): The number of sectors.
+        """
+        self.count = count
+        self.values = np.zeros((4, count), dtype=np.float64)
+        self.sunlight_exposure = self.values[SUNLIGHT]
+        self.organic_matter = self.values[ORGANIC_MATTER]
+        self.temperature = self.values[TEMPERATURE]
+        self.rainfall = self.values[RAINFALL]
+
+    def update_season(self, season_cycle: int) -> None:
+        """
+        Set the temperature and rainfall of every sector from the season table.
+
+        Args:
+            season_cycle (int): The season, 0 (spring) to 3 (winter).
+        """
+        self.temperature[:], self.rainfall[:] = SEASONS[season_cycle]
+
+    def apply_weather(self, sectors: np.ndarray, events: np.ndarray) -> None:
+        """
+        Apply weather events to sectors as masked array updates.
+
+        Args:
+            sectors (np.ndarray): The distinct indices of the affected sectors.
+            events (np.ndarray): The index in WEATHER_EVENTS of each event.
+        """
+        flat = self.values.reshape(-1)
+        flat[(WEATHER_ROWS[:, None] * self.count + sectors).ravel()] += WEATHER_EFFECTS[
+            :, events
+        ].ravel()
+
+    def random_weather(
+        self, rng: np.random.Generator, probability: float, at_least_one=False
+    ) -> int:
+        """
+        Draw a weather event in each sector with a given probability, in a couple
+        of batched draws, and apply them.
+
+        The number of hit sectors is drawn first and the sectors are then picked
+        without replacement, which has the same distribution as one Bernoulli
+        draw per sector but costs O(hits) instead of O(sectors).
+
+        Args:
+            rng (np.random.Generator): The random stream to draw from.
+            probability (float): The per-sector chance of an event.
+            at_least_one (bool): Redraw until at least one sector is hit, i.e.
+                draw conditioned on some event happening.
+
+        Returns:
+            int: The number of events applied.
+        """
+        count = rng.binomial(self.count, probability)
+        while at_least_one and count == 0:
+            count = rng.binomial(self.count, probability)
+        hits = rng.choice(self.count, count, replace=False)
+        self.apply_weather(hits, rng.integers(0, len(WEATHER_EVENTS), count))
+        return count
+
+    def update_sunlight(self) -> None:
+        """
+        Recompute the sunlight exposure of every sector from its rainfall.
+        """
+        np.maximum(0, 100 - self.rainfall, out=self.sunlight_exposure)
+
+    def update_organic_matter(self) -> None:
+        """
+        Accumulate organic matter in every sector, faster once it is toxic.
+        """
+        toxic = self.organic_matter > TOXICITY_THRESHOLD
+        self.organic_matter += 0.1
+        self.organic_matter[toxic] += 0.9
 
 
 class Sector:
-    def __init__(self, x, y, width, height):
+    """
+    A view of one sector of a SectorState, with the per-object API of the sector.
+    """
+
+    def __init__(self, x, y, width, height, rng=None, state=None, index=0):
         self.x = x
         self.y = y
         self.width = width
         self.height = height
-        self.sunlight_exposure = 0
-        self.organic_matter = 0
-        self.temperature = 0
-        self.rainfall = 0
+        # The environment lives in the shared arrays; a lone sector gets its own
+        self.state = state if state is not None else SectorState(1)
+        self.index = index
+        self.cells = {}  # Cells in this sector mapped to their position
+        # The sector's own random stream, so its events do not depend on others.
+        # A RandomService is resolved to its ("sector", index) stream on first use,
+        # so that huge sector grids do not create a generator per sector upfront.
+        self._rng = rng
+
+    @property
+    def rng(self):
+        if self._rng is None:
+            self._rng = default_service().stream("sector")
+        elif isinstance(self._rng, RandomService):
+            self._rng = self._rng.stream("sector", self.index)
+        return self._rng
+
+    @property
+    def sunlight_exposure(self):
+        return float(self.state.sunlight_exposure[self.index])
+
+    @sunlight_exposure.setter
+    def sunlight_exposure(self, value):
+        self.state.sunlight_exposure[self.index] = value
+
+    @property
+    def organic_matter(self):
+        return float(self.state.organic_matter[self.index])
+
+    @organic_matter.setter
+    def organic_matter(self, value):
+        self.state.organic_matter[self.index] = value
+
+    @property
+    def temperature(self):
+        return float(self.state.temperature[self.index])
+
+    @temperature.setter
+    def temperature(self, value):
+        self.state.temperature[self.index] = value
+
+    @property
+    def rainfall(self):
+        return float(self.state.rainfall[self.index])
+
+    @rainfall.setter
+    def rainfall(self, value):
+        self.state.rainfall[self.index] = value
 
     def update_sunlight(self):
         # Update sunlight exposure based on sector properties
@@ -20,38 +175,19 @@ class Sector:
 
     def update_organic_matter(self):
         # Update organic matter accumulation and its toxic effects
-        if self.organic_matter > 100:
+        if self.organic_matter > TOXICITY_THRESHOLD:
             self.organic_matter += 1  # Increase toxicity
         else:
             self.organic_matter += 0.1  # Normal accumulation
 
     def update_season(self, season_cycle):
-        # Change sector properties based on the current season
-        if season_cycle == 0:  # Spring
-            self.temperature = 15
-            self.rainfall = 10
-        elif season_cycle == 1:  # Summer
-            self.temperature = 25
-            self.rainfall = 5
-        elif season_cycle == 2:  # Autumn
-            self.temperature = 10
-            self.rainfall = 15
-        elif season_cycle == 3:  # Winter
-            self.temperature = 0
-            self.rainfall = 20
+        # Change sector properties based on the current season, see SEASONS
+        self.temperature, self.rainfall = SEASONS[season_cycle]
 
     def random_event(self):
         # Introduce a random event in the sector
-        event_type = random.choice(["storm", "drought", "heatwave"])
-        if event_type == "storm":
-            self.rainfall += 20
-            self.sunlight_exposure -= 10
-        elif event_type == "drought":
-            self.rainfall -= 20
-            self.temperature += 5
-        elif event_type == "heatwave":
-            self.temperature += 10
-            self.sunlight_exposure += 5
+        event = self.rng.integers(0, len(WEATHER_EVENTS))
+        self.state.apply_weather(np.array([self.index]), np.array([event]))
 
     def calculate_sunlight(self):
         # Placeholder method for actual sunlight calculation
@@ -0,0 +1,510 @@
+# src/core/spatial.py
+
+import math
+from typing import Hashable
+
+import numpy as np
+
+
+class SpatialIndex:
+    """
+    The SpatialIndex class is a uniform bucket hash over the world, with one bucket
+    per sector. Bucket k covers the same area as World.sectors[k], so a position
+    maps to its sector in O(1).
+
+    It is the registry of per-object cells: cells are registered under any hashable
+    key together with their position, and updated incrementally as they move.
+    Radius and k-nearest queries only visit the buckets that can contain a match.
+    CellStore slots are indexed in bulk by CellIndex instead.
+    """
+
+    def __init__(self, width: int, height: int, num_sectors: int):
+        """
+        Initialize an empty index.
+
+        Args:
+            width (int): The width of the world.
+            height (int): The height of the world.
+            num_sectors (int): The number of sectors along each axis.
+        """
+        self.width = width
+        self.height = height
+        self.num_sectors = num_sectors
+        self.bucket_width = max(width // num_sectors, 1)
+        self.bucket_height = max(height // num_sectors, 1)
+        self.buckets: list[dict[Hashable, tuple[int, int]]] = [
+            {} for _ in range(num_sectors * num_sectors)
+        ]
+        self.positions: dict[Hashable, tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.positions
+
+    def _bucket_coords(self, x: int, y: int) -> tuple[int, int]:
+        # Positions beyond the last full sector belong to the last sector
+        last = self.num_sectors - 1
+        return min(x // self.bucket_width, last), min(y // self.bucket_height, last)
+
+    def sector_index(self, position: tuple[int, int]) -> int:
+        """
+        Return the index of the sector containing a position, matching the order
+        of World.sectors.
+
+        Args:
+            position (tuple[int, int]): The (x, y) position.
+
+        Returns:
+            int: The sector index.
+        """
+        i, j = self._bucket_coords(*position)
+        return i * self.num_sectors + j
+
+    def sector_indices(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        Return the sector index of many positions at once.
+
+        Args:
+            xs (np.ndarray): The x coordinates.
+            ys (np.ndarray): The y coordinates.
+
+        Returns:
+            np.ndarray: The sector index of each position.
+        """
+        last = self.num_sectors - 1
+        i = np.minimum(xs // self.bucket_width, last)
+        j = np.minimum(ys // self.bucket_height, last)
+        return i * self.num_sectors + j
+
+    def insert(self, key: Hashable, position: tuple[int, int]) -> None:
+        """
+        Register a cell at a position.
+
+        Args:
+            key (Hashable): The cell or its index.
+            position (tuple[int, int]): The (x, y) position of the cell.
+        """
+        if key in self.positions:
+            self.remove(key)
+        self.positions[key] = position
+        self.buckets[self.sector_index(position)][key] = position
+
+    def remove(self, key: Hashable) -> None:
+        """
+        Unregister a cell.
+
+        Args:
+            key (Hashable): The cell or its index.
+        """
+        position = self.positions.pop(key)
+        del self.buckets[self.sector_index(position)][key]
+
+    def move(self, key: Hashable, new_position: tuple[int, int]) -> None:
+        """
+        Update the position of a registered cell.
+
+        Args:
+            key (Hashable): The cell or its index.
+            new_position (tuple[int, int]): The new (x, y) position of the cell.
+        """
+        old_bucket = self.buckets[self.sector_index(self.positions[key])]
+        new_bucket = self.buckets[self.sector_index(new_position)]
+        if old_bucket is not new_bucket:
+            del old_bucket[key]
+        new_bucket[key] = new_position
+        self.positions[key] = new_position
+
+    def in_sector(self, sector_index: int) -> dict[Hashable, tuple[int, int]]:
+        """
+        Return a live view of the cells in a sector, mapping each key to its position.
+
+        Args:
+            sector_index (int): The index of the sector.
+
+        Returns:
+            dict[Hashable, tuple[int, int]]: The sector's bucket.
+        """
+        return self.buckets[sector_index]
+
+    def _buckets_in_box(self, x0: float, y0: float, x1: float, y1: float):
+        # The buckets overlapping an axis-aligned box
+        i0, j0 = self._bucket_coords(max(int(x0), 0), max(int(y0), 0))
+        i1, j1 = self._bucket_coords(max(int(x1), 0), max(int(y1), 0))
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                yield self.buckets[i * self.num_sectors + j]
+
+    def query_radius(
+        self, position: tuple[int, int], radius: float
+    ) -> list[tuple[float, Hashable]]:
+        """
+        Find the cells within a distance of a position.
+
+        Args:
+            position (tuple[int, int]): The (x, y) centre of the query.
+            radius (float): The maximum Euclidean distance.
+
+        Returns:
+            list[tuple[float, Hashable]]: (distance, key) pairs, nearest first.
+        """
+        x, y = position
+        limit = radius * radius
+        found = []
+        for bucket in self._buckets_in_box(
+            x - radius, y - radius, x + radius, y + radius
+        ):
+            for key, (kx, ky) in bucket.items():
+                d2 = (kx - x) ** 2 + (ky - y) ** 2
+                if d2 <= limit:
+                    found.append((math.sqrt(d2), key))
+        found.sort(key=lambda pair: pair[0])
+        return found
+
+    def nearest(
+        self, position: tuple[int, int], k: int
+    ) -> list[tuple[float, Hashable]]:
+        """
+        Find the k cells nearest to a position.
+
+        Rings of buckets around the position are visited until at least k cells are
+        seen; a radius query with the k-th distance then returns the exact answer.
+
+        Args:
+            position (tuple[int, int]): The (x, y) centre of the query.
+            k (int): The number of cells to return.
+
+        Returns:
+            list[tuple[float, Hashable]]: Up to k (distance, key) pairs, nearest first.
+        """
+        if k <= 0 or not self.positions:
+            return []
+        x, y = position
+        step = max(self.bucket_width, self.bucket_height)
+        reach = step
+        while True:
+            candidates = []
+            for bucket in self._buckets_in_box(
+                x - reach, y - reach, x + reach, y + reach
+            ):
+                candidates.extend(bucket.values())
+            if len(candidates) >= k or reach >= max(self.width, self.height):
+                break
+            reach += step
+        distances = sorted(math.hypot(cx - x, cy - y) for cx, cy in candidates)
+        radius = distances[min(k, len(distances)) - 1]
+        return self.query_radius(position, radius)[:k]
+
+
+# Default edge length in pixels of the buckets of a CellIndex.
+DEFAULT_BUCKET_SIZE = 16
+
+
+class CellIndex:
+    """
+    The CellIndex class is a columnar bucket index over CellStore slots, for
+    neighbour and region queries on arrays of positions.
+
+    Buckets are nested inside the num_sectors partition of SpatialIndex: each
+    sector is split into a grid of buckets of at least `bucket_size` pixels, and
+    buckets are numbered sector by sector, so the cells of a sector are one
+    contiguous slice of the index. An index is built in bulk from the slots and
+    positions of cells, optionally split into groups (e.g. frequency bands)
+    that queries never cross. Cells are kept sorted by bucket in flat arrays
+    with the offset of every bucket, and queries look up the buckets around many
+    positions at once with no per-cell Python loop.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        num_sectors: int,
+        bucket_size: int = DEFAULT_BUCKET_SIZE,
+    ):
+        """
+        Initialize an empty index.
+
+        Args:
+            width (int): The width of the world.
+            height (int): The height of the world.
+            num_sectors (int): The number of sectors along each axis.
+            bucket_size (int): The minimum edge length of a bucket in pixels.
+        """
+        self.width = width
+        self.height = height
+        self.num_sectors = num_sectors
+        sector_width = max(width // num_sectors, 1)
+        sector_height = max(height // num_sectors, 1)
+        self.columns = max(sector_width // bucket_size, 1)
+        self.rows = max(sector_height // bucket_size, 1)
+        self.buckets_per_sector = self.columns * self.rows
+        self.num_buckets = num_sectors * num_sectors * self.buckets_per_sector
+        # Global bucket column of every x and row of every y
+        self.column_of_x = self._axis(width, sector_width, self.columns)
+        self.row_of_y = self._axis(height, sector_height, self.rows)
+        # Bucket number of each (global column, global row), sector by sector
+        gx = np.arange(num_sectors * self.columns)[:, None]
+        gy = np.arange(num_sectors * self.rows)[None, :]
+        sectors = (gx // self.columns) * num_sectors + gy // self.rows
+        self.bucket_of = (
+            sectors * self.buckets_per_sector
+            + (gx % self.columns) * self.rows
+            + gy % self.rows
+        )
+        self.build(np.empty(0, dtype=np.int64), np.empty(0), np.empty(0))
+
+    def _axis(self, size: int, sector_size: int, buckets: int) -> np.ndarray:
+        # Positions beyond the last full sector belong to the last sector, which
+        # is split into buckets over its whole extent
+        last = self.num_sectors - 1
+        coords = np.arange(size)
+        sector = np.minimum(coords // sector_size, last)
+        extent = np.where(sector == last, size - last * sector_size, sector_size)
+        local = (coords - sector * sector_size) * buckets // extent
+        return (sector * buckets + np.minimum(local, buckets - 1)).astype(np.int64)
+
+    def bucket_indices(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        Return the bucket of many positions at once.
+
+        Args:
+            xs (np.ndarray): The x coordinates.
+            ys (np.ndarray): The y coordinates.
+
+        Returns:
+            np.ndarray: The bucket number of each position.
+        """
+        return self.bucket_of[self.column_of_x[xs], self.row_of_y[ys]]
+
+    def build(
+        self,
+        cells: np.ndarray,
+        xs: np.ndarray,
+        ys: np.ndarray,
+        groups: np.ndarray | None = None,
+    ) -> None:
+        """
+        Index cells, replacing the cells indexed so far.
+
+        Args:
+            cells (np.ndarray): The slots of the cells.
+            xs (np.ndarray): The x coordinate of each cell.
+            ys (np.ndarray): The y coordinate of each cell.
+            groups (np.ndarray | None): A non-negative group of each cell, e.g. a
+                frequency band; queries only match cells of the queried group.
+        """
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        keys = self.bucket_indices(xs, ys)
+        num_groups = 1
+        if groups is not None and len(groups):
+            groups = np.asarray(groups, dtype=np.int64)
+            num_groups = int(groups.max()) + 1
+            keys = groups * self.num_buckets + keys
+        self.num_groups = num_groups
+        # Stable sorts of 16-bit keys are radix sorts, in linear time; wider keys
+        # are sorted 16 bits at a time, from the low half up
+        order = np.argsort((keys & 0xFFFF).astype(np.uint16), kind="stable")
+        if num_groups * self.num_buckets > 0xFFFF:
+            high = (keys[order] >> 16).astype(np.uint16)
+            order = order[np.argsort(high, kind="stable")]
+        counts = np.bincount(keys, minlength=num_groups * self.num_buckets)
+        self.offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.offsets[1:])
+        self.cells = np.asarray(cells)
+        # Positions in the built arrays, and coordinates, in bucket order
+        self.order = order
+        self.xs = xs[order]
+        self.ys = ys[order]
+        # Start and size of every bucket laid out as the global grid of buckets,
+        # so that queries reach neighbouring buckets by adding a constant
+        grid = self.bucket_of.ravel()
+        if num_groups > 1:
+            groups_base = np.arange(num_groups)[:, None] * self.num_buckets
+            grid = (groups_base + grid).ravel()
+        self._grid_starts = self.offsets[grid]
+        self._grid_counts = self.offsets[grid + 1] - self._grid_starts
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def in_sector(self, sector_index: int, group: int = 0) -> np.ndarray:
+        """
+        Return the cells of a sector, as one slice of the index.
+
+        Args:
+            sector_index (int): The index of the sector, as in World.sectors.
+            group (int): The group of the cells.
+
+        Returns:
+            np.ndarray: The slots of the cells in the sector.
+        """
+        first = group * self.num_buckets + sector_index * self.buckets_per_sector
+        start = self.offsets[first]
+        end = self.offsets[first + self.buckets_per_sector]
+        return self.cells[self.order[start:end]]
+
+    def sector_offsets(self, group: int = 0) -> np.ndarray:
+        """
+        Return where every sector starts in the bucket order of a group.
+
+        Returns:
+            np.ndarray: Offsets such that the cells of sector k are
+                cells[order[offsets[k]:offsets[k + 1]]].
+        """
+        first = group * self.num_buckets
+        bounds = first + np.arange(
+            0, self.num_buckets + 1, self.buckets_per_sector, dtype=np.int64
+        )
+        return self.offsets[bounds]
+
+    def query_radius(
+        self,
+        xs: np.ndarray,
+        ys: np.ndarray,
+        radius: float,
+        groups: np.ndarray | None = None,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Find the indexed cells within a distance of many positions.
+
+        Args:
+            xs (np.ndarray): The x coordinate of each query.
+            ys (np.ndarray): The y coordinate of each query.
+            radius (float): The maximum Euclidean distance.
+            groups (np.ndarray | None): The group of each query, if the index
+                was built with groups.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: For every match, the
+                position of the query, the position of the cell in the arrays
+                the index was built from, and their squared distance.
+        """
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        reach = int(np.floor(radius))
+        gx0 = self.column_of_x[np.clip(xs - reach, 0, self.width - 1)]
+        gx1 = self.column_of_x[np.clip(xs + reach, 0, self.width - 1)]
+        gy0 = self.row_of_y[np.clip(ys - reach, 0, self.height - 1)]
+        gy1 = self.row_of_y[np.clip(ys + reach, 0, self.height - 1)]
+        stride = self.bucket_of.shape[1]
+        first = gx0 * stride + gy0
+        known = None
+        if groups is not None:
+            groups = np.asarray(groups, dtype=np.int64)
+            known = groups < self.num_groups
+            first += np.minimum(groups, self.num_groups - 1) * self.num_buckets
+        # Buckets of the box of each query, along each axis
+        spans_x, spans_y = gx1 - gx0, gy1 - gy0
+        queries = np.arange(len(xs))
+        found_queries, found_members = [], []
+        if len(xs) and len(self):
+            for dx in range(int(spans_x.max()) + 1):
+                for dy in range(int(spans_y.max()) + 1):
+                    targets = first + (dx * stride + dy)
+                    starts = self._grid_starts.take(targets, mode="clip")
+                    counts = self._grid_counts.take(targets, mode="clip")
+                    outside = (spans_x < dx) | (spans_y < dy)
+                    if known is not None:
+                        outside |= ~known
+                    counts[outside] = 0
+                    total = int(counts.sum())
+                    if total == 0:
+                        continue
+                    # Expand every (query, bucket) match into one pair per member
+                    found_queries.append(np.repeat(queries, counts))
+                    skip = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+                    found_members.append(skip + np.arange(total))
+        if not found_queries:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, empty
+        found_queries = np.concatenate(found_queries)
+        found_members = np.concatenate(found_members)
+        dx = self.xs[found_members] - xs[found_queries]
+        dy = self.ys[found_members] - ys[found_queries]
+        distance = dx * dx + dy * dy
+        within = distance <= radius * radius
+        return (
+            found_queries[within],
+            self.order[found_members[within]],
+            distance[within],
+        )
+
+    def pairs_within(
+        self, radius: float, groups: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find every ordered pair of distinct indexed cells within a distance of
+        each other, and of the same group.
+
+        Args:
+            radius (float): The maximum Euclidean distance.
+            groups (np.ndarray | None): The group each cell was built with.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The positions of the first and second
+                cell of each pair in the arrays the index was built from.
+        """
+        # Query in bucket order, so neighbouring queries read neighbouring buckets
+        if groups is not None:
+            groups = np.asarray(groups)[self.order]
+        firsts, seconds, _ = self.query_radius(self.xs, self.ys, radius, groups)
+        firsts = self.order[firsts]
+        distinct = firsts != seconds
+        return firsts[distinct], seconds[distinct]
+
+    def nearest(
+        self, xs: np.ndarray, ys: np.ndarray, k: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k indexed cells nearest to many positions.
+
+        The radius of the queries still short of k cells doubles, starting from
+        the bucket size, until they find k cells or cover the world; the k
+        nearest of the cells found are then exact.
+
+        Args:
+            xs (np.ndarray): The x coordinate of each query.
+            ys (np.ndarray): The y coordinate of each query.
+            k (int): The number of cells to return per query.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: (queries, k) arrays of the positions of
+                the cells in the arrays the index was built from, nearest first,
+                and of their distances; missing cells are -1 at an infinite
+                distance.
+        """
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        found = np.full((len(xs), max(k, 0)), -1, dtype=np.int64)
+        distances = np.full((len(xs), max(k, 0)), np.inf)
+        if k <= 0 or len(self) == 0:
+            return found, distances
+        wanted = min(k, len(self))
+        pending = np.arange(len(xs))
+        radius = float(self.width // (self.num_sectors * self.columns))
+        limit = float(np.hypot(self.width, self.height))
+        while len(pending):
+            queries, members, squared = self.query_radius(
+                xs[pending], ys[pending], radius
+            )
+            counts = np.bincount(queries, minlength=len(pending))
+            done = (counts >= wanted) | (radius >= limit)
+            keep = done[queries]
+            queries, members, squared = queries[keep], members[keep], squared[keep]
+            # Nearest first within each query, ties by position
+            order = np.lexsort((members, squared, queries))
+            queries, members = queries[order], members[order]
+            squared = squared[order]
+            starts = np.zeros(len(pending) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(queries, minlength=len(pending)), out=starts[1:])
+            rank = np.arange(len(queries)) - starts[queries]
+            first = rank < wanted
+            rows = pending[queries[first]]
+            found[rows, rank[first]] = members[first]
+            distances[rows, rank[first]] = np.sqrt(squared[first])
+            pending = pending[~done]
+            radius *= 2
+        return found, distances
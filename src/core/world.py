@@ -1,17 +1,38 @@
 # src/core/world.py
 
-import random
-from src.core.sector import Sector
+from src.cells.cell_store import CellStore, NO_CONNECTION
+from src.core.grid import Grid
+from src.core.sector import Sector, SectorState
+from src.core.spatial import CellIndex, SpatialIndex
+from src.utils.rng import RandomService
 
 
 class World:
-    def __init__(self, width=1800, height=1400, num_sectors=8):
+    def __init__(
+        self, width=1800, height=1400, num_sectors=8, seed=None, grid=None, cells=None
+    ):
         self.width = width
         self.height = height
+        self.num_sectors = num_sectors
+        # Independent random streams per sector and subsystem, see RandomService
+        self.rng = RandomService(seed)
+        # Sector environments live in arrays; each Sector is a view of one entry
+        self.sector_state = SectorState(num_sectors * num_sectors)
         self.sectors = self._create_sectors(num_sectors)
-        self.grid = self._create_grid()
+        self.index = SpatialIndex(width, height, num_sectors)
+        for sector_index, sector in enumerate(self.sectors):
+            # Each sector shares its bucket of the spatial index
+            sector.cells = self.index.in_sector(sector_index)
+        # An existing grid and cell store may be given, e.g. restored from a checkpoint
+        self.grid = self._create_grid() if grid is None else grid
+        self.cells = CellStore() if cells is None else cells
+        # Columnar index of the living store cells, see cell_index
+        self._cell_index = CellIndex(width, height, num_sectors)
+        self._cell_index_of = None
         self.season_cycle = 0
         self.random_events = []
+        self.events = None
+        self.random_event_probability = 0.1
 
     def _create_sectors(self, num_sectors):
         # Divide the world into sectors
@@ -22,13 +43,55 @@ class World:
             for j in range(num_sectors):
                 sectors.append(
                     Sector(
-                        i * sector_width, j * sector_height, sector_width, sector_height
+                        i * sector_width,
+                        j * sector_height,
+                        sector_width,
+                        sector_height,
+                        self.rng,
+                        self.sector_state,
+                        len(sectors),
                     )
                 )
         return sectors
 
     def _create_grid(self):
-        return [[None for _ in range(self.width)] for _ in range(self.height)]
+        # Array-backed occupancy and per-pixel fields, indexed as layer[y, x]
+        return Grid(self.width, self.height)
+
+    def add_cell(
+        self, cell_type, position, energy, connection=NO_CONNECTION, genome=None
+    ):
+        # Register a cell in the cell store and mark its position as occupied
+        index = self.cells.add(cell_type, position, energy, connection, genome)
+        self.grid.place(position, index, cell_type)
+        return index
+
+    def place_cell(self, cell):
+        # Register a cell object in the spatial index; it keeps it updated on move
+        self.index.insert(cell, cell.position)
+        cell.spatial_index = self.index
+
+    def remove_cell(self, cell):
+        self.index.remove(cell)
+        cell.spatial_index = None
+
+    def sector_for(self, position):
+        return self.sectors[self.index.sector_index(position)]
+
+    def cell_index(self):
+        # Index the living cells of the cell store for neighbour queries; it is
+        # rebuilt only once births, deaths or moves have changed alive_indices()
+        alive = self.cells.alive_indices()
+        if self._cell_index_of is not alive:
+            self._cell_index.build(alive, self.cells.x[alive], self.cells.y[alive])
+            self._cell_index_of = alive
+        return self._cell_index
+
+    def cells_by_sector(self):
+        # Group the living cells of the cell store by sector, as slices of the
+        # cell index
+        index = self.cell_index()
+        return index.cells[index.order], index.sector_offsets()
 
     def update_environment(self):
         self.seasonal_cycle()
@@ -37,21 +100,38 @@ class World:
     def seasonal_cycle(self):
         # Implement seasonal changes affecting temperature, light levels, and rainfall
         self.season_cycle = (self.season_cycle + 1) % 4
-        for sector in self.sectors:
-            sector.update_season(self.season_cycle)
+        self.sector_state.update_season(self.season_cycle)
+
+    def schedule_random_events(self, events, probability=0.1, start=0):
+        # Fire random events from an event queue instead of polling. The gap until
+        # any sector has an event is geometric with the chance that at least one
+        # does, so a single queue entry covers every sector
+        self.events = events
+        self.random_event_probability = probability
+        any_event = 1 - (1 - probability) ** len(self.sectors)
+        events.schedule_geometric(any_event, self.fire_random_events, start=start)
+
+    def fire_random_events(self):
+        # Draw the sectors hit by the event that fired; at least one must be
+        self.sector_state.random_weather(
+            self.rng.stream("random_events"),
+            self.random_event_probability,
+            at_least_one=True,
+        )
 
     def dynamic_environmental_changes(self):
         # Introduce random weather events and their effects
-        for sector in self.sectors:
-            if random.random() < 0.1:  # 10% chance of random event
-                sector.random_event()
+        if self.events is not None:
+            return  # Fired by the event queue, see schedule_random_events
+        # One batched draw for all sectors; 10% chance of random event
+        self.sector_state.random_weather(
+            self.rng.stream("random_events"), self.random_event_probability
+        )
 
     def distribute_sunlight(self):
-        # Method to simulate sunlight exposure in each sector
-        for sector in self.sectors:
-            sector.update_sunlight()
+        # Method to simulate sunlight exposure in every sector at once
+        self.sector_state.update_sunlight()
 
     def accumulate_organic_matter(self):
         # Method to handle organic matter accumulation and toxicity
-        for sector in self.sectors:
-            sector.update_organic_matter()
+        self.sector_state.update_organic_matter()
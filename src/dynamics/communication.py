@@ -0,0 +1,220 @@
+# src/dynamics/communication.py
+
+import numpy as np
+
+from src.cells.cell_type import AntennaMode, CellType
+from src.core.spatial import CellIndex
+from src.dynamics.interaction import organism_of
+
+# Range of the radio frequencies drawn for antennas, as in AntennaCell.
+RADIO_FREQUENCY_RANGE = (0.1, 10.0)
+
+# Width of a frequency band; antennas only hear antennas of their own band.
+BAND_WIDTH = 0.5
+
+# Distance in pixels up to which a broadcast is heard.
+BROADCAST_RANGE = 8
+
+
+class AntennaNetwork:
+    """
+    The AntennaNetwork carries messages between organisms through their antennas.
+
+    Every tick, each antenna in communication handler mode broadcasts one message
+    to the other communicating antennas within BROADCAST_RANGE on its frequency
+    band. The receiving antenna hands the message to the brain its conduit chain
+    ends in, as AntennaCell.handle_communication and ConduitCell.receive_signals
+    would, so delivery follows the conduit forest of the TransportEngine.
+    Messages between antennas of one organism, and messages reaching antennas
+    without a brain, are dropped.
+
+    Pairs are found with a CellIndex of the communicating antennas, grouped by
+    frequency band, over buckets of at least BROADCAST_RANGE pixels: each antenna
+    looks up the buckets around it in its band in O(1). A tick costs
+    O(n + buckets + pairs) for n broadcasting antennas and never compares
+    antennas of different bands or distant buckets.
+
+    The messages of a tick are kept in flat arrays sorted by receiving brain, so
+    each brain's inbox is a contiguous slice; see inbox and signals_for. Antennas
+    draw their frequency from the "antenna" random stream the first time the
+    network sees them, and keep it in the CellStore frequency column.
+    """
+
+    def __init__(
+        self,
+        world,
+        transport,
+        rng: np.random.Generator | None = None,
+        broadcast_range: int = BROADCAST_RANGE,
+        band_width: float = BAND_WIDTH,
+        organisms=None,
+    ):
+        """
+        Initialize an idle network.
+
+        Args:
+            world (World): The world holding the cells.
+            transport (TransportEngine): The engine holding the conduit forest
+                along which messages are delivered.
+            rng (np.random.Generator | None): The random stream used for radio
+                frequencies; the world's "antenna" stream if omitted.
+            broadcast_range (int): The distance in pixels a broadcast reaches.
+            band_width (float): The width of a frequency band.
+            organisms (OrganismRegistry | None): The registry looked up for the
+                organism of antennas; they are resolved from the transport forest
+                if omitted.
+        """
+        self.world = world
+        self.transport = transport
+        self.rng = rng if rng is not None else world.rng.stream("antenna")
+        self.broadcast_range = broadcast_range
+        self.band_width = band_width
+        self.organisms = organisms
+        self.index = CellIndex(
+            world.width, world.height, world.num_sectors, broadcast_range
+        )
+        self.broadcasts = 0
+        self.delivered = 0
+        self.dropped = 0
+        self._antennas = None
+        self.messages = self._empty_messages()
+        self.inbox_brains = np.empty(0, dtype=np.int64)
+        self.inbox_offsets = np.zeros(1, dtype=np.int64)
+
+    @staticmethod
+    def _empty_messages() -> dict[str, np.ndarray]:
+        empty = np.empty(0, dtype=np.int64)
+        return {
+            "sender": empty,
+            "receiver": empty,
+            "brain": empty,
+            "band": empty,
+            "payload": np.empty(0, dtype=np.float64),
+        }
+
+    def assign_frequencies(self) -> None:
+        """
+        Draw a radio frequency for the living antennas that have none yet.
+        """
+        store = self.world.cells
+        antennas = store.alive_indices(CellType.ANTENNA)
+        if antennas is self._antennas:
+            return
+        self._antennas = antennas
+        new = antennas[store.frequency[antennas] == 0]
+        if len(new):
+            store.frequency[new] = self.rng.uniform(*RADIO_FREQUENCY_RANGE, len(new))
+
+    def broadcasters(self) -> np.ndarray:
+        """
+        Return the living antennas in communication handler mode.
+
+        Returns:
+            np.ndarray: Their indices.
+        """
+        self.assign_frequencies()
+        store = self.world.cells
+        antennas = self._antennas
+        return antennas[store.state[antennas] == AntennaMode.COMMUNICATION_HANDLER]
+
+    def find_links(self, antennas: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find every ordered pair of distinct antennas on the same band within
+        broadcast range of each other.
+
+        Args:
+            antennas (np.ndarray): The indices of the broadcasting antennas.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The positions in `antennas` of the
+                sender and the receiver of each pair.
+        """
+        store = self.world.cells
+        bands = (store.frequency[antennas] / self.band_width).astype(np.int64)
+        self.index.build(antennas, store.x[antennas], store.y[antennas], bands)
+        return self.index.pairs_within(self.broadcast_range, bands)
+
+    def step(self, tick: int) -> dict:
+        """
+        Broadcast the messages of a tick and deliver them to the brains.
+
+        Each message carries the band and, as its payload, the energy of the
+        sending antenna.
+
+        Args:
+            tick (int): The current tick.
+
+        Returns:
+            dict: The number of broadcasting antennas, and of messages delivered
+                and dropped.
+        """
+        store = self.world.cells
+        antennas = self.broadcasters()
+        senders, receivers = self.find_links(antennas)
+        if self.organisms is not None:
+            organisms = self.organisms.organism_of(antennas)
+        else:
+            organisms = organism_of(store, self.transport, antennas)
+        brains = organisms[receivers]
+        delivered = (brains >= 0) & (brains != organisms[senders])
+        senders, receivers = (
+            antennas[senders[delivered]],
+            antennas[receivers[delivered]],
+        )
+        brains = brains[delivered]
+
+        # Sort by brain so that every inbox is one slice
+        order = np.argsort(brains, kind="stable")
+        senders, receivers, brains = senders[order], receivers[order], brains[order]
+        starts = np.flatnonzero(np.diff(brains, prepend=-1))
+        self.messages = {
+            "sender": senders,
+            "receiver": receivers,
+            "brain": brains,
+            "band": (store.frequency[senders] / self.band_width).astype(np.int64),
+            "payload": store.energy[senders].copy(),
+        }
+        self.inbox_brains = brains[starts]
+        self.inbox_offsets = np.append(starts, len(brains))
+
+        self.broadcasts += len(antennas)
+        self.delivered += len(brains)
+        self.dropped += len(delivered) - len(brains)
+        return {
+            "broadcasters": len(antennas),
+            "delivered": len(brains),
+            "dropped": len(delivered) - len(brains),
+        }
+
+    def inbox(self, brain: int) -> dict[str, np.ndarray]:
+        """
+        Return the messages delivered to a brain on the last step.
+
+        Args:
+            brain (int): The index of the brain cell.
+
+        Returns:
+            dict[str, np.ndarray]: Slices of the "sender", "receiver", "brain",
+                "band" and "payload" message arrays.
+        """
+        position = np.searchsorted(self.inbox_brains, brain)
+        if position == len(self.inbox_brains) or self.inbox_brains[position] != brain:
+            return {name: array[:0] for name, array in self.messages.items()}
+        messages = slice(self.inbox_offsets[position], self.inbox_offsets[position + 1])
+        return {name: array[messages] for name, array in self.messages.items()}
+
+    def signals_for(self, brain: int) -> dict[int, float]:
+        """
+        Return the messages delivered to a brain on the last step in the form
+        taken by BrainCell.process_signals.
+
+        Args:
+            brain (int): The index of the brain cell.
+
+        Returns:
+            dict[int, float]: The total payload received on each band.
+        """
+        inbox = self.inbox(brain)
+        bands, positions = np.unique(inbox["band"], return_inverse=True)
+        totals = np.bincount(positions, weights=inbox["payload"], minlength=len(bands))
+        return dict(zip(bands.tolist(), totals.tolist()))
@@ -1,101 +1,221 @@
 # src/dynamics/energy.py
-from typing import Dict, List
+from typing import Callable
+
+import numpy as np
+
+from src.cells.cell_type import AntennaMode, CellType
+from src.cells.kernels import (
+    ANTENNA_GATHERED_ENERGY,
+    DEFAULT_ORGANIC_MATTER_CONCENTRATION,
+    DEFAULT_SUNLIGHT_INTENSITY,
+    LEAF_ENERGY_FACTOR,
+    ROOT_ENERGY_FACTOR,
+    gather,
+    split_connected,
+)
+from src.dynamics.ledger import EXTERNAL
+
+# An energy source kernel: given the manager and the indices of the living,
+# connected cells of its type, return the energy each of them sends, or a
+# (sent, kept) pair when the cells also keep energy for themselves.
+SourceKernel = Callable[
+    ["EnergyManager", np.ndarray], np.ndarray | tuple[np.ndarray, np.ndarray]
+]
+
+
+def sunlight_energy(manager: "EnergyManager", cells: np.ndarray) -> np.ndarray:
+    """
+    Energy of leaves from the light field, shaded by the canopy, as in
+    LeafCell.generate_energy.
+    """
+    store = manager.world.cells
+    xs, ys = store.x[cells], store.y[cells]
+    light = DEFAULT_SUNLIGHT_INTENSITY
+    if manager.fields is not None:
+        light = manager.fields.layer("light")
+    intensity = gather(light, xs, ys)
+    if manager.canopy is not None:
+        intensity *= manager.canopy.gather(xs, ys)
+    return intensity * LEAF_ENERGY_FACTOR
+
+
+def organic_matter_energy(manager: "EnergyManager", cells: np.ndarray) -> np.ndarray:
+    """
+    Energy of roots from the organic matter field, as in RootCell.generate_energy.
+    """
+    store = manager.world.cells
+    organic_matter = DEFAULT_ORGANIC_MATTER_CONCENTRATION
+    if manager.fields is not None:
+        organic_matter = manager.fields.layer("organic_matter")
+    concentration = gather(organic_matter, store.x[cells], store.y[cells])
+    return concentration * ROOT_ENERGY_FACTOR
+
+
+def antenna_energy(manager: "EnergyManager", cells: np.ndarray) -> np.ndarray:
+    """
+    Energy gathered by antennas in energy gatherer mode. As in
+    AntennaCell.gather_energy, the antenna keeps the gathered energy and also
+    sends it to its conduit, so it is returned as both sent and kept.
+    """
+    store = manager.world.cells
+    gathering = store.state[cells] == AntennaMode.ENERGY_GATHERER
+    gathered = np.where(gathering, ANTENNA_GATHERED_ENERGY, 0.0)
+    return gathered, gathered
+
 
-from src.cells.base_cell import BaseCell
-from src.core.sector import Sector
-from src.core.world import World
-from src.cells.leaf_cell import LeafCell
+# Sources registered by default, as (name, cell type, kernel).
+DEFAULT_SOURCES = (
+    ("sunlight", CellType.LEAF, sunlight_energy),
+    ("organic_matter", CellType.ROOT, organic_matter_energy),
+    ("antenna", CellType.ANTENNA, antenna_energy),
+)
 
 
 class EnergyManager:
     """
-    Manages the energy dynamics of the simulation, including energy sources, budgets, and allocation.
+    Manages the energy entering the simulation through producer cells.
+
+    Every energy source is a vectorized kernel registered for one cell type.
+    update_energy_distribution runs one pass over the world: each kernel computes
+    the energy sent by all the living, connected cells of its type, and the
+    energy of every source is then delivered to the receiving cells in a single
+    scatter-add, in registration order. Producers without a connection are
+    returned so that the caller can kill them, as the per-object cells die
+    without a conduit.
+
+    The energy of each source, sent and kept by the producers alike, is totalled
+    per tick in a ring buffer, to see where energy comes from and to check
+    conservation.
     """
 
-    def __init__(self, cell_types: Dict[str, type]):
+    def __init__(self, world, fields=None, canopy=None, history: int = 1024):
         """
-        Initializes the EnergyManager with the available cell types.
+        Initialize the manager with the default sources.
 
         Args:
-            cell_types (Dict[str, type]): A dictionary mapping cell type names to their respective classes.
+            world (World): The world holding the cells.
+            fields (EnvironmentFields | None): The fields sampled by the sources;
+                the constant placeholder values are used if omitted.
+            canopy (CanopyMap | None): The shading of the leaves, if any.
+            history (int): The number of ticks kept in the totals ring buffer.
         """
-        self.cell_types = cell_types
-        self.energy_sources = {
-            "sunlight": self.get_sunlight_energy,
-            "organic_matter": self.get_organic_matter_energy,
-            "cell_consumption": self.get_cell_consumption_energy,
-        }
-
-    def get_sunlight_energy(self, leaf_cell: LeafCell, sector: Sector) -> float:
+        self.world = world
+        self.fields = fields
+        self.canopy = canopy
+        self.history = history
+        self.sources: dict[str, tuple[int, SourceKernel]] = {}
+        self.ticks_run = 0
+        self.ledger = None  # An EnergyLedger recording the deliveries, if enabled
+        self.profiler = None  # A Profiler timing each source, if enabled
+        for name, cell_type, kernel in DEFAULT_SOURCES:
+            self.register(name, cell_type, kernel)
+
+    def register(self, name: str, cell_type: int, kernel: SourceKernel) -> None:
         """
-        Calculates the energy obtained from sunlight for the given cell and sector.
+        Register an energy source, replacing any source of the same name. The
+        totals recorded so far are reset.
 
         Args:
-            cell (BaseCell): The cell object.
-            sector (Sector): The sector in which the cell is located.
-
-        Returns:
-            float: The amount of energy obtained from sunlight.
+            name (str): The name of the source.
+            cell_type (int): The CellType code of the cells producing the energy.
+            kernel (SourceKernel): The kernel computing the energy each cell sends.
         """
-        sunlight_exposure = sector.sunlight_exposure
-        photosynthesis_efficiency = leaf_cell.generate_energy
-        return sunlight_exposure * photosynthesis_efficiency
+        self.sources[name] = (cell_type, kernel)
+        self._reset_totals()
 
-    def get_organic_matter_energy(self, cell, sector) -> float:
+    def unregister(self, name: str) -> None:
         """
-        Calculates the energy obtained from organic matter for the given cell and sector.
+        Remove an energy source. The totals recorded so far are reset.
 
         Args:
-            cell (BaseCell): The cell object.
-            sector (Sector): The sector in which the cell is located.
-
-        Returns:
-            float: The amount of energy obtained from organic matter.
+            name (str): The name of the source.
         """
-        organic_matter = sector.organic_matter
-        nutrient_absorption_efficiency = cell.nutrient_absorption_efficiency
-        return organic_matter * nutrient_absorption_efficiency
+        del self.sources[name]
+        self._reset_totals()
 
-    def get_cell_consumption_energy(self, cell, target_cell) -> float:
+    def _reset_totals(self) -> None:
+        self.totals = np.zeros((self.history, len(self.sources)), dtype=np.float64)
+        self.grand_totals = np.zeros(len(self.sources), dtype=np.float64)
+        self.ticks_run = 0
+        # The totals row written last, which need not follow ticks_run
+        self.last_row = None
+
+    def update_energy_distribution(self, tick: int | None = None) -> np.ndarray:
         """
-        Calculates the energy obtained from consuming the target cell.
+        Run every energy source and deliver the energy to the receiving cells.
 
         Args:
-            cell (BaseCell): The cell object consuming the target cell.
-            target_cell (BaseCell): The cell being consumed.
+            tick (int | None): The current tick, used to index the totals ring
+                buffer; the number of updates run so far if omitted.
 
         Returns:
-            float: The amount of energy obtained from consuming the target cell.
+            np.ndarray: The indices of producers without a connection, which
+                should die.
         """
-        return target_cell.energy_content * cell.consumption_efficiency
-
-    def allocate_energy(self, cell, sector):
+        store = self.world.cells
+        if tick is None:
+            tick = self.ticks_run
+        self.last_row = tick % self.history
+        row = self.totals[self.last_row]
+        senders, amounts, unconnected = [], [], []
+        sources = self.sources.items()
+        profiler = self.profiler
+        for position, (name, (cell_type, kernel)) in enumerate(sources):
+            connected, lost = split_connected(store, store.alive_indices(cell_type))
+            if profiler is not None:
+                profiler.begin(name, cell_type, len(connected))
+            sent = kernel(self, connected)
+            if profiler is not None:
+                profiler.end()
+            if isinstance(sent, tuple):
+                # Energy kept by the producers is credited to them right away
+                sent, kept = sent
+                store.energy[connected] += kept
+                row[position] = sent.sum() + kept.sum()
+                if self.ledger is not None:
+                    self.ledger.record(name, EXTERNAL, connected, kept)
+            else:
+                row[position] = sent.sum()
+            if self.ledger is not None:
+                self.ledger.record(name, EXTERNAL, store.connection[connected], sent)
+            senders.append(connected)
+            amounts.append(sent)
+            unconnected.append(lost)
+        self.grand_totals += row
+        self.ticks_run += 1
+
+        senders = np.concatenate(senders)
+        amounts = np.concatenate(amounts)
+        np.add.at(store.energy, store.connection[senders], amounts)
+        store.harvested[senders] += amounts
+        return np.concatenate(unconnected)
+
+    def last_totals(self) -> dict[str, float]:
         """
-        Allocates energy to the given cell based on its needs and the available energy sources.
-
-        Args:
-            cell (BaseCell): The cell object to allocate energy to.
-            sector (Sector): The sector in which the cell is located.
+        Return the energy produced by each source on the last tick.
 
         Returns:
-            float: The amount of energy allocated to the cell.
+            dict[str, float]: The energy per source name.
         """
-        total_energy = 0
-        for source, get_energy_func in self.energy_sources.items():
-            if source != "cell_consumption":
-                total_energy += get_energy_func(cell, sector)
-
-        # Implement dynamic resource allocation logic here
-        cell.energy_level = total_energy
-        return total_energy
+        if self.last_row is None:
+            return dict.fromkeys(self.sources, 0.0)
+        return dict(zip(self.sources, self.totals[self.last_row].tolist()))
 
-    def update_energy_distribution(self, world):
+    def report(self) -> dict:
         """
-        Updates the energy distribution across the simulation.
+        Summarize the energy produced since the sources were registered.
 
-        Args:
-            world (World): The world object containing the sectors and cells.
+        Returns:
+            dict: The number of ticks, and the total and mean energy per tick of
+                each source and of all sources.
         """
-        for sector in world.sectors:
-            for cell in sector.cells:
-                self.allocate_energy(cell, sector)
+        ticks = max(self.ticks_run, 1)
+        return {
+            "ticks": self.ticks_run,
+            "total": dict(zip(self.sources, self.grand_totals.tolist())),
+            "per_tick": {
+                name: total / ticks
+                for name, total in zip(self.sources, self.grand_totals.tolist())
+            },
+            "all_sources_per_tick": float(self.grand_totals.sum()) / ticks,
+        }
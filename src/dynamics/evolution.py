@@ -0,0 +1,348 @@
+# src/dynamics/evolution.py
+
+import numpy as np
+
+from src.cells.cell_store import NO_CONNECTION, NO_LINEAGE
+from src.cells.cell_type import CellType
+from src.dynamics.genetic import MUTATION_RATE, NO_GENOME
+from src.dynamics.lifecycle import NO_PARENT
+from src.dynamics.transport import NO_ROOT
+
+# Number of ticks between two selection rounds.
+DEFAULT_INTERVAL = 100
+
+# Fraction of the living lineages replaced at each selection round.
+DEFAULT_REPLACEMENT = 0.25
+
+# Weights of the energy harvested, offspring count and lifespan in the fitness.
+FITNESS_WEIGHTS = (1.0, 10.0, 1.0)
+
+# Per-lineage tables of the engine, as named in checkpoints after "evolution.".
+TABLES = ("parent", "founded", "harvested", "offspring", "lifespan")
+
+
+class EvolutionEngine:
+    """
+    The EvolutionEngine runs selection and mutation over the whole population in
+    batches, at a fixed interval of ticks.
+
+    Every organism belongs to a lineage, stored in the CellStore lineage column of
+    all its cells; newborn cells inherit the lineage of their brain. Over each
+    interval the engine aggregates, per lineage:
+        - the energy harvested by its producers, drained from the store's
+          harvested column;
+        - its offspring count, from the scheduler's "cell_birth" topic;
+        - its lifespan, as the ticks lived in the interval by its living brains.
+    At the end of the interval the lineages are ranked by a weighted sum of those
+    aggregates. The brains of the lowest ranked lineages receive mutated copies of
+    the genomes of the highest ranked ones and found child lineages, all in a few
+    vectorized operations.
+
+    The engine attaches itself to a Scheduler as an "evolution" phase after the
+    lifecycle phase, and as its `evolution` attribute so that checkpoints store
+    the lineage tables. An engine attached to a resumed scheduler restores them.
+    """
+
+    def __init__(
+        self,
+        scheduler,
+        interval: int = DEFAULT_INTERVAL,
+        replacement: float = DEFAULT_REPLACEMENT,
+        mutation_rate: float = MUTATION_RATE,
+        weights: tuple[float, float, float] = FITNESS_WEIGHTS,
+        rng: np.random.Generator | None = None,
+    ):
+        """
+        Initialize the engine, restore the lineage tables of the checkpoint the
+        scheduler was resumed from, found a lineage for every unlabelled organism
+        and register the evolution phase.
+
+        Args:
+            scheduler (Scheduler): The scheduler driving the world.
+            interval (int): The number of ticks between two selection rounds.
+            replacement (float): The fraction of lineages replaced per round.
+            mutation_rate (float): The per-gene mutation probability.
+            weights (tuple[float, float, float]): The fitness weights of the energy
+                harvested, the offspring count and the lifespan.
+            rng (np.random.Generator | None): The random stream used for selection
+                and mutation; the world's "evolution" stream if omitted.
+        """
+        self.scheduler = scheduler
+        self.store = scheduler.world.cells
+        self.interval = interval
+        self.replacement = replacement
+        self.mutation_rate = mutation_rate
+        self.weights = weights
+        self.rng = rng if rng is not None else scheduler.world.rng.stream("evolution")
+
+        # Per-lineage tables, indexed by lineage id
+        self.count = 0
+        self.parent = np.full(64, NO_LINEAGE, dtype=np.int32)
+        self.founded = np.zeros(64, dtype=np.int64)
+        self.harvested = np.zeros(64, dtype=np.float64)
+        self.offspring = np.zeros(64, dtype=np.int64)
+        self.lifespan = np.zeros(64, dtype=np.int64)
+
+        self.generation = 0
+        self.history: list[dict] = []
+        self._window_start = scheduler.tick
+
+        restored = scheduler.restored
+        if restored is not None and "evolution" in restored["metadata"]:
+            self.restore(restored["metadata"]["evolution"], restored["arrays"])
+        self.found_lineages()
+        scheduler.evolution = self
+        scheduler.events.subscribe("cell_birth", self.record_births)
+        scheduler.sequence.add("evolution", self.step)
+
+    def _grow(self, min_count: int) -> None:
+        capacity = len(self.parent)
+        while capacity < min_count:
+            capacity *= 2
+        for name in TABLES:
+            old = getattr(self, name)
+            new = np.full(capacity, NO_LINEAGE if name == "parent" else 0, old.dtype)
+            new[: self.count] = old[: self.count]
+            setattr(self, name, new)
+
+    def new_lineages(self, parents: np.ndarray, tick: int) -> np.ndarray:
+        """
+        Create lineages descending from the given parent lineages.
+
+        Args:
+            parents (np.ndarray): The parent lineage of each new lineage, or
+                NO_LINEAGE for founders.
+            tick (int): The tick at which the lineages are founded.
+
+        Returns:
+            np.ndarray: The ids of the new lineages.
+        """
+        start, end = self.count, self.count + len(parents)
+        if end > len(self.parent):
+            self._grow(end)
+        self.parent[start:end] = parents
+        self.founded[start:end] = tick
+        self.count = end
+        return np.arange(start, end, dtype=np.int32)
+
+    def state(self) -> tuple[dict, dict[str, np.ndarray]]:
+        """
+        Return the state to store in a checkpoint.
+
+        Returns:
+            tuple[dict, dict[str, np.ndarray]]: The generation and the start of
+                the current interval, and the used part of each lineage table
+                by block name.
+        """
+        settings = {"generation": self.generation, "window_start": self._window_start}
+        tables = {
+            f"evolution.{name}": getattr(self, name)[: self.count] for name in TABLES
+        }
+        return settings, tables
+
+    def restore(self, settings: dict, tables: dict[str, np.ndarray]) -> None:
+        """
+        Restore the state returned by state, e.g. from a checkpoint.
+
+        Args:
+            settings (dict): The generation and the start of the current interval.
+            tables (dict[str, np.ndarray]): The lineage tables by block name.
+        """
+        count = len(tables["evolution.parent"])
+        if count > len(self.parent):
+            self._grow(count)
+        for name in TABLES:
+            getattr(self, name)[:count] = tables[f"evolution.{name}"]
+        self.count = count
+        self.generation = settings["generation"]
+        self._window_start = settings["window_start"]
+
+    def found_lineages(self) -> None:
+        """
+        Found a lineage for every living brain and seed without one, and label
+        the unlabelled conduits and producers feeding into them. Lineages already
+        in the store but unknown to the engine are added as founders.
+        """
+        store = self.store
+        tick = self.scheduler.tick
+        known = int(store.lineage[: store.size].max(initial=NO_LINEAGE)) + 1
+        if known > self.count:
+            self.new_lineages(np.full(known - self.count, NO_LINEAGE), tick)
+        heads = np.concatenate(
+            (store.alive_indices(CellType.BRAIN), store.alive_indices(CellType.SEED))
+        )
+        heads = heads[store.lineage[heads] == NO_LINEAGE]
+        store.lineage[heads] = self.new_lineages(np.full(len(heads), NO_LINEAGE), tick)
+
+        # Conduits take the lineage of the brain their chain ends in, then the
+        # cells connected to a labelled cell take its lineage
+        transport = self.scheduler.transport
+        conduits = transport.conduits
+        roots = transport.root[conduits]
+        rooted = conduits[(roots != NO_ROOT) & (store.lineage[conduits] == NO_LINEAGE)]
+        store.lineage[rooted] = store.lineage[transport.root[rooted]]
+        cells = store.alive_indices()
+        cells = cells[
+            (store.lineage[cells] == NO_LINEAGE)
+            & (store.connection[cells] != NO_CONNECTION)
+        ]
+        store.lineage[cells] = store.lineage[store.connection[cells]]
+
+    def record_births(self, born: np.ndarray, parents: np.ndarray) -> None:
+        """
+        Count the cells created by each lineage, as the "cell_birth" observer.
+
+        Args:
+            born (np.ndarray): The indices of the newborn cells.
+            parents (np.ndarray): The indices of their parent brains.
+        """
+        lineages = self.store.lineage[parents[parents != NO_PARENT]]
+        lineages = lineages[lineages != NO_LINEAGE]
+        self.offspring[: self.count] += np.bincount(lineages, minlength=self.count)
+
+    def collect(self, tick: int) -> None:
+        """
+        Add the energy harvested since the last call and the lifespan of the living
+        brains to the per-lineage aggregates of the current interval.
+
+        Args:
+            tick (int): The current tick.
+        """
+        store = self.store
+        size = store.size
+        lineages = store.lineage[:size]
+        labelled = lineages != NO_LINEAGE
+        self.harvested[: self.count] += np.bincount(
+            lineages[labelled],
+            weights=store.harvested[:size][labelled],
+            minlength=self.count,
+        )
+        store.harvested[:size] = 0
+
+        brains = store.alive_indices(CellType.BRAIN)
+        brains = brains[store.lineage[brains] != NO_LINEAGE]
+        lived = tick + 1 - np.maximum(store.birth_tick[brains], self._window_start)
+        self.lifespan[: self.count] += np.bincount(
+            store.lineage[brains], weights=lived, minlength=self.count
+        ).astype(np.int64)
+        self._window_start = tick + 1
+
+    def fitness(self) -> np.ndarray:
+        """
+        Return the fitness of every lineage over the current interval.
+
+        Returns:
+            np.ndarray: The weighted sum of the energy harvested, offspring count
+                and lifespan of each lineage.
+        """
+        n = self.count
+        harvest_weight, offspring_weight, lifespan_weight = self.weights
+        return (
+            harvest_weight * self.harvested[:n]
+            + offspring_weight * self.offspring[:n]
+            + lifespan_weight * self.lifespan[:n]
+        )
+
+    def select(self, tick: int) -> dict:
+        """
+        Run one selection round: rank the living lineages, replace the genomes of
+        the brains of the lowest ranked ones with mutated copies of the highest
+        ranked ones, and start a new interval.
+
+        Args:
+            tick (int): The current tick.
+
+        Returns:
+            dict: A summary of the round.
+        """
+        store = self.store
+        self.collect(tick)
+        fitness = self.fitness()
+
+        brains = store.alive_indices(CellType.BRAIN)
+        brains = brains[
+            (store.lineage[brains] != NO_LINEAGE)
+            & (store.genome_handle[brains] != NO_GENOME)
+        ]
+        living, first = np.unique(store.lineage[brains], return_index=True)
+        replaced = int(len(living) * self.replacement)
+        if replaced and len(living) >= 2 * replaced:
+            order = np.argsort(fitness[living], kind="stable")
+            losers = living[order[:replaced]]
+            elite = order[len(order) - replaced :]
+            chosen = elite[self.rng.integers(0, replaced, size=replaced)]
+
+            # One mutated genome per losing lineage, shared by all its brains
+            pool = store.genomes
+            parents = store.genome_handle[brains[first[chosen]]]
+            children = pool.mutate_many(parents, self.mutation_rate, self.rng)
+            # Compile the children from their parents' phenotypes, recompiling
+            # only the mutated segments
+            self.scheduler.decoder.decode_handles(pool, children, parents)
+            slot = np.full(self.count, -1, dtype=np.int64)
+            slot[losers] = np.arange(replaced)
+            targets = brains[slot[store.lineage[brains]] >= 0]
+            handles = children[slot[store.lineage[targets]]]
+            pool.acquire(handles)
+            pool.release(children)
+            pool.release(store.genome_handle[targets])
+            store.genome_handle[targets] = handles
+
+            # Every cell of a losing lineage moves to its child lineage
+            remap = np.arange(self.count, dtype=np.int32)
+            remap[losers] = self.new_lineages(living[chosen], tick)
+            lineages = store.lineage[: store.size]
+            labelled = lineages != NO_LINEAGE
+            lineages[labelled] = remap[lineages[labelled]]
+
+        summary = {
+            "generation": self.generation,
+            "tick": tick,
+            "lineages": len(living),
+            "replaced": replaced if len(living) >= 2 * replaced else 0,
+            "best_fitness": float(fitness[living].max()) if len(living) else 0.0,
+            "mean_fitness": float(fitness[living].mean()) if len(living) else 0.0,
+        }
+        self.history.append(summary)
+        self.generation += 1
+        self.harvested[:] = 0
+        self.offspring[:] = 0
+        self.lifespan[:] = 0
+        return summary
+
+    def step(self, tick: int) -> None:
+        """
+        Run the evolution phase of a tick: a selection round every `interval`
+        ticks.
+
+        Args:
+            tick (int): The current tick.
+        """
+        if (tick + 1) % self.interval == 0:
+            self.select(tick)
+
+    def fast_evolve(self, generations: int) -> list[dict]:
+        """
+        Run a number of generations headless, as fast as possible.
+
+        The scheduler's phases are called directly, bypassing Scheduler.step:
+        observers (rendering), per-phase timers and cell update counting are
+        skipped, and the ticks are not included in Scheduler.report(). So are the
+        energy ledger, checkpoints, the recorder, metrics and the profiler, even
+        when enabled.
+
+        Args:
+            generations (int): The number of selection rounds to run.
+
+        Returns:
+            list[dict]: The summary of each round.
+        """
+        scheduler = self.scheduler
+        actions = scheduler.sequence.actions
+        target = self.generation + generations
+        while self.generation < target:
+            tick = scheduler.tick
+            for action in actions:
+                action(tick)
+            scheduler.tick = tick + 1
+        return self.history[-generations:] if generations else []
@@ -0,0 +1,305 @@
+# src/dynamics/genetic.py
+
+import itertools
+
+import numpy as np
+
+from src.utils.rng import default_service
+
+# Number of genes of every genome, each an integer in the range 0-255.
+GENOME_LENGTH = 32
+
+# Per-gene mutation probability, as in BaseCell.mutate.
+MUTATION_RATE = 0.01
+
+# Handle of cells without a genome.
+NO_GENOME = -1
+
+# Source of the process-wide identity of every GenomePool.
+_pool_ids = itertools.count()
+
+
+class GenomePool:
+    """
+    The GenomePool class stores every genome of the simulation packed into one
+    contiguous (slots, GENOME_LENGTH) uint8 array.
+
+    Cells refer to genomes by handle (a slot index). Identical genomes are
+    deduplicated: interning a genome that is already stored returns the existing
+    handle and bumps its reference count, so a large clonal population shares a
+    single row. Rows are never modified while shared; writes go through
+    copy-on-write, and rows are recycled when their last reference is released.
+
+    Mutation and crossover operate on batches of handles with a single masked
+    vector operation.
+
+    Every pool has a process-wide `uid`, and the `version` of a row counts its
+    allocations, so that caches keyed by handle, such as the PhenotypeDecoder,
+    never mistake a recycled row for the genome it held before.
+    """
+
+    def __init__(self, length: int = GENOME_LENGTH, capacity: int = 1024):
+        """
+        Initialize an empty pool.
+
+        Args:
+            length (int): The number of genes of every genome.
+            capacity (int): The number of rows to preallocate.
+        """
+        self.length = length
+        self.data = np.zeros((capacity, length), dtype=np.uint8)
+        self.refcount = np.zeros(capacity, dtype=np.int64)
+        self.version = np.zeros(capacity, dtype=np.int64)
+        self.uid = next(_pool_ids)
+        self.size = 0
+        self._lookup: dict[bytes, int] = {}
+        self._free: list[int] = []
+
+    @classmethod
+    def from_arrays(
+        cls, data: np.ndarray, refcount: np.ndarray, free: np.ndarray
+    ) -> "GenomePool":
+        """
+        Build a pool around existing arrays, e.g. memory-mapped from a checkpoint.
+        Rows with references are indexed for deduplication.
+
+        Args:
+            data (np.ndarray): The (size, length) rows of the pool.
+            refcount (np.ndarray): The reference count of each row.
+            free (np.ndarray): The handles of the recycled rows.
+
+        Returns:
+            GenomePool: The pool, holding the given arrays.
+        """
+        pool = cls.__new__(cls)
+        pool.length = data.shape[1]
+        pool.data = data
+        pool.refcount = refcount
+        pool.version = np.zeros(len(data), dtype=np.int64)
+        pool.uid = next(_pool_ids)
+        pool.size = len(data)
+        live = np.flatnonzero(refcount > 0)
+        keys = np.ascontiguousarray(data[live]).view(np.dtype((np.void, pool.length)))
+        pool._lookup = dict(zip(keys.reshape(-1).tolist(), live.tolist()))
+        pool._free = free.tolist()
+        return pool
+
+    def __len__(self) -> int:
+        """
+        Return the number of distinct genomes stored.
+        """
+        return len(self._lookup)
+
+    @property
+    def references(self) -> int:
+        """
+        The total number of references held on genomes.
+        """
+        return int(self.refcount[: self.size].sum())
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory held by the packed rows, reference counts and versions, in bytes.
+        """
+        return self.data.nbytes + self.refcount.nbytes + self.version.nbytes
+
+    def _grow(self) -> None:
+        capacity = max(len(self.data), 1) * 2
+        data = np.zeros((capacity, self.length), dtype=np.uint8)
+        data[: self.size] = self.data[: self.size]
+        refcount = np.zeros(capacity, dtype=np.int64)
+        refcount[: self.size] = self.refcount[: self.size]
+        version = np.zeros(capacity, dtype=np.int64)
+        version[: self.size] = self.version[: self.size]
+        self.data, self.refcount, self.version = data, refcount, version
+
+    def _allocate(self, count: int = 1) -> np.ndarray:
+        # Take rows from the free list first, then from the end of the pool
+        reused = self._free[len(self._free) - min(count, len(self._free)) :]
+        del self._free[len(self._free) - len(reused) :]
+        fresh = count - len(reused)
+        while self.size + fresh > len(self.data):
+            self._grow()
+        slots = np.concatenate(
+            (np.array(reused, dtype=np.int64), np.arange(self.size, self.size + fresh))
+        )
+        self.size += fresh
+        self.version[slots] += 1
+        return slots
+
+    def intern(self, genome) -> int:
+        """
+        Store a genome, or reuse the identical one already stored, and take a
+        reference on it.
+
+        Args:
+            genome: A sequence of GENOME_LENGTH gene values in the range 0-255.
+
+        Returns:
+            int: The handle of the genome.
+        """
+        row = np.asarray(genome, dtype=np.uint8)
+        if row.shape != (self.length,):
+            raise ValueError(
+                f"Expected a genome of {self.length} genes, got shape {row.shape}"
+            )
+        key = row.tobytes()
+        handle = self._lookup.get(key)
+        if handle is None:
+            handle = int(self._allocate()[0])
+            self.data[handle] = row
+            self._lookup[key] = handle
+        self.refcount[handle] += 1
+        return handle
+
+    def intern_many(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Store many genomes at once, deduplicating them against each other and
+        against the pool.
+
+        Args:
+            rows (np.ndarray): A (n, GENOME_LENGTH) array of genomes.
+
+        Returns:
+            np.ndarray: The handle of each genome.
+        """
+        if len(rows) == 0:
+            return np.empty(0, dtype=np.int64)
+        # Compare whole rows as single opaque values, much faster than axis=0
+        rows = np.ascontiguousarray(rows, dtype=np.uint8)
+        keys = rows.view(np.dtype((np.void, self.length))).reshape(-1)
+        unique, first, inverse, counts = np.unique(
+            keys, return_index=True, return_inverse=True, return_counts=True
+        )
+        unique = unique.tolist()
+        get = self._lookup.get
+        handles = np.array([get(key, NO_GENOME) for key in unique], dtype=np.int64)
+        missing = np.flatnonzero(handles == NO_GENOME)
+        if len(missing):
+            slots = self._allocate(len(missing))
+            self.data[slots] = rows[first[missing]]
+            handles[missing] = slots
+            self._lookup.update(
+                zip([unique[i] for i in missing.tolist()], slots.tolist())
+            )
+        self.refcount[handles] += counts
+        return handles[inverse.reshape(-1)]
+
+    def get(self, handle: int) -> np.ndarray:
+        """
+        Return a read-only view of a genome.
+
+        Args:
+            handle (int): The handle of the genome.
+
+        Returns:
+            np.ndarray: The genes of the genome.
+        """
+        view = self.data[handle]
+        view.flags.writeable = False
+        return view
+
+    def acquire(self, handles) -> None:
+        """
+        Take an extra reference on genomes, e.g. for an unmutated offspring.
+
+        Args:
+            handles: A handle or an array of handles.
+        """
+        handles = np.asarray(handles)
+        np.add.at(self.refcount, handles[handles != NO_GENOME], 1)
+
+    def release(self, handles) -> None:
+        """
+        Drop references on genomes, recycling rows that are no longer used.
+
+        Args:
+            handles: A handle or an array of handles.
+        """
+        handles = np.atleast_1d(np.asarray(handles))
+        handles = handles[handles != NO_GENOME]
+        np.add.at(self.refcount, handles, -1)
+        freed = np.unique(handles[self.refcount[handles] == 0])
+        if len(freed) == 0:
+            return
+        keys = self.data[freed].view(np.dtype((np.void, self.length))).reshape(-1)
+        lookup = self._lookup
+        for key in keys.tolist():
+            del lookup[key]
+        self._free.extend(freed.tolist())
+
+    def write(self, handle: int, genome) -> int:
+        """
+        Replace a genome held by one owner, copying it first if it is shared.
+
+        Args:
+            handle (int): The handle currently held by the owner, or NO_GENOME.
+            genome: The new genes.
+
+        Returns:
+            int: The handle the owner holds from now on.
+        """
+        new_handle = self.intern(genome)
+        if handle != NO_GENOME:
+            self.release(handle)
+        return new_handle
+
+    def mutate_many(
+        self,
+        handles: np.ndarray,
+        rate: float = MUTATION_RATE,
+        rng: np.random.Generator | None = None,
+    ) -> np.ndarray:
+        """
+        Produce mutated copies of many genomes in one masked vector operation.
+
+        Each gene of each genome is replaced by a random value with probability
+        `rate`. Genomes without any mutation share their parent's row.
+
+        Args:
+            handles (np.ndarray): The handles of the parent genomes.
+            rate (float): The per-gene mutation probability.
+            rng (np.random.Generator | None): The random stream to draw from; the
+                default service's "mutation" stream if omitted.
+
+        Returns:
+            np.ndarray: A new handle for each parent, already referenced.
+        """
+        if rng is None:
+            rng = default_service().stream("mutation")
+        handles = np.asarray(handles, dtype=np.int64)
+        rows = self.data[handles]
+        mask = rng.random(rows.shape) < rate
+        rows[mask] = rng.integers(0, 256, size=int(mask.sum()), dtype=np.uint8)
+        changed = mask.any(axis=1)
+
+        result = handles.copy()
+        self.acquire(handles[~changed])
+        result[changed] = self.intern_many(rows[changed])
+        return result
+
+    def crossover_many(
+        self,
+        first: np.ndarray,
+        second: np.ndarray,
+        rng: np.random.Generator | None = None,
+    ) -> np.ndarray:
+        """
+        Produce offspring genomes by uniform crossover of pairs of parents.
+
+        Args:
+            first (np.ndarray): The handles of the first parents.
+            second (np.ndarray): The handles of the second parents.
+            rng (np.random.Generator | None): The random stream to draw from; the
+                default service's "crossover" stream if omitted.
+
+        Returns:
+            np.ndarray: The handle of each offspring, already referenced.
+        """
+        if rng is None:
+            rng = default_service().stream("crossover")
+        a = self.data[np.asarray(first, dtype=np.int64)]
+        b = self.data[np.asarray(second, dtype=np.int64)]
+        mask = rng.random(a.shape) < 0.5
+        return self.intern_many(np.where(mask, a, b))
@@ -0,0 +1,377 @@
+# src/dynamics/interaction.py
+
+import numpy as np
+
+from src.cells.cell_store import NO_CONNECTION
+from src.cells.cell_type import NUM_CELL_TYPES, CellType
+from src.core.grid import NO_CELL
+from src.dynamics.ledger import EXTERNAL
+from src.dynamics.transport import NO_ROOT
+
+# Fraction of a victim's energy taken by a bite.
+CONSUMPTION_RATE = 0.1
+
+# Fraction of a bite an attacker keeps, indexed by its CellType code; the rest
+# goes to the soil. Seeds do not feed.
+CONSUMPTION_EFFICIENCY = np.full(NUM_CELL_TYPES, 0.5, dtype=np.float64)
+CONSUMPTION_EFFICIENCY[CellType.EMPTY] = 0.0
+CONSUMPTION_EFFICIENCY[CellType.SEED] = 0.0
+
+# Energy lost to the soil by each cell of a contact that is not a bite.
+COLLISION_COST = 1.0
+
+
+def organism_of(store, transport, indices: np.ndarray) -> np.ndarray:
+    """
+    Return the organism of cells, identified by the brain their conduit chain ends
+    in. Cells without a brain are each an organism of their own, with a distinct
+    negative id.
+
+    Args:
+        store (CellStore): The store holding the cells.
+        transport (TransportEngine): The engine holding the conduit forest.
+        indices (np.ndarray): The indices of the cells.
+
+    Returns:
+        np.ndarray: The organism id of each cell.
+    """
+    types = store.type_code[indices]
+    # Producers and seeds belong to the organism of the cell they feed
+    heads = np.where(
+        (types == CellType.BRAIN) | (types == CellType.CONDUIT),
+        indices,
+        store.connection[indices],
+    )
+    owners = np.full(len(indices), NO_ROOT, dtype=np.int64)
+    linked = heads != NO_CONNECTION
+    heads = heads[linked]
+    owners[linked] = np.where(
+        store.type_code[heads] == CellType.BRAIN, heads, transport.root[heads]
+    )
+    alone = owners == NO_ROOT
+    owners[alone] = -2 - indices[alone]
+    return owners
+
+
+class InteractionEngine:
+    """
+    The InteractionEngine resolves the contacts between organisms in one
+    vectorized pass per tick.
+
+    A contact is a pair of living cells of different organisms on 4-adjacent
+    pixels that are not linked by a connection. Only boundary cells can be in
+    one: cells with such a neighbour. The engine keeps a mask of them, updated
+    from the lifecycle topics around the cells born, killed or promoted and the
+    cells whose organism a death split, and each tick looks up the right and
+    lower neighbours of the boundary cells alone in the occupancy grid. A tick
+    thus costs O(boundary cells), which grows with the contacts rather than the
+    population, and never compares cells pairwise.
+
+    Without an event queue, after a compaction, or after connections changed
+    outside the lifecycle, the mask is recomputed from every living cell; see
+    refresh.
+
+    Contacts are resolved deterministically, from the energy at the start of the
+    step:
+        1. In a contact, the cell with more energy may bite the other one if its
+           type feeds. Each victim is bitten at most once per tick, by its
+           strongest attacker; ties go to the lowest index.
+        2. A bite takes CONSUMPTION_RATE of the victim's energy. The attacker
+           keeps the fraction given by CONSUMPTION_EFFICIENCY and the rest goes
+           to the soil under the victim.
+        3. Every other contact is a collision, in which both cells lose
+           COLLISION_COST to the soil under them, never more than their energy.
+    All energy transfers are applied with scatter-adds.
+    """
+
+    def __init__(
+        self,
+        world,
+        transport,
+        rate: float = CONSUMPTION_RATE,
+        efficiency: np.ndarray = CONSUMPTION_EFFICIENCY,
+        collision_cost: float = COLLISION_COST,
+        organisms=None,
+        events=None,
+    ):
+        """
+        Initialize the engine.
+
+        Args:
+            world (World): The world holding the cells and the grid.
+            transport (TransportEngine): The engine holding the conduit forest,
+                which defines the organisms.
+            rate (float): The fraction of a victim's energy taken per bite.
+            efficiency (np.ndarray): The fraction of a bite kept by the attacker,
+                per CellType code.
+            collision_cost (float): The energy lost by each cell of a collision.
+            organisms (OrganismRegistry | None): The registry looked up for the
+                organism of cells; they are resolved from the transport forest
+                if omitted.
+            events (EventQueue | None): The queue emitting the lifecycle topics,
+                which keep the boundary cells up to date; they are recomputed
+                whenever the living cells change if omitted.
+        """
+        self.world = world
+        self.transport = transport
+        self.rate = rate
+        self.efficiency = np.asarray(efficiency, dtype=np.float64)
+        self.collision_cost = collision_cost
+        self.organisms = organisms
+        self.ledger = None  # An EnergyLedger recording the transfers, if enabled
+        self.contacts = 0
+        self.bites = 0
+        self.collisions = 0
+        self.consumed = 0.0
+        # Whether each slot is a boundary cell, and the organism it had then
+        self.boundary = np.zeros(0, dtype=bool)
+        self.owner = np.zeros(0, dtype=np.int64)
+        self._boundary_cells = None
+        self._cells = None
+        self.events = events
+        self.refresh()
+        if events is not None:
+            events.subscribe("cell_birth", self.on_birth)
+            events.subscribe("cell_death", self.on_death)
+            events.subscribe("cell_promotion", self.on_promotion)
+            events.subscribe("compaction", self.on_compaction)
+
+    def _adjacent(self, cells: np.ndarray, directions: int = 4) -> list[np.ndarray]:
+        # The cell ids on the right, lower, left and upper pixels of cells, or
+        # NO_CELL past the border of the grid
+        store = self.world.cells
+        cell_id = self.world.grid.cell_id
+        height, width = cell_id.shape
+        xs, ys = store.x[cells], store.y[cells]
+        offsets = ys.astype(np.int64) * width + xs
+        steps = (
+            (1, xs == width - 1),
+            (width, ys == height - 1),
+            (-1, xs == 0),
+            (-width, ys == 0),
+        )
+        adjacent = []
+        for step, border in steps[:directions]:
+            neighbours = cell_id.ravel().take(offsets + step, mode="clip")
+            neighbours[border] = NO_CELL
+            adjacent.append(neighbours)
+        return adjacent
+
+    def _update_boundary(self, cells: np.ndarray) -> None:
+        # Recompute whether living cells touch an unlinked cell of another
+        # organism
+        store = self.world.cells
+        if len(self.boundary) < store.capacity:
+            boundary = np.zeros(store.capacity, dtype=bool)
+            boundary[: len(self.boundary)] = self.boundary
+            owner = np.zeros(store.capacity, dtype=np.int64)
+            owner[: len(self.owner)] = self.owner
+            self.boundary, self.owner = boundary, owner
+        connection = store.connection
+        owners = self.organism_of(cells)
+        exposed = np.zeros(len(cells), dtype=bool)
+        for neighbours in self._adjacent(cells):
+            touching = np.flatnonzero(neighbours != NO_CELL)
+            firsts = cells[touching]
+            seconds = neighbours[touching].astype(np.int64)
+            linked = (connection[firsts] == seconds) | (connection[seconds] == firsts)
+            touching, seconds = touching[~linked], seconds[~linked]
+            different = owners[touching] != self.organism_of(seconds)
+            exposed[touching[different]] = True
+        self.boundary[cells] = exposed
+        self.owner[cells] = owners
+        self._boundary_cells = None
+
+    def _with_neighbours(self, cells: np.ndarray) -> np.ndarray:
+        # Living cells and the living cells 4-adjacent to them
+        neighbours = np.concatenate(self._adjacent(cells))
+        neighbours = neighbours[neighbours != NO_CELL].astype(np.int64)
+        cells = cells[self.world.cells.alive[cells]]
+        return np.unique(np.concatenate((cells, neighbours)))
+
+    def refresh(self) -> None:
+        """
+        Recompute the boundary cells from every living cell, e.g. after
+        connections changed outside the lifecycle.
+        """
+        cells = self.world.cells.alive_indices()
+        self.boundary[:] = False
+        self._update_boundary(cells)
+        self._cells = cells
+
+    def on_birth(self, born: np.ndarray, parents: np.ndarray) -> None:
+        """
+        Update the boundary around newborn cells, as the "cell_birth" observer.
+
+        Args:
+            born (np.ndarray): The indices of the newborn cells.
+            parents (np.ndarray): The indices of their parent brains.
+        """
+        self._update_boundary(self._with_neighbours(born))
+
+    def on_death(self, dead: np.ndarray) -> None:
+        """
+        Update the boundary around dead cells and around the cells of the
+        organisms split by the death of their conduits or brain, as the
+        "cell_death" observer.
+
+        Args:
+            dead (np.ndarray): The indices of the cells that died.
+        """
+        store = self.world.cells
+        self.boundary[dead] = False
+        types = store.type_code[dead]
+        linking = (types == CellType.CONDUIT) | (types == CellType.BRAIN)
+        if linking.any():
+            split = np.unique(self.owner[dead[linking]])
+            size = store.size
+            members = np.isin(self.owner[:size], split) & store.alive[:size]
+            dead = np.concatenate((dead, np.flatnonzero(members)))
+        self._update_boundary(self._with_neighbours(dead))
+
+    def on_promotion(self, seeds: np.ndarray) -> None:
+        """
+        Update the boundary around promoted seeds, which lose their connection,
+        as the "cell_promotion" observer.
+
+        Args:
+            seeds (np.ndarray): The indices of the promoted seeds.
+        """
+        self._update_boundary(self._with_neighbours(seeds))
+
+    def on_compaction(self, remap: np.ndarray) -> None:
+        """
+        Recompute the boundary in the new indices, which also renumber the
+        organisms, as the "compaction" observer.
+
+        Args:
+            remap (np.ndarray): The new index of each old slot, or -1 for dead
+                slots.
+        """
+        self.refresh()
+
+    def organism_of(self, cells: np.ndarray) -> np.ndarray:
+        """
+        Return the organism of cells, see organism_of.
+
+        Args:
+            cells (np.ndarray): The indices of the cells.
+
+        Returns:
+            np.ndarray: The organism id of each cell.
+        """
+        if self.organisms is not None:
+            return self.organisms.organism_of(cells)
+        return organism_of(self.world.cells, self.transport, cells)
+
+    def find_contacts(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find the pairs of adjacent living cells of different organisms.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The indices of the first and second
+                cell of each contact, the second being right of or below the
+                first.
+        """
+        store = self.world.cells
+        if self.events is None and store.alive_indices() is not self._cells:
+            self.refresh()
+        if self._boundary_cells is None:
+            self._boundary_cells = np.flatnonzero(self.boundary[: store.size])
+        cells = self._boundary_cells
+
+        # A contact has a boundary cell on each side, so looking right and down
+        # from the boundary cells finds each one once
+        firsts, seconds = [], []
+        for neighbours in self._adjacent(cells, directions=2):
+            touching = neighbours != NO_CELL
+            firsts.append(cells[touching])
+            seconds.append(neighbours[touching].astype(np.int64))
+        firsts = np.concatenate(firsts)
+        seconds = np.concatenate(seconds)
+
+        # Boundary cells also touch cells they are linked to or of their own
+        # organism; drop them
+        connection = store.connection
+        linked = (connection[firsts] == seconds) | (connection[seconds] == firsts)
+        firsts, seconds = firsts[~linked], seconds[~linked]
+        different = self.organism_of(firsts) != self.organism_of(seconds)
+        return firsts[different], seconds[different]
+
+    def step(self, tick: int) -> dict:
+        """
+        Find and resolve the contacts of a tick.
+
+        Args:
+            tick (int): The current tick.
+
+        Returns:
+            dict: The number of contacts, bites and collisions, and the energy
+                kept by the attackers.
+        """
+        store = self.world.cells
+        first, second = self.find_contacts()
+        energy = store.energy
+        first_energy, second_energy = energy[first], energy[second]
+
+        # The stronger cell of each contact attacks, if its type feeds
+        stronger = first_energy >= second_energy
+        attackers = np.where(stronger, first, second)
+        victims = np.where(stronger, second, first)
+        attacker_energy = np.maximum(first_energy, second_energy)
+        feeds = (first_energy != second_energy) & (
+            self.efficiency[store.type_code[attackers]] > 0
+        )
+
+        # One bite per victim: the strongest attacker, then the lowest index
+        candidates = np.flatnonzero(feeds)
+        order = np.lexsort(
+            (
+                attackers[candidates],
+                -attacker_energy[candidates],
+                victims[candidates],
+            )
+        )
+        candidates = candidates[order]
+        victim_order = victims[candidates]
+        first_bite = np.ones(len(candidates), dtype=bool)
+        first_bite[1:] = victim_order[1:] != victim_order[:-1]
+        bites = np.zeros(len(first), dtype=bool)
+        bites[candidates[first_bite]] = True
+
+        biters, bitten = attackers[bites], victims[bites]
+        taken = self.rate * energy[bitten]
+        kept = taken * self.efficiency[store.type_code[biters]]
+
+        energy[bitten] -= taken
+        np.add.at(energy, biters, kept)
+
+        # A cell pays for each of its collisions, never more than the energy it
+        # has left after the bites
+        colliding = np.concatenate((first[~bites], second[~bites]))
+        paying, collisions = np.unique(colliding, return_counts=True)
+        paid = np.minimum(collisions * self.collision_cost, energy[paying])
+        energy[paying] -= paid
+
+        # Victims are distinct, as are paying cells, so each scatter hits distinct
+        # pixels
+        grid = self.world.grid
+        lost = taken - kept
+        grid.energy[store.y[bitten], store.x[bitten]] += lost
+        grid.energy[store.y[paying], store.x[paying]] += paid
+
+        if self.ledger is not None:
+            self.ledger.record("consumption", bitten, biters, kept)
+            self.ledger.record("consumption", bitten, EXTERNAL, lost)
+            self.ledger.record("collision", paying, EXTERNAL, paid)
+
+        self.contacts += len(first)
+        self.bites += len(bitten)
+        self.collisions += len(first) - len(bitten)
+        self.consumed += float(kept.sum())
+        return {
+            "contacts": len(first),
+            "bites": len(bitten),
+            "collisions": len(first) - len(bitten),
+            "consumed": float(kept.sum()),
+        }
@@ -0,0 +1,289 @@
+# src/dynamics/ledger.py
+
+from collections import deque
+
+import numpy as np
+
+from src.cells.cell_type import NUM_CELL_TYPES, CellType
+
+# Endpoint of transfers into or out of the cells: sunlight, soil, metabolism.
+EXTERNAL = -1
+
+# Default number of transfers kept in the ring buffer.
+DEFAULT_CAPACITY = 1 << 20
+
+# Residuals below this fraction of the energy held by the cells are rounding.
+DEFAULT_TOLERANCE = 1e-9
+
+
+class EnergyLedger:
+    """
+    The EnergyLedger records every energy transfer of the simulation and checks
+    that the energy of the cells only changes through recorded transfers.
+
+    Transfers are recorded in batches as parallel (tick, path, source, sink,
+    amount) arrays in preallocated ring buffers; EXTERNAL stands for the outside
+    of the cells, e.g. the sunlight or the soil. The path is the name of the code
+    path making the transfer, e.g. "transport" or "death".
+
+    Conservation is checked per phase of the scheduler: at the end of a phase the
+    change of every cell's energy must equal its recorded inflow minus outflow.
+    Any residual is energy created or destroyed by unrecorded code, and is
+    localized to the phase and the type of the cells it appeared in.
+
+    Components hold a `ledger` attribute, None when the ledger is disabled, and
+    test it once per batched transfer, so a disabled ledger costs a few attribute
+    checks per tick. See Scheduler.enable_ledger.
+    """
+
+    def __init__(
+        self,
+        store,
+        capacity: int = DEFAULT_CAPACITY,
+        history: int = 1024,
+        tolerance: float = DEFAULT_TOLERANCE,
+    ):
+        """
+        Initialize an empty ledger.
+
+        Args:
+            store (CellStore): The store holding the cells.
+            capacity (int): The number of transfers kept in the ring buffer.
+            history (int): The number of ticks and leaks kept.
+            tolerance (float): The residual, as a fraction of the energy held by
+                the cells, below which a phase is considered balanced.
+        """
+        self.store = store
+        self.capacity = capacity
+        self.history = history
+        self.tolerance = tolerance
+        self.ticks = np.zeros(capacity, dtype=np.int64)
+        self.path_codes = np.zeros(capacity, dtype=np.int16)
+        self.sources = np.zeros(capacity, dtype=np.int64)
+        self.sinks = np.zeros(capacity, dtype=np.int64)
+        self.amounts = np.zeros(capacity, dtype=np.float64)
+        self.recorded = 0
+
+        self.paths: dict[str, int] = {}
+        # Inflow from EXTERNAL, outflow to EXTERNAL and internal volume per path
+        self.path_totals = np.zeros((16, 3), dtype=np.float64)
+        self.residuals = np.zeros(history, dtype=np.float64)
+        self.leak_totals: dict[tuple[str, str], float] = {}
+        self.leaks: deque[dict] = deque(maxlen=history)
+
+        self.tick = 0
+        self.phase = None
+        self._residual = 0.0
+        self._before = np.empty(0, dtype=np.float64)
+        self._types = np.empty(0, dtype=np.uint8)
+        self._expected = np.empty(0, dtype=np.float64)
+
+    def _path_code(self, path: str) -> int:
+        code = self.paths.get(path)
+        if code is None:
+            code = self.paths[path] = len(self.paths)
+            if code == len(self.path_totals):
+                self.path_totals = np.concatenate(
+                    (self.path_totals, np.zeros_like(self.path_totals))
+                )
+        return code
+
+    def record(self, path: str, sources, sinks, amounts: np.ndarray) -> None:
+        """
+        Record a batch of transfers.
+
+        Args:
+            path (str): The name of the code path making the transfers.
+            sources: The indices of the sending cells, or EXTERNAL, as an array
+                or a single value.
+            sinks: The indices of the receiving cells, or EXTERNAL, as an array
+                or a single value.
+            amounts (np.ndarray): The energy of each transfer.
+        """
+        count = len(amounts)
+        if count == 0:
+            return
+        code = self._path_code(path)
+        sources = np.broadcast_to(sources, count)
+        sinks = np.broadcast_to(sinks, count)
+
+        # Write the last `capacity` transfers of the batch into the ring buffer,
+        # in at most two contiguous chunks
+        kept = min(count, self.capacity)
+        start = (self.recorded + count - kept) % self.capacity
+        head = min(kept, self.capacity - start)
+        for ring, batch in (
+            (slice(start, start + head), slice(count - kept, count - kept + head)),
+            (slice(0, kept - head), slice(count - kept + head, count)),
+        ):
+            self.ticks[ring] = self.tick
+            self.path_codes[ring] = code
+            self.sources[ring] = sources[batch]
+            self.sinks[ring] = sinks[batch]
+            self.amounts[ring] = amounts[batch]
+        self.recorded += count
+
+        inside_source = sources != EXTERNAL
+        inside_sink = sinks != EXTERNAL
+        totals = self.path_totals[code]
+        totals[0] += amounts[~inside_source].sum()
+        totals[1] += amounts[~inside_sink].sum()
+        totals[2] += amounts[inside_source & inside_sink].sum()
+
+        if self.phase is None:
+            return
+        top = max(sources.max(), sinks.max()) + 1
+        if top > len(self._expected):
+            expected = np.zeros(max(top, self.store.capacity), dtype=np.float64)
+            expected[: len(self._expected)] = self._expected
+            self._expected = expected
+        np.add.at(self._expected, sinks[inside_sink], amounts[inside_sink])
+        np.subtract.at(self._expected, sources[inside_source], amounts[inside_source])
+
+    def begin_tick(self, tick: int) -> None:
+        """
+        Start recording a tick.
+
+        Args:
+            tick (int): The tick.
+        """
+        self.tick = tick
+        self._residual = 0.0
+
+    def end_tick(self) -> float:
+        """
+        Finish a tick and store its global residual.
+
+        Returns:
+            float: The energy created (positive) or destroyed (negative) by
+                unrecorded code during the tick.
+        """
+        self.residuals[self.tick % self.history] = self._residual
+        return self._residual
+
+    def begin_phase(self, name: str) -> None:
+        """
+        Snapshot the energy of the cells at the start of a phase.
+
+        Args:
+            name (str): The name of the phase.
+        """
+        self.phase = name
+        self._snapshot()
+
+    def _snapshot(self) -> None:
+        size = self.store.size
+        self._before = self.store.energy[:size].copy()
+        self._types = self.store.type_code[:size].copy()
+        self._expected = np.zeros(self.store.capacity, dtype=np.float64)
+
+    def end_phase(self) -> float:
+        """
+        Check the conservation of energy over the phase.
+
+        Returns:
+            float: The residual of the phase.
+        """
+        store = self.store
+        size = store.size
+        types = store.type_code[:size].copy()
+        types[: len(self._types)] = np.where(
+            store.alive[: len(self._types)], types[: len(self._types)], self._types
+        )
+        residual = self._check(store.energy[:size], types)
+        self.phase = None
+        return residual
+
+    def on_compaction(self, remap: np.ndarray) -> None:
+        """
+        Check the part of the phase before a compaction of the cell store and
+        restart the phase in the new indices, as the "compaction" observer.
+
+        Args:
+            remap (np.ndarray): The new index of each old index, or -1.
+        """
+        if self.phase is None:
+            return
+        store = self.store
+        kept = np.flatnonzero(remap >= 0)
+        after = np.zeros(len(remap), dtype=np.float64)
+        after[kept] = store.energy[remap[kept]]
+        types = self._types.copy()
+        types.resize(len(remap), refcheck=False)
+        types[kept] = store.type_code[remap[kept]]
+        self._check(after, types)
+        self._snapshot()
+
+    def _check(self, after: np.ndarray, types: np.ndarray) -> float:
+        size = len(after)
+        change = after.astype(np.float64)
+        change[: len(self._before)] -= self._before[:size]
+        residuals = change - self._expected[:size]
+        residual = float(residuals.sum())
+        self._residual += residual
+
+        scale = float(np.abs(after).sum()) + float(np.abs(self._before).sum())
+        by_type = np.bincount(types, weights=residuals, minlength=NUM_CELL_TYPES)
+        for code in np.flatnonzero(np.abs(by_type) > self.tolerance * max(scale, 1)):
+            cell_type = CellType(int(code)).name
+            key = (self.phase, cell_type)
+            self.leak_totals[key] = self.leak_totals.get(key, 0.0) + float(
+                by_type[code]
+            )
+            self.leaks.append(
+                {
+                    "tick": self.tick,
+                    "phase": self.phase,
+                    "cell_type": cell_type,
+                    "residual": float(by_type[code]),
+                }
+            )
+        return residual
+
+    def transfers(self, count: int | None = None) -> dict[str, np.ndarray]:
+        """
+        Return the most recent transfers still in the ring buffer, oldest first.
+        Cell indices are those of the tick the transfer was recorded on.
+
+        Args:
+            count (int | None): The number of transfers; all kept ones if omitted.
+
+        Returns:
+            dict[str, np.ndarray]: The "tick", "path", "source", "sink" and
+                "amount" arrays.
+        """
+        kept = min(self.recorded, self.capacity)
+        if count is not None:
+            kept = min(kept, count)
+        positions = np.arange(self.recorded - kept, self.recorded) % self.capacity
+        names = np.array(list(self.paths) or [""], dtype=object)
+        return {
+            "tick": self.ticks[positions],
+            "path": names[self.path_codes[positions]],
+            "source": self.sources[positions],
+            "sink": self.sinks[positions],
+            "amount": self.amounts[positions],
+        }
+
+    def report(self) -> dict:
+        """
+        Summarize the transfers and the conservation checks.
+
+        Returns:
+            dict: The number of transfers recorded, the inflow, outflow and
+                internal volume of each path, and the total residual of each
+                (phase, cell type) found to leak.
+        """
+        return {
+            "transfers": self.recorded,
+            "paths": {
+                path: dict(
+                    zip(
+                        ("inflow", "outflow", "internal"),
+                        self.path_totals[code].tolist(),
+                    )
+                )
+                for path, code in self.paths.items()
+            },
+            "leaks": dict(self.leak_totals),
+        }
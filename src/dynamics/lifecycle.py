@@ -0,0 +1,279 @@
+# src/dynamics/lifecycle.py
+
+import numpy as np
+
+from src.cells.cell_store import NO_CONNECTION, NO_LINEAGE
+from src.cells.cell_type import CellType
+from src.core.grid import NO_CELL
+from src.dynamics.ledger import EXTERNAL
+
+# Organic matter released into the soil by each dead cell.
+DEAD_CELL_ORGANIC_MATTER = 1.0
+
+# Compact the cell store when this fraction of its slots is dead.
+COMPACTION_THRESHOLD = 0.5
+
+# Do not compact stores smaller than this many slots.
+MIN_COMPACTION_SIZE = 1024
+
+# Parent index of cells not created by a brain.
+NO_PARENT = -1
+
+
+class Lifecycle:
+    """
+    The Lifecycle class collects the deaths, seed promotions and births requested
+    during a tick and applies them in one batch at the end of it.
+
+    Applying a tick:
+        1. Dead cells release their energy and organic matter into the soil
+           fields with a scatter-add, leave the grid and the transport forest,
+           and their slots go on the cell store's free list. Cells connected to a
+           dead cell are disconnected. "cell_death" and "conduit_death" are
+           emitted.
+        2. Seeds are promoted to brains in place: same slot, same grid pixel.
+        3. Newborn cells take free grid positions, the first request winning
+           each pixel, reuse free slots and join the transport forest.
+           "cell_birth" is emitted.
+        4. When the dead fraction of the store exceeds the compaction threshold,
+           the store is compacted and "compaction" is emitted with the index
+           remap, so that holders of cell indices can rewrite them.
+    Promoted seeds are emitted as "cell_promotion". With an OrganismRegistry
+    set as `organisms`, the death of a brain takes its whole organism with it in
+    the same batch.
+    """
+
+    def __init__(
+        self,
+        world,
+        transport,
+        events,
+        organic_matter: float = DEAD_CELL_ORGANIC_MATTER,
+        compaction_threshold: float = COMPACTION_THRESHOLD,
+    ):
+        """
+        Initialize the lifecycle.
+
+        Args:
+            world (World): The world holding the cells and the grid.
+            transport (TransportEngine): The engine holding the conduit forest.
+            events (EventQueue): The queue used to emit lifecycle topics.
+            organic_matter (float): The organic matter released per dead cell.
+            compaction_threshold (float): The dead fraction of the store above
+                which it is compacted.
+        """
+        self.world = world
+        self.transport = transport
+        self.events = events
+        self.organic_matter = organic_matter
+        self.compaction_threshold = compaction_threshold
+        self._dying: list[np.ndarray] = []
+        self._promoting: list[np.ndarray] = []
+        self._births: list[tuple] = []
+        self.deaths = 0
+        self.births = 0
+        self.compactions = 0
+        self.ledger = None  # An EnergyLedger recording released energy, if enabled
+        self.organisms = None  # An OrganismRegistry expanding brain deaths, if set
+        self.profiler = None  # A Profiler timing deaths and births, if enabled
+
+    def kill(self, indices: np.ndarray) -> None:
+        """
+        Queue cells to die at the end of the tick.
+
+        Args:
+            indices (np.ndarray): The indices of the cells.
+        """
+        if len(indices):
+            self._dying.append(indices)
+
+    def promote(self, seeds: np.ndarray) -> None:
+        """
+        Queue seeds to become brain cells at the end of the tick.
+
+        Args:
+            seeds (np.ndarray): The indices of the seed cells.
+        """
+        if len(seeds):
+            self._promoting.append(seeds)
+
+    def spawn(
+        self,
+        cell_type: int,
+        xs: np.ndarray,
+        ys: np.ndarray,
+        energy: float,
+        connections=NO_CONNECTION,
+        parents: np.ndarray | None = None,
+    ) -> None:
+        """
+        Queue cells of one type to be born at the end of the tick. Cells whose
+        position is out of bounds or already taken are not born.
+
+        Args:
+            cell_type (int): The CellType code of the new cells.
+            xs (np.ndarray): The x coordinates.
+            ys (np.ndarray): The y coordinates.
+            energy (float): The initial energy of each cell.
+            connections: The connection indices, either an array or a single value.
+            parents (np.ndarray | None): The brains creating the cells, whose
+                lineage the cells inherit.
+        """
+        if len(xs) == 0:
+            return
+        if parents is None:
+            parents = np.full(len(xs), NO_PARENT, dtype=np.int64)
+        connections = np.broadcast_to(connections, len(xs))
+        self._births.append((cell_type, xs, ys, energy, connections, parents))
+
+    def apply(self, tick: int) -> None:
+        """
+        Apply the deaths, promotions and births queued during a tick.
+
+        Args:
+            tick (int): The current tick.
+        """
+        profiler = self.profiler
+        if self._dying:
+            if profiler is not None:
+                profiler.begin("deaths")
+            self._apply_deaths(np.concatenate(self._dying))
+            self._dying.clear()
+            if profiler is not None:
+                profiler.end()
+        if self._promoting:
+            seeds = np.unique(np.concatenate(self._promoting))
+            self._promoting.clear()
+            if profiler is not None:
+                profiler.begin("promotions", CellType.SEED, len(seeds))
+            self._apply_promotions(seeds)
+            if profiler is not None:
+                profiler.end()
+        if self._births:
+            self._apply_births(tick)
+        store = self.world.cells
+        if (
+            store.size >= MIN_COMPACTION_SIZE
+            and store.free_slots > self.compaction_threshold * store.size
+        ):
+            if profiler is not None:
+                profiler.begin("compaction")
+            self.compact()
+            if profiler is not None:
+                profiler.end()
+
+    def _apply_deaths(self, requested: np.ndarray) -> None:
+        world = self.world
+        cells = world.cells
+        grid = world.grid
+        size = cells.size
+        if self.organisms is not None:
+            requested = self.organisms.with_members(requested)
+
+        # A mask deduplicates the requests without sorting; its extra last entry
+        # stays False so that NO_CONNECTION (-1) can index it below
+        is_dead = np.zeros(size + 1, dtype=bool)
+        is_dead[requested] = True
+        is_dead[:size] &= cells.alive[:size]
+        dead = np.flatnonzero(is_dead)
+        if len(dead) == 0:
+            return
+        xs, ys = cells.x[dead], cells.y[dead]
+
+        # Return the cells' energy and matter to the soil. A pixel holds at most
+        # one cell, so the positions are distinct and no scatter-add is needed
+        grid.energy[ys, xs] += cells.energy[dead]
+        if self.ledger is not None:
+            self.ledger.record("death", dead, EXTERNAL, cells.energy[dead])
+        grid.organic_matter[ys, xs] += grid.organic_matter.dtype.type(
+            self.organic_matter
+        )
+        cells.energy[dead] = 0
+        cells.kill_many(dead)
+        grid.clear_many(xs, ys)
+
+        types = cells.type_code[dead]
+        linked = dead[(types == CellType.CONDUIT) | (types == CellType.BRAIN)]
+        for index in linked.tolist():
+            self.transport.remove(index)
+
+        # Nothing may keep pointing at a slot that is about to be reused
+        connection = cells.connection[:size]
+        connection[is_dead[connection]] = NO_CONNECTION
+
+        self.deaths += len(dead)
+        self.events.emit("cell_death", dead)
+        conduits = dead[types == CellType.CONDUIT]
+        if len(conduits):
+            self.events.emit("conduit_death", conduits)
+
+    def _apply_promotions(self, seeds: np.ndarray) -> None:
+        cells = self.world.cells
+        seeds = seeds[cells.alive[seeds] & (cells.type_code[seeds] == CellType.SEED)]
+        if len(seeds):
+            cells.set_type(seeds, CellType.BRAIN)
+            cells.connection[seeds] = NO_CONNECTION
+            self.world.grid.cell_type[cells.y[seeds], cells.x[seeds]] = CellType.BRAIN
+            self.events.emit("cell_promotion", seeds)
+
+    def _apply_births(self, tick: int) -> None:
+        world = self.world
+        cells = world.cells
+        grid = world.grid
+        profiler = self.profiler
+        for cell_type, xs, ys, energy, connections, parents in self._births:
+            if profiler is not None:
+                profiler.begin("births", cell_type)
+            inside = (xs >= 0) & (xs < grid.width) & (ys >= 0) & (ys < grid.height)
+            xs, ys = xs[inside], ys[inside]
+            connections, parents = connections[inside], parents[inside]
+            free = grid.cell_id[ys, xs] == NO_CELL
+            xs, ys = xs[free], ys[free]
+            connections, parents = connections[free], parents[free]
+            # Claim the free pixels with markers written in reverse order, so the
+            # first request for a pixel wins without sorting the requests
+            markers = NO_CELL - 1 - np.arange(len(xs), dtype=np.int32)
+            grid.cell_id[ys[::-1], xs[::-1]] = markers[::-1]
+            won = grid.cell_id[ys, xs] == markers
+            xs, ys = xs[won], ys[won]
+            connections, parents = connections[won], parents[won]
+            if len(xs) == 0:
+                if profiler is not None:
+                    profiler.end(0)
+                continue
+
+            lineages = np.full(len(xs), NO_LINEAGE, dtype=np.int32)
+            known = parents != NO_PARENT
+            lineages[known] = cells.lineage[parents[known]]
+            born = cells.add_many(
+                cell_type,
+                xs,
+                ys,
+                energy,
+                connections,
+                lineages=lineages,
+                birth_tick=tick,
+            )
+            grid.place_many(xs, ys, born, cell_type)
+            self.transport.add_cells(born)
+            if self.ledger is not None:
+                self.ledger.record("birth", EXTERNAL, born, cells.energy[born])
+            self.births += len(born)
+            self.events.emit("cell_birth", born, parents)
+            if profiler is not None:
+                profiler.end(len(born))
+        self._births.clear()
+
+    def compact(self) -> np.ndarray:
+        """
+        Compact the cell store now and rewrite the grid and transport forest.
+
+        Returns:
+            np.ndarray: The new index of each old slot, or -1 for dead slots.
+        """
+        remap = self.world.cells.compact()
+        self.world.grid.remap_ids(remap)
+        self.transport.compile()
+        self.compactions += 1
+        self.events.emit("compaction", remap)
+        return remap
@@ -0,0 +1,274 @@
+# src/dynamics/organisms.py
+
+import numpy as np
+
+from src.cells.cell_store import NO_CONNECTION
+from src.cells.cell_type import NUM_CELL_TYPES, CellType
+
+# Organism of living cells whose connections do not lead to a brain.
+NO_ORGANISM = -1
+
+
+class OrganismRegistry:
+    """
+    The OrganismRegistry tracks the organisms of the simulation: the trees of
+    cells linked through their connections, each identified by the index of the
+    brain at its root.
+
+    The organism of every cell slot is kept in the `organism` array, so looking a
+    cell up is O(1). Dead slots hold NO_ORGANISM, so the members of organisms are
+    found in one contiguous pass over it. The living members of each organism
+    are counted per cell type in the `counts` table, whose last row counts the
+    living cells outside any organism. Both are maintained incrementally from
+    the lifecycle topics of an event queue:
+        - newborn cells and promoted seeds join the organism of the cell they
+          connect to, or found their own;
+        - dead producers just leave their organism;
+        - the death of a conduit or a brain marks its organism dirty, and only
+          the members of dirty organisms are relabelled from the conduit forest
+          of the TransportEngine, which has already been updated.
+    After a compaction, or connections changed outside the lifecycle, the
+    registry must be rebuilt or the cells relabelled; see rebuild and relabel.
+
+    The total energy of organisms changes every tick, so it is not maintained
+    but summed on demand in a single bincount; see aggregates.
+
+    The registry also expands the death of a brain to the whole organism, so the
+    lifecycle removes it in one batch rather than one conduit link per tick;
+    seeds are spared, as they germinate when their conduit dies. See
+    Lifecycle.organisms.
+    """
+
+    def __init__(self, world, transport, events=None):
+        """
+        Initialize the registry from the current cells.
+
+        Args:
+            world (World): The world holding the cells.
+            transport (TransportEngine): The engine holding the conduit forest.
+            events (EventQueue | None): The queue emitting the lifecycle topics.
+        """
+        self.world = world
+        self.transport = transport
+        self.organism_deaths = 0
+        self.relabelled = 0
+        self.rebuild()
+        if events is not None:
+            events.subscribe("cell_birth", self.on_birth)
+            events.subscribe("cell_death", self.on_death)
+            events.subscribe("cell_promotion", self.on_promotion)
+            events.subscribe("compaction", self.on_compaction)
+
+    def _ensure_capacity(self) -> None:
+        # Follow the store when it grows, keeping the outsiders row last
+        capacity = self.world.cells.capacity
+        if len(self.organism) < capacity:
+            organism = np.full(capacity, NO_ORGANISM, dtype=np.int32)
+            organism[: len(self.organism)] = self.organism
+            counts = np.zeros((capacity + 1, NUM_CELL_TYPES), dtype=np.int64)
+            counts[: len(self.organism)] = self.counts[:-1]
+            counts[-1] = self.counts[-1]
+            self.organism, self.counts = organism, counts
+
+    def resolve(self, cells: np.ndarray) -> np.ndarray:
+        """
+        Compute the organism of cells from their connections: brains found their
+        own, conduits belong to the brain at the root of their chain and other
+        cells to the organism of the cell they feed.
+
+        Args:
+            cells (np.ndarray): The indices of the cells.
+
+        Returns:
+            np.ndarray: The brain index of each cell's organism, or NO_ORGANISM.
+        """
+        store = self.world.cells
+        types = store.type_code[cells]
+        heads = np.where(
+            (types == CellType.BRAIN) | (types == CellType.CONDUIT),
+            cells,
+            store.connection[cells],
+        )
+        organisms = np.full(len(cells), NO_ORGANISM, dtype=np.int64)
+        linked = np.flatnonzero(heads != NO_CONNECTION)
+        heads = heads[linked]
+        brains = store.type_code[heads] == CellType.BRAIN
+        organisms[linked[brains]] = heads[brains]
+        # NO_ROOT and NO_ORGANISM are both -1
+        organisms[linked[~brains]] = self.transport.root[heads[~brains]]
+        return organisms
+
+    def rebuild(self) -> None:
+        """
+        Recompute the organism of every cell and the member counts.
+        """
+        store = self.world.cells
+        capacity = store.capacity
+        self.organism = np.full(capacity, NO_ORGANISM, dtype=np.int32)
+        self.counts = np.zeros((capacity + 1, NUM_CELL_TYPES), dtype=np.int64)
+        self._join(store.alive_indices())
+
+    def _join(self, cells: np.ndarray, organisms: np.ndarray | None = None) -> None:
+        if organisms is None:
+            organisms = self.resolve(cells)
+        self.organism[cells] = organisms
+        # NO_ORGANISM indexes the outsiders row
+        np.add.at(self.counts, (organisms, self.world.cells.type_code[cells]), 1)
+
+    def _leave(self, cells: np.ndarray, types: np.ndarray) -> None:
+        np.subtract.at(self.counts, (self.organism[cells], types), 1)
+        self.organism[cells] = NO_ORGANISM
+
+    def relabel(self, cells: np.ndarray) -> np.ndarray:
+        """
+        Recompute the organism of living cells, e.g. after their connections
+        changed outside the lifecycle.
+
+        Args:
+            cells (np.ndarray): The indices of the cells.
+
+        Returns:
+            np.ndarray: The indices of the cells whose organism changed.
+        """
+        self._ensure_capacity()
+        organisms = self.resolve(cells)
+        changed = organisms != self.organism[cells]
+        cells, organisms = cells[changed], organisms[changed]
+        self._leave(cells, self.world.cells.type_code[cells])
+        self._join(cells, organisms)
+        self.relabelled += len(cells)
+        return cells
+
+    def _mask(self, organisms: np.ndarray) -> np.ndarray:
+        # Membership table over organism ids; its extra last entry stays False
+        # so that NO_ORGANISM can index it
+        mask = np.zeros(len(self.organism) + 1, dtype=bool)
+        mask[organisms] = True
+        mask[-1] = False
+        return mask
+
+    def members(self, organisms: np.ndarray) -> np.ndarray:
+        """
+        Return the living cells of organisms, in one pass over the cell slots.
+
+        Args:
+            organisms (np.ndarray): The brain indices of the organisms.
+
+        Returns:
+            np.ndarray: The indices of their cells, brains included.
+        """
+        size = self.world.cells.size
+        return np.flatnonzero(self._mask(organisms)[self.organism[:size]])
+
+    def organism_of(self, cells: np.ndarray) -> np.ndarray:
+        """
+        Return the organism of cells, giving every cell outside an organism a
+        distinct negative id, as interaction.organism_of does.
+
+        Args:
+            cells (np.ndarray): The indices of the cells.
+
+        Returns:
+            np.ndarray: The brain index of each cell's organism, or -2 - index.
+        """
+        organisms = self.organism[cells]
+        return np.where(organisms == NO_ORGANISM, -2 - cells, organisms)
+
+    def on_birth(self, born: np.ndarray, parents: np.ndarray) -> None:
+        """
+        Add newborn cells to their organisms, as the "cell_birth" observer.
+
+        Args:
+            born (np.ndarray): The indices of the newborn cells.
+            parents (np.ndarray): The indices of their parent brains.
+        """
+        self._ensure_capacity()
+        self._join(born)
+
+    def on_promotion(self, seeds: np.ndarray) -> None:
+        """
+        Make promoted seeds found their own organisms, as the "cell_promotion"
+        observer.
+
+        Args:
+            seeds (np.ndarray): The indices of the seeds, now brain cells.
+        """
+        self._leave(seeds, np.full(len(seeds), CellType.SEED, dtype=np.uint8))
+        self._join(seeds, seeds.astype(np.int64))
+
+    def on_death(self, dead: np.ndarray) -> None:
+        """
+        Remove dead cells and relabel the organisms split by the death of their
+        conduits or brain, as the "cell_death" observer.
+
+        Args:
+            dead (np.ndarray): The indices of the cells that died.
+        """
+        store = self.world.cells
+        types = store.type_code[dead]
+        organisms = self.organism[dead]
+        linking = (types == CellType.CONDUIT) | (types == CellType.BRAIN)
+        dirty = np.unique(organisms[linking & (organisms != NO_ORGANISM)])
+        self._leave(dead, types)
+        if len(dirty):
+            self.relabel(self.members(dirty))
+
+    def on_compaction(self, remap: np.ndarray) -> None:
+        """
+        Rebuild the registry in the new indices, as the "compaction" observer.
+
+        Args:
+            remap (np.ndarray): The new index of each old index, or -1.
+        """
+        self.rebuild()
+
+    def with_members(self, dying: np.ndarray) -> np.ndarray:
+        """
+        Extend a batch of dying cells with the members of the organisms whose
+        brain is among them, seeds excepted.
+
+        Args:
+            dying (np.ndarray): The indices of the dying cells.
+
+        Returns:
+            np.ndarray: The dying cells and the members of their organisms.
+        """
+        store = self.world.cells
+        brains = dying[(store.type_code[dying] == CellType.BRAIN) & store.alive[dying]]
+        if len(brains) == 0:
+            return dying
+        members = self.members(brains)
+        members = members[store.type_code[members] != CellType.SEED]
+        self.organism_deaths += len(brains)
+        return np.concatenate((dying, members))
+
+    def aggregates(self, organisms: np.ndarray | None = None) -> dict[str, np.ndarray]:
+        """
+        Return the size and total energy of organisms.
+
+        Args:
+            organisms (np.ndarray | None): The brain indices of the organisms;
+                every living brain if omitted.
+
+        Returns:
+            dict[str, np.ndarray]: The "organism" ids, their "energy", their
+                number of "cells" and their (organisms, NUM_CELL_TYPES) "counts"
+                of living cells per CellType code.
+        """
+        store = self.world.cells
+        if organisms is None:
+            organisms = store.alive_indices(CellType.BRAIN)
+        labels = self.organism[: store.size]
+        inside = labels != NO_ORGANISM
+        energy = np.bincount(
+            labels[inside],
+            weights=store.energy[: store.size][inside],
+            minlength=len(self.organism),
+        )
+        counts = self.counts[organisms]
+        return {
+            "organism": organisms,
+            "energy": energy[organisms],
+            "cells": counts.sum(axis=1),
+            "counts": counts,
+        }
@@ -0,0 +1,385 @@
+# src/dynamics/phenotype.py
+
+from collections import OrderedDict
+
+import numpy as np
+
+from src.cells.cell_type import CellType
+from src.dynamics.genetic import GENOME_LENGTH, NO_GENOME
+
+# Cell types a brain can build, indexed by gene value modulo their count. Gene 0
+# builds a leaf, so an all-zero genome keeps the original leaf-only behaviour.
+BUILDABLE_TYPES = np.array(
+    [CellType.LEAF, CellType.ROOT, CellType.CONDUIT, CellType.ANTENNA], dtype=np.uint8
+)
+
+# Growth directions as (dx, dy), indexed by gene value modulo their count. Gene 0
+# grows behind the brain, i.e. at (x, y - 1).
+DIRECTIONS = np.array([(0, -1), (1, 0), (0, 1), (-1, 0)], dtype=np.int8)
+
+# Names of the efficiency parameters, in gene order.
+EFFICIENCY_PARAMETERS = (
+    "leaf",
+    "root",
+    "antenna",
+    "conduit",
+    "metabolism",
+    "reproduction",
+    "mutation",
+    "dormancy",
+)
+
+# Genes read by each segment of the phenotype program. A segment is recompiled
+# only when one of its genes changes.
+SEGMENTS = {
+    "build": slice(0, 16),
+    "directions": slice(16, 24),
+    "efficiency": slice(24, 24 + len(EFFICIENCY_PARAMETERS)),
+}
+
+# Length of the build and direction programs of a phenotype.
+BUILD_LENGTH = SEGMENTS["build"].stop - SEGMENTS["build"].start
+DIRECTIONS_LENGTH = SEGMENTS["directions"].stop - SEGMENTS["directions"].start
+
+# Default memory bound of the decoder cache, in bytes.
+DEFAULT_CACHE_BYTES = 4 * 1024 * 1024
+
+# Approximate fixed cost of a cache entry: the Phenotype object, its key and the
+# cache bookkeeping.
+_ENTRY_OVERHEAD = 256
+
+
+def compile_build(genes: np.ndarray) -> np.ndarray:
+    """
+    Compile the build segment into the sequence of CellType codes to create.
+    """
+    return BUILDABLE_TYPES[genes % len(BUILDABLE_TYPES)]
+
+
+def compile_directions(genes: np.ndarray) -> np.ndarray:
+    """
+    Compile the directions segment into a sequence of (dx, dy) growth offsets.
+    """
+    return DIRECTIONS[genes % len(DIRECTIONS)]
+
+
+def compile_efficiency(genes: np.ndarray) -> np.ndarray:
+    """
+    Compile the efficiency segment into parameters in the range [0, 1].
+    """
+    return genes.astype(np.float32) / np.float32(255)
+
+
+COMPILERS = {
+    "build": compile_build,
+    "directions": compile_directions,
+    "efficiency": compile_efficiency,
+}
+
+
+class Phenotype:
+    """
+    The Phenotype class is the compiled program of a genome: the cycle of cell
+    types its brain builds, the growth direction of each step and its efficiency
+    parameters. Its arrays are read-only and may be shared with other phenotypes
+    compiled from related genomes.
+    """
+
+    __slots__ = ("build", "directions", "efficiency")
+
+    def __init__(
+        self, build: np.ndarray, directions: np.ndarray, efficiency: np.ndarray
+    ):
+        """
+        Initialize a phenotype from its compiled segments.
+
+        Args:
+            build (np.ndarray): The CellType codes to build, in order.
+            directions (np.ndarray): The (dx, dy) offset of each growth step.
+            efficiency (np.ndarray): The efficiency parameters.
+        """
+        for array in (build, directions, efficiency):
+            array.flags.writeable = False
+        self.build = build
+        self.directions = directions
+        self.efficiency = efficiency
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory held by the compiled arrays, in bytes.
+        """
+        return self.build.nbytes + self.directions.nbytes + self.efficiency.nbytes
+
+    def cell_type(self, step: int) -> CellType:
+        """
+        Return the type of the cell built at a given step.
+
+        Args:
+            step (int): The number of cells built so far.
+
+        Returns:
+            CellType: The type of the next cell.
+        """
+        return CellType(self.build[step % len(self.build)])
+
+    def direction(self, step: int) -> tuple[int, int]:
+        """
+        Return the (dx, dy) growth offset at a given step.
+
+        Args:
+            step (int): The number of cells built so far.
+
+        Returns:
+            tuple[int, int]: The offset of the next cell from the brain.
+        """
+        dx, dy = self.directions[step % len(self.directions)]
+        return int(dx), int(dy)
+
+    def parameter(self, name: str) -> float:
+        """
+        Return a named efficiency parameter.
+
+        Args:
+            name (str): One of EFFICIENCY_PARAMETERS.
+
+        Returns:
+            float: The parameter, in the range [0, 1].
+        """
+        return float(self.efficiency[EFFICIENCY_PARAMETERS.index(name)])
+
+
+class PhenotypeDecoder:
+    """
+    The PhenotypeDecoder compiles genomes into Phenotype programs and memoizes
+    them in an LRU cache bounded by memory.
+
+    Genomes of a GenomePool are looked up by handle with decode_handle; the
+    entries are keyed by the pool, the handle and the row's version, so no genome
+    bytes are hashed. Genomes of per-object cells are keyed by their bytes with
+    decode. For the batched brain kernel, the build and direction programs of the
+    decoded handles are also mirrored in arrays indexed by handle, see programs;
+    the mirror grows with the pool and is not bounded by max_bytes.
+
+    Decoding an offspring with its parent as a hint reuses the parent's compiled
+    segments and only recompiles the segments whose genes were mutated. The hits,
+    misses, evictions and recompiled segments are counted to help size the cache.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        """
+        Initialize an empty decoder.
+
+        Args:
+            max_bytes (int): The approximate memory bound of the cache, in bytes.
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._cache: OrderedDict[bytes | tuple, Phenotype] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.segments_compiled = 0
+        self.segments_reused = 0
+        # Programs of the handles of one pool, and the row version they are of
+        self._programs_pool = None
+        self._programs_version = np.zeros(0, dtype=np.int64)
+        self._builds = np.zeros((0, BUILD_LENGTH), dtype=np.uint8)
+        self._directions = np.zeros((0, DIRECTIONS_LENGTH, 2), dtype=np.int8)
+
+    def __len__(self) -> int:
+        """
+        Return the number of cached phenotypes.
+        """
+        return len(self._cache)
+
+    def stats(self) -> dict:
+        """
+        Return the cache counters.
+
+        Returns:
+            dict: The hits, misses, hit rate, evictions, compiled and reused
+                segments, entries and memory use of the cache.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "segments_compiled": self.segments_compiled,
+            "segments_reused": self.segments_reused,
+            "entries": len(self._cache),
+            "bytes": self.nbytes,
+        }
+
+    def clear(self) -> None:
+        """
+        Drop every cached phenotype. Counters are kept.
+        """
+        self._cache.clear()
+        self.nbytes = 0
+
+    @staticmethod
+    def _key(genome) -> tuple[bytes, np.ndarray]:
+        genes = np.asarray(genome, dtype=np.uint8)
+        if genes.shape != (GENOME_LENGTH,):
+            raise ValueError(
+                f"Expected a genome of {GENOME_LENGTH} genes, got shape {genes.shape}"
+            )
+        return genes.tobytes(), genes
+
+    def decode(self, genome, parent=None) -> Phenotype:
+        """
+        Return the phenotype of a genome, compiling it on a cache miss.
+
+        Args:
+            genome: A sequence of GENOME_LENGTH gene values in the range 0-255.
+            parent: The genome of the parent, if known. When its phenotype is
+                cached, only the segments that differ from it are recompiled.
+
+        Returns:
+            Phenotype: The compiled phenotype.
+        """
+        key, genes = self._key(genome)
+        phenotype = self._cache.get(key)
+        if phenotype is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return phenotype
+        self.misses += 1
+
+        base = parent_genes = None
+        if parent is not None:
+            parent_key, parent_genes = self._key(parent)
+            base = self._cache.get(parent_key)
+        return self._compile(key, genes, base, parent_genes)
+
+    @staticmethod
+    def _handle_key(pool, handle: int) -> tuple[int, int, int]:
+        return pool.uid, handle, int(pool.version[handle])
+
+    def decode_handle(self, pool, handle: int, parent: int = NO_GENOME) -> Phenotype:
+        """
+        Return the phenotype of a genome of a GenomePool, compiling it on a cache
+        miss.
+
+        Args:
+            pool (GenomePool): The pool holding the genome.
+            handle (int): The handle of the genome.
+            parent (int): The handle of the parent genome in the same pool, if the
+                genome was derived from it, e.g. by mutation. When its phenotype
+                is cached, only the segments that differ from it are recompiled.
+
+        Returns:
+            Phenotype: The compiled phenotype.
+        """
+        key = self._handle_key(pool, handle)
+        phenotype = self._cache.get(key)
+        if phenotype is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return phenotype
+        self.misses += 1
+
+        base = parent_genes = None
+        if parent != NO_GENOME:
+            base = self._cache.get(self._handle_key(pool, parent))
+            parent_genes = pool.data[parent]
+        return self._compile(key, pool.data[handle], base, parent_genes)
+
+    def decode_handles(
+        self, pool, handles: np.ndarray, parents: np.ndarray | None = None
+    ) -> list[Phenotype]:
+        """
+        Return the phenotypes of many genomes of a GenomePool, see decode_handle.
+
+        Args:
+            pool (GenomePool): The pool holding the genomes.
+            handles (np.ndarray): The handles of the genomes.
+            parents (np.ndarray | None): The handle of the parent of each genome,
+                or NO_GENOME.
+
+        Returns:
+            list[Phenotype]: The phenotype of each genome.
+        """
+        if parents is None:
+            return [self.decode_handle(pool, handle) for handle in handles.tolist()]
+        return [
+            self.decode_handle(pool, handle, parent)
+            for handle, parent in zip(handles.tolist(), parents.tolist())
+        ]
+
+    def programs(self, pool, handles: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return the build and direction programs of many genomes of a GenomePool.
+
+        Programs decoded before are gathered from the handle-indexed mirror in a
+        few vector operations, each counting as a hit; the others, including rows
+        recycled since, go through decode_handle once per distinct handle.
+
+        Args:
+            pool (GenomePool): The pool holding the genomes.
+            handles (np.ndarray): The handles of the genomes.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The (len(handles), BUILD_LENGTH)
+                CellType codes and (len(handles), DIRECTIONS_LENGTH, 2) offsets of
+                the genomes.
+        """
+        if self._programs_pool != pool.uid:
+            self._programs_pool = pool.uid
+            self._programs_version = np.zeros(0, dtype=np.int64)
+        capacity = len(pool.version)
+        if len(self._programs_version) < capacity:
+            # Version -1 never matches a row, so new entries start out missing
+            known = len(self._programs_version)
+            version = np.full(capacity, -1, dtype=np.int64)
+            builds = np.zeros((capacity, BUILD_LENGTH), dtype=np.uint8)
+            directions = np.zeros((capacity, DIRECTIONS_LENGTH, 2), dtype=np.int8)
+            version[:known] = self._programs_version
+            builds[:known] = self._builds[:known]
+            directions[:known] = self._directions[:known]
+            self._programs_version = version
+            self._builds, self._directions = builds, directions
+
+        stale = self._programs_version[handles] != pool.version[handles]
+        self.hits += len(handles) - int(stale.sum())
+        missing = np.unique(handles[stale])
+        for handle, phenotype in zip(
+            missing.tolist(), self.decode_handles(pool, missing)
+        ):
+            self._builds[handle] = phenotype.build
+            self._directions[handle] = phenotype.directions
+        self._programs_version[missing] = pool.version[missing]
+        # Duplicates of a missing handle after its first occurrence are hits
+        self.hits += int(stale.sum()) - len(missing)
+        return self._builds[handles], self._directions[handles]
+
+    def _compile(
+        self,
+        key,
+        genes: np.ndarray,
+        base: Phenotype | None,
+        parent_genes: np.ndarray | None,
+    ) -> Phenotype:
+        # Compile the segments that differ from the parent's, and cache the result
+        segments = {}
+        for name, genes_slice in SEGMENTS.items():
+            if base is not None and np.array_equal(
+                genes[genes_slice], parent_genes[genes_slice]
+            ):
+                segments[name] = getattr(base, name)
+                self.segments_reused += 1
+            else:
+                segments[name] = COMPILERS[name](genes[genes_slice])
+                self.segments_compiled += 1
+        phenotype = Phenotype(**segments)
+
+        self._cache[key] = phenotype
+        self.nbytes += phenotype.nbytes + _ENTRY_OVERHEAD
+        while self.nbytes > self.max_bytes and len(self._cache) > 1:
+            _, evicted = self._cache.popitem(last=False)
+            self.nbytes -= evicted.nbytes + _ENTRY_OVERHEAD
+            self.evictions += 1
+        return phenotype
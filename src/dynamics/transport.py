@@ -0,0 +1,238 @@
+# src/dynamics/transport.py
+
+import numpy as np
+
+from src.cells.cell_store import CellStore, NO_CONNECTION
+from src.cells.cell_type import CellType
+
+# Maximum energy a conduit forwards per tick, as in ConduitCell.receive_and_forward.
+CONDUIT_CAPACITY = 10.0
+
+# Root label of conduits whose chain does not end in a brain cell.
+NO_ROOT = -1
+
+
+class TransportEngine:
+    """
+    The TransportEngine moves energy through every conduit network in one
+    vectorized step.
+
+    The conduit links stored in the CellStore connection column form a forest whose
+    roots are brain cells. The engine keeps that forest compiled as a child
+    adjacency plus a root label per conduit (the brain its chain ends in), and
+    updates both incrementally when conduits are added, connected or removed.
+
+    Two transport modes are supported:
+        - "hop": every conduit forwards up to its capacity one link downstream,
+          like ConduitCell.receive_and_forward.
+        - "direct": every conduit sends up to its capacity straight to the brain
+          at the root of its chain, so energy arrives in a single tick.
+
+    In both modes the forwarded energy is debited from the sending conduit.
+    """
+
+    def __init__(self, store: CellStore, capacity: float = CONDUIT_CAPACITY):
+        """
+        Initialize the engine and compile the current conduit network.
+
+        Args:
+            store (CellStore): The store holding the cells.
+            capacity (float): The maximum energy a conduit forwards per tick.
+        """
+        self.store = store
+        self.capacity = capacity
+        self.root = np.full(store.capacity, NO_ROOT, dtype=np.int32)
+        self.children: dict[int, set[int]] = {}
+        self._conduits = np.empty(0, dtype=np.int64)
+        self._dirty = True
+        self.ledger = None  # An EnergyLedger recording the flows, if enabled
+        self.compile()
+
+    def _ensure_capacity(self) -> None:
+        # Follow the store when it grows
+        if len(self.root) < self.store.capacity:
+            root = np.full(self.store.capacity, NO_ROOT, dtype=np.int32)
+            root[: len(self.root)] = self.root
+            self.root = root
+
+    def _is_conduit(self, indices: np.ndarray) -> np.ndarray:
+        store = self.store
+        return (store.type_code[indices] == CellType.CONDUIT) & store.alive[indices]
+
+    @property
+    def conduits(self) -> np.ndarray:
+        """
+        The indices of the living conduits known to the engine.
+        """
+        if self._dirty:
+            self._conduits = self.store.alive_indices(CellType.CONDUIT)
+            self._dirty = False
+        return self._conduits
+
+    def compile(self) -> None:
+        """
+        Build the forest from scratch from the store's connection column.
+
+        Root labels are resolved by pointer jumping, so a chain of length L takes
+        O(log L) vectorized passes.
+        """
+        self._ensure_capacity()
+        store = self.store
+        self._dirty = True
+        conduits = self.conduits
+
+        self.children = {}
+        targets = store.connection[conduits]
+        for conduit, target in zip(conduits.tolist(), targets.tolist()):
+            if target != NO_CONNECTION:
+                self.children.setdefault(target, set()).add(conduit)
+
+        # Each conduit points at its target until the pointer reaches a non-conduit
+        pointer = np.full(store.capacity, NO_CONNECTION, dtype=np.int64)
+        pointer[conduits] = targets
+        for _ in range(int(np.log2(max(len(conduits), 1))) + 2):
+            linked = pointer[conduits] != NO_CONNECTION
+            following = conduits[linked]
+            nxt = pointer[following]
+            jump = self._is_conduit(nxt)
+            if not jump.any():
+                break
+            pointer[following[jump]] = pointer[nxt[jump]]
+
+        ends = pointer[conduits]
+        valid = ends != NO_CONNECTION
+        is_brain = np.zeros(len(conduits), dtype=bool)
+        is_brain[valid] = (store.type_code[ends[valid]] == CellType.BRAIN) & (
+            store.alive[ends[valid]]
+        )
+        self.root[:] = NO_ROOT
+        self.root[conduits[is_brain]] = ends[is_brain]
+
+    def _relabel(self, conduit: int, root: int) -> None:
+        # Propagate a new root label through the conduits upstream of `conduit`
+        subtree = [conduit]
+        for node in subtree:
+            subtree.extend(self.children.get(node, ()))
+        self.root[subtree] = root
+
+    def _resolve_root(self, target: int) -> int:
+        # The root label a conduit inherits by connecting to `target`
+        if target == NO_CONNECTION or not self.store.alive[target]:
+            return NO_ROOT
+        if self.store.type_code[target] == CellType.BRAIN:
+            return target
+        if self.store.type_code[target] == CellType.CONDUIT:
+            return int(self.root[target])
+        return NO_ROOT
+
+    def _upstream_of(self, conduit: int, target: int) -> bool:
+        # Whether `target` lies upstream of `conduit`, i.e. linking would make a cycle.
+        # A subtree shares its root label, so differing labels rule it out at once.
+        if self.root[target] != self.root[conduit]:
+            return False
+        store = self.store
+        node = target
+        while node != NO_CONNECTION and store.type_code[node] == CellType.CONDUIT:
+            if node == conduit:
+                return True
+            node = int(store.connection[node])
+        return False
+
+    def add_conduit(self, conduit: int) -> None:
+        """
+        Register a conduit that was added to the store, with its current connection.
+
+        Args:
+            conduit (int): The index of the new conduit.
+        """
+        self._ensure_capacity()
+        self._dirty = True
+        self.root[conduit] = NO_ROOT
+        self.connect(conduit, int(self.store.connection[conduit]))
+
+    def add_cells(self, indices: np.ndarray) -> None:
+        """
+        Register cells that were born, growing the forest to the store's capacity
+        and adding the conduits among them with their current connection.
+
+        Args:
+            indices (np.ndarray): The indices of the new cells.
+        """
+        self._ensure_capacity()
+        conduits = indices[self.store.type_code[indices] == CellType.CONDUIT]
+        for conduit in conduits.tolist():
+            self.add_conduit(conduit)
+
+    def connect(self, conduit: int, target: int) -> None:
+        """
+        Connect a conduit to the next conduit or to a brain cell.
+
+        Args:
+            conduit (int): The index of the conduit.
+            target (int): The index of the next conduit or brain, or NO_CONNECTION.
+        """
+        if target != NO_CONNECTION and self._upstream_of(conduit, target):
+            raise ValueError(
+                f"Connecting conduit {conduit} to {target} would create a cycle"
+            )
+        previous = int(self.store.connection[conduit])
+        if previous in self.children:
+            self.children[previous].discard(conduit)
+        self.store.connection[conduit] = target
+        if target != NO_CONNECTION:
+            self.children.setdefault(target, set()).add(conduit)
+        self._relabel(conduit, self._resolve_root(target))
+
+    def remove(self, index: int) -> None:
+        """
+        Detach a conduit or brain cell that died.
+
+        Conduits upstream of it are disconnected and lose their root, as if their
+        next_conduit or connected_brain had been cleared.
+
+        Args:
+            index (int): The index of the dead cell.
+        """
+        target = int(self.store.connection[index])
+        if self.store.type_code[index] == CellType.CONDUIT:
+            self._dirty = True
+            self.root[index] = NO_ROOT
+            if target in self.children:
+                self.children[target].discard(index)
+        for child in self.children.pop(index, ()):
+            self.store.connection[child] = NO_CONNECTION
+            self._relabel(child, NO_ROOT)
+
+    def step(self, mode: str = "hop") -> np.ndarray:
+        """
+        Forward energy through every conduit network.
+
+        Args:
+            mode (str): "hop" to move energy one link downstream, or "direct" to
+                deliver it straight to the brain at the root of each chain.
+
+        Returns:
+            np.ndarray: The indices of unconnected conduits, which should die.
+        """
+        store = self.store
+        conduits = self.conduits
+        targets = store.connection[conduits]
+        unconnected = conduits[targets == NO_CONNECTION]
+
+        if mode == "hop":
+            senders = conduits[targets != NO_CONNECTION]
+            receivers = store.connection[senders]
+        elif mode == "direct":
+            roots = self.root[conduits]
+            senders = conduits[roots != NO_ROOT]
+            receivers = roots[roots != NO_ROOT]
+        else:
+            raise ValueError(f"Unknown transport mode: {mode}")
+
+        # All flows are computed from the energy at the start of the step
+        flow = np.minimum(store.energy[senders], self.capacity)
+        store.energy[senders] -= flow
+        np.add.at(store.energy, receivers, flow)
+        if self.ledger is not None:
+            self.ledger.record("transport", senders, receivers, flow)
+        return unconnected
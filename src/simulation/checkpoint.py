@@ -0,0 +1,407 @@
+# src/simulation/checkpoint.py
+
+import json
+import os
+import struct
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+from src.cells.cell_store import CellStore
+from src.core.grid import Grid
+from src.core.world import World
+from src.dynamics.genetic import GenomePool
+
+# First bytes of every checkpoint file.
+MAGIC = b"SOLCKPT\0"
+
+# Version of the layout, bumped on incompatible changes.
+VERSION = 1
+
+# Alignment of every block in the file, a page so that blocks map cleanly.
+ALIGNMENT = 4096
+
+# Ticks between two periodic checkpoints.
+DEFAULT_INTERVAL = 1000
+
+# Number of periodic checkpoints kept on disk.
+DEFAULT_KEEP = 3
+
+# Magic, then the length of the JSON header as a little-endian uint64.
+_PREAMBLE = struct.Struct(f"<{len(MAGIC)}sQ")
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+class Snapshot:
+    """
+    The arrays and metadata of a checkpoint, ready to be written.
+
+    A snapshot taken with copy=True owns copies of the world's arrays, so it can be
+    written by another thread while the simulation goes on.
+    """
+
+    def __init__(self, header: dict, blocks: dict[str, np.ndarray]):
+        """
+        Initialize a snapshot.
+
+        Args:
+            header (dict): The JSON-serializable metadata of the checkpoint.
+            blocks (dict[str, np.ndarray]): The arrays to store, by block name.
+        """
+        self.header = header
+        self.blocks = blocks
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The size of the array blocks, in bytes.
+        """
+        return sum(block.nbytes for block in self.blocks.values())
+
+
+def snapshot(
+    world: World,
+    tick: int = 0,
+    metadata: dict | None = None,
+    copy: bool = False,
+    extra: dict[str, np.ndarray] | None = None,
+) -> Snapshot:
+    """
+    Collect the state of a world into a snapshot: the grid layers, the sector
+    arrays, the used part of the cell store and of the genome pool, and the
+    state of the random streams.
+
+    Args:
+        world (World): The world to snapshot.
+        tick (int): The tick the world is at.
+        metadata (dict | None): Extra JSON-serializable metadata to store.
+        copy (bool): Copy the arrays, so the world may change while the snapshot
+            is written.
+        extra (dict[str, np.ndarray] | None): Extra arrays to store by block
+            name, e.g. the lineage tables of an EvolutionEngine.
+
+    Returns:
+        Snapshot: The snapshot.
+    """
+    grid = world.grid
+    store = world.cells
+    genomes = store.genomes
+    blocks = {
+        "grid.cell_id": grid.cell_id,
+        "grid.cell_type": grid.cell_type,
+    }
+    for name, layer in grid.layers.items():
+        blocks[f"layer.{name}"] = layer
+    blocks["sectors.values"] = world.sector_state.values
+    for name in CellStore.COLUMNS:
+        blocks[f"cells.{name}"] = getattr(store, name)[: store.size]
+    blocks["cells.free"] = np.array(store._free, dtype=np.int64)
+    blocks["genomes.data"] = genomes.data[: genomes.size]
+    blocks["genomes.refcount"] = genomes.refcount[: genomes.size]
+    blocks["genomes.free"] = np.array(genomes._free, dtype=np.int64)
+    extra = extra or {}
+    for name, block in extra.items():
+        if name in blocks:
+            raise ValueError(f"Block '{name}' is part of the world")
+        blocks[name] = block
+    if copy:
+        blocks = {name: block.copy() for name, block in blocks.items()}
+
+    header = {
+        "version": VERSION,
+        "tick": tick,
+        "world": {
+            "width": world.width,
+            "height": world.height,
+            "num_sectors": world.num_sectors,
+            "season_cycle": world.season_cycle,
+            "random_event_probability": world.random_event_probability,
+        },
+        "rng": {"seed": int(world.rng.seed), "streams": world.rng.get_state()},
+        "layers": list(grid.layers),
+        "extra": list(extra),
+        "metadata": metadata or {},
+    }
+    return Snapshot(header, blocks)
+
+
+def write_snapshot(path: str, snap: Snapshot) -> int:
+    """
+    Write a snapshot to a checkpoint file.
+
+    The file holds the magic bytes, the length of a JSON header, the header, and
+    then every array as a raw block starting on an ALIGNMENT boundary; the header
+    gives the dtype, shape and offset of each block. The file is written under a
+    temporary name and renamed, so a reader never sees a partial checkpoint.
+
+    Args:
+        path (str): The path of the checkpoint.
+        snap (Snapshot): The snapshot to write.
+
+    Returns:
+        int: The size of the file in bytes.
+    """
+    layout = {}
+    header = dict(snap.header, blocks=layout)
+    # The header holds the offsets, which depend on the header size: lay the
+    # blocks out after a header of generous size, then check that it fits
+    reserved = _aligned(_PREAMBLE.size + 4096 + 256 * len(snap.blocks))
+    offset = reserved
+    for name, block in snap.blocks.items():
+        layout[name] = {
+            "dtype": block.dtype.str,
+            "shape": list(block.shape),
+            "offset": offset,
+        }
+        offset = _aligned(offset + block.nbytes)
+    encoded = json.dumps(header).encode()
+    if _PREAMBLE.size + len(encoded) > reserved:
+        raise ValueError("Checkpoint header too large")
+
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(_PREAMBLE.pack(MAGIC, len(encoded)))
+        file.write(encoded)
+        for name, block in snap.blocks.items():
+            file.seek(layout[name]["offset"])
+            file.write(np.ascontiguousarray(block).data)
+        file.truncate(offset)
+    os.replace(temporary, path)
+    return offset
+
+
+def save_checkpoint(
+    path: str,
+    world: World,
+    tick: int = 0,
+    metadata: dict | None = None,
+    extra: dict[str, np.ndarray] | None = None,
+) -> int:
+    """
+    Write the state of a world to a checkpoint file.
+
+    Args:
+        path (str): The path of the checkpoint.
+        world (World): The world to save.
+        tick (int): The tick the world is at.
+        metadata (dict | None): Extra JSON-serializable metadata to store.
+        extra (dict[str, np.ndarray] | None): Extra arrays to store by block name.
+
+    Returns:
+        int: The size of the file in bytes.
+    """
+    return write_snapshot(path, snapshot(world, tick, metadata, extra=extra))
+
+
+def read_header(path: str) -> dict:
+    """
+    Read the header of a checkpoint file.
+
+    Args:
+        path (str): The path of the checkpoint.
+
+    Returns:
+        dict: The header, including the layout of the blocks.
+    """
+    with open(path, "rb") as file:
+        magic, length = _PREAMBLE.unpack(file.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a checkpoint")
+        header = json.loads(file.read(length))
+    if header["version"] != VERSION:
+        raise ValueError(
+            f"Unsupported checkpoint version {header['version']}, expected {VERSION}"
+        )
+    return header
+
+
+def load_checkpoint(path: str, mmap: bool = True) -> tuple[World, dict]:
+    """
+    Restore a world from a checkpoint file.
+
+    With mmap, every block is memory-mapped copy-on-write: restoring only reads
+    the header, pages are read from the file when first touched, and changes stay
+    in memory. Otherwise the blocks are read into memory.
+
+    Args:
+        path (str): The path of the checkpoint.
+        mmap (bool): Map the blocks instead of reading them.
+
+    Returns:
+        tuple[World, dict]: The world and the header of the checkpoint, whose
+            "tick" and "metadata" entries are those passed when saving, and
+            whose "arrays" entry holds the extra arrays by block name.
+    """
+    header = read_header(path)
+    blocks = {}
+    for name, spec in header["blocks"].items():
+        dtype, shape = np.dtype(spec["dtype"]), tuple(spec["shape"])
+        count = int(np.prod(shape))
+        if count == 0:
+            blocks[name] = np.empty(shape, dtype=dtype)
+        elif mmap:
+            blocks[name] = np.memmap(
+                path, dtype=dtype, mode="c", offset=spec["offset"], shape=shape
+            )
+        else:
+            blocks[name] = np.fromfile(
+                path, dtype=dtype, count=count, offset=spec["offset"]
+            ).reshape(shape)
+
+    genomes = GenomePool.from_arrays(
+        blocks["genomes.data"], blocks["genomes.refcount"], blocks["genomes.free"]
+    )
+    cells = CellStore.from_columns(
+        {name: blocks[f"cells.{name}"] for name in CellStore.COLUMNS},
+        blocks["cells.free"],
+        genomes,
+    )
+    grid = Grid.from_layers(
+        blocks["grid.cell_id"],
+        blocks["grid.cell_type"],
+        {name: blocks[f"layer.{name}"] for name in header["layers"]},
+    )
+    settings = header["world"]
+    world = World(
+        settings["width"],
+        settings["height"],
+        settings["num_sectors"],
+        seed=header["rng"]["seed"],
+        grid=grid,
+        cells=cells,
+    )
+    world.rng.set_state(header["rng"]["streams"])
+    world.sector_state.values[:] = blocks["sectors.values"]
+    world.season_cycle = settings["season_cycle"]
+    world.random_event_probability = settings["random_event_probability"]
+    header["arrays"] = {name: blocks[name] for name in header.get("extra", ())}
+    return world, header
+
+
+def latest_checkpoint(directory: str) -> str | None:
+    """
+    Return the most recent periodic checkpoint of a directory.
+
+    Args:
+        directory (str): The directory written by a Checkpointer.
+
+    Returns:
+        str | None: The path of the checkpoint of the highest tick, if any.
+    """
+    names = sorted(
+        name
+        for name in os.listdir(directory)
+        if name.startswith("checkpoint_") and name.endswith(".ckpt")
+    )
+    return os.path.join(directory, names[-1]) if names else None
+
+
+class Checkpointer:
+    """
+    The Checkpointer writes periodic checkpoints of a running simulation without
+    stalling it.
+
+    On a checkpoint tick, the tick loop only copies the world's arrays into a
+    Snapshot; a background thread writes it and deletes the oldest checkpoints
+    beyond `keep`. If the previous checkpoint is still being written when the
+    next one is due, the new one is skipped rather than waited for. Errors of
+    the writer are raised on the next checkpoint tick or by wait.
+
+    The copies cost memory bandwidth in the tick loop, and as much memory as the
+    world until they are written; see `stall` and bench_checkpoint.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        interval: int = DEFAULT_INTERVAL,
+        keep: int = DEFAULT_KEEP,
+    ):
+        """
+        Initialize the checkpointer.
+
+        Args:
+            directory (str): The directory of the checkpoints, created if missing.
+            interval (int): The number of ticks between two checkpoints.
+            keep (int): The number of checkpoints kept on disk.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.interval = interval
+        self.keep = keep
+        self.written: list[str] = []
+        self.skipped = 0
+        self.stall = 0.0  # Seconds spent in the tick loop taking snapshots
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="checkpoint"
+        )
+        self._pending: Future | None = None
+
+    def path(self, tick: int) -> str:
+        """
+        Return the path of the checkpoint of a tick.
+
+        Args:
+            tick (int): The tick.
+
+        Returns:
+            str: The path.
+        """
+        return os.path.join(self.directory, f"checkpoint_{tick:010d}.ckpt")
+
+    def after_tick(
+        self,
+        world: World,
+        tick: int,
+        metadata: dict | None = None,
+        extra: dict[str, np.ndarray] | None = None,
+    ) -> bool:
+        """
+        Start writing a checkpoint if one is due, as called after every tick.
+
+        Args:
+            world (World): The world to save.
+            tick (int): The number of ticks run, at which a resumed run restarts.
+            metadata (dict | None): Extra JSON-serializable metadata to store.
+            extra (dict[str, np.ndarray] | None): Extra arrays to store by block
+                name.
+
+        Returns:
+            bool: Whether a checkpoint was started.
+        """
+        if tick % self.interval:
+            return False
+        if self._pending is not None:
+            if not self._pending.done():
+                self.skipped += 1
+                return False
+            self._pending.result()
+        start = time.perf_counter()
+        snap = snapshot(world, tick, metadata, copy=True, extra=extra)
+        self._pending = self._executor.submit(self._write, self.path(tick), snap)
+        self.stall += time.perf_counter() - start
+        return True
+
+    def _write(self, path: str, snap: Snapshot) -> None:
+        write_snapshot(path, snap)
+        self.written.append(path)
+        while len(self.written) > self.keep:
+            os.remove(self.written.pop(0))
+
+    def wait(self) -> None:
+        """
+        Wait until the checkpoint being written, if any, is on disk.
+        """
+        if self._pending is not None:
+            self._pending.result()
+
+    def close(self) -> None:
+        """
+        Finish the checkpoint being written and stop the writer thread.
+        """
+        self.wait()
+        self._executor.shutdown()
@@ -0,0 +1,167 @@
+# src/simulation/event.py
+
+import heapq
+import itertools
+from typing import Callable
+
+import numpy as np
+
+from src.utils.rng import default_service
+
+
+class EventQueue:
+    """
+    The EventQueue class schedules callbacks at future ticks using a binary heap,
+    so the cost of a tick depends on the number of events fired rather than on the
+    number of objects that might fire one.
+
+    It also provides:
+        - recurring events whose inter-arrival times are geometric, equivalent to
+          polling a per-tick probability but without the polling;
+        - named topics that observers subscribe to and that are emitted on demand,
+          such as the death of conduit cells.
+    """
+
+    def __init__(self, rng: np.random.Generator | None = None):
+        """
+        Initialize an empty queue.
+
+        Args:
+            rng (np.random.Generator | None): The random stream used for geometric
+                inter-arrival times; the default service's "events" stream if omitted.
+        """
+        self.rng = rng if rng is not None else default_service().stream("events")
+        self._heap: list[list] = []
+        self._counter = itertools.count()
+        self._observers: dict[str, list[Callable]] = {}
+        self.fired = 0
+
+    def __len__(self) -> int:
+        return sum(1 for entry in self._heap if entry[2] is not None)
+
+    @property
+    def next_tick(self) -> int | None:
+        """
+        The tick of the earliest pending event, or None if the queue is empty.
+        """
+        while self._heap and self._heap[0][2] is None:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def schedule(self, tick: int, callback: Callable, *args) -> list:
+        """
+        Schedule a callback to run once at a given tick.
+
+        Args:
+            tick (int): The tick at which the callback runs.
+            callback (Callable): The callable to run.
+            *args: Arguments passed to the callback.
+
+        Returns:
+            list: A handle that can be passed to cancel().
+        """
+        entry = [tick, next(self._counter), callback, args, None]
+        heapq.heappush(self._heap, entry)
+        return entry
+
+    def sample_geometric(self, probability: float) -> int:
+        """
+        Draw the number of ticks until the next success of a per-tick Bernoulli trial.
+
+        Args:
+            probability (float): The per-tick probability, in (0, 1].
+
+        Returns:
+            int: A delay of at least 1 tick.
+        """
+        return int(self.rng.geometric(probability))
+
+    def schedule_geometric(
+        self, probability: float, callback: Callable, *args, start: int = 0
+    ) -> list:
+        """
+        Schedule a recurring callback that fires on each tick with a given
+        probability, by sampling the gap to its next occurrence.
+
+        Args:
+            probability (float): The per-tick probability of the event.
+            callback (Callable): The callable to run.
+            *args: Arguments passed to the callback.
+            start (int): The first tick on which the event may fire.
+
+        Returns:
+            list: A handle that can be passed to cancel().
+        """
+        tick = start + self.sample_geometric(probability) - 1
+        entry = [tick, next(self._counter), callback, args, probability]
+        heapq.heappush(self._heap, entry)
+        return entry
+
+    def cancel(self, handle: list) -> None:
+        """
+        Cancel a scheduled event. The entry is dropped lazily when it reaches the
+        front of the heap.
+
+        Args:
+            handle (list): The handle returned when the event was scheduled.
+        """
+        handle[2] = None
+
+    def run_due(self, tick: int) -> int:
+        """
+        Run every event scheduled at or before a tick.
+
+        Args:
+            tick (int): The current tick.
+
+        Returns:
+            int: The number of events fired.
+        """
+        heap = self._heap
+        fired = 0
+        while heap and heap[0][0] <= tick:
+            entry = heapq.heappop(heap)
+            callback = entry[2]
+            if callback is None:
+                continue
+            probability = entry[4]
+            if probability is not None:
+                # Reuse the entry so that its handle stays valid
+                entry[0] = tick + self.sample_geometric(probability)
+                entry[1] = next(self._counter)
+                heapq.heappush(heap, entry)
+            callback(*entry[3])
+            fired += 1
+        self.fired += fired
+        return fired
+
+    def subscribe(self, topic: str, observer: Callable) -> None:
+        """
+        Register an observer for a topic.
+
+        Args:
+            topic (str): The name of the topic, e.g. "conduit_death".
+            observer (Callable): The callable run with the emitted arguments.
+        """
+        self._observers.setdefault(topic, []).append(observer)
+
+    def unsubscribe(self, topic: str, observer: Callable) -> None:
+        """
+        Remove an observer from a topic.
+
+        Args:
+            topic (str): The name of the topic.
+            observer (Callable): The observer to remove.
+        """
+        self._observers[topic].remove(observer)
+
+    def emit(self, topic: str, *args) -> None:
+        """
+        Notify the observers of a topic immediately.
+
+        Args:
+            topic (str): The name of the topic.
+            *args: Arguments passed to every observer.
+        """
+        for observer in self._observers.get(topic, ()):
+            observer(*args)
@@ -0,0 +1,581 @@
+# src/simulation/recorder.py
+
+import json
+import queue
+import struct
+import threading
+import time
+import zlib
+from collections.abc import Iterator
+
+import numpy as np
+
+# First bytes of every history file.
+MAGIC = b"SOLHIST\0"
+
+# Version of the layout, bumped on incompatible changes.
+VERSION = 1
+
+# First bytes of every chunk, to catch a reader out of step with the file.
+CHUNK_TAG = b"SOLH"
+
+# Kinds of chunks: a full frame, or the changes since the previous tick recorded.
+KEYFRAME = 0
+DELTA = 1
+
+# Ticks between two keyframes, bounding the deltas replayed to seek to a tick.
+DEFAULT_KEYFRAME_INTERVAL = 100
+
+# Chunks waiting for the writer thread before record blocks.
+DEFAULT_QUEUE_SIZE = 16
+
+# Share of the kept cells whose energy changed above which a delta stores the
+# whole energy column rather than the changed slots and their values.
+DENSE_ENERGY = 0.5
+
+# zlib level of the chunks; the fastest, as most of the saving comes from deltas.
+COMPRESSION_LEVEL = 1
+
+# Magic, then the length of the JSON file header as a little-endian uint64.
+_PREAMBLE = struct.Struct(f"<{len(MAGIC)}sQ")
+
+# Tag, kind, tick, length of the JSON chunk header and length of the payload.
+_CHUNK = struct.Struct("<4sBqIQ")
+
+
+def gaps(slots: np.ndarray) -> np.ndarray:
+    """
+    Encode sorted slot indices as the gaps between consecutive ones, which are
+    small and compress far better than the indices.
+
+    Args:
+        slots (np.ndarray): The sorted slot indices.
+
+    Returns:
+        np.ndarray: The first slot, then the gap before each next one, as int32.
+    """
+    return np.diff(slots, prepend=0).astype(np.int32)
+
+
+def slots(gaps: np.ndarray) -> np.ndarray:
+    """
+    Decode slot indices encoded by gaps.
+
+    Args:
+        gaps (np.ndarray): The encoded gaps.
+
+    Returns:
+        np.ndarray: The slot indices.
+    """
+    return np.cumsum(gaps, dtype=np.int64)
+
+
+class Frame:
+    """
+    The recorded state of the cells at a tick: the type code, position, energy
+    and alive flag of every cell slot, as in the CellStore columns. Energy is
+    recorded in single precision. The columns of dead slots hold stale values.
+    """
+
+    # Recorded columns and their dtypes.
+    COLUMNS = {
+        "type_code": np.uint8,
+        "x": np.int32,
+        "y": np.int32,
+        "energy": np.float32,
+        "alive": np.bool_,
+    }
+
+    def __init__(self, tick: int, columns: dict[str, np.ndarray]):
+        """
+        Initialize a frame.
+
+        Args:
+            tick (int): The tick of the frame.
+            columns (dict[str, np.ndarray]): One array per name in COLUMNS.
+        """
+        self.tick = tick
+        for name in self.COLUMNS:
+            setattr(self, name, columns[name])
+
+    @property
+    def size(self) -> int:
+        """
+        The number of cell slots of the frame.
+        """
+        return len(self.alive)
+
+    def columns(self) -> dict[str, np.ndarray]:
+        """
+        Return the columns of the frame by name.
+        """
+        return {name: getattr(self, name) for name in self.COLUMNS}
+
+    def copy(self) -> "Frame":
+        """
+        Return a copy of the frame, e.g. to keep one yielded by
+        HistoryReader.frames.
+        """
+        return Frame(
+            self.tick, {name: column.copy() for name, column in self.columns().items()}
+        )
+
+    def alive_indices(self, cell_type: int | None = None) -> np.ndarray:
+        """
+        Return the slots of living cells, optionally of a single type.
+
+        Args:
+            cell_type (int | None): The CellType code to select.
+
+        Returns:
+            np.ndarray: The slot indices.
+        """
+        alive = self.alive
+        if cell_type is not None:
+            alive = alive & (self.type_code == cell_type)
+        return np.flatnonzero(alive)
+
+    def _resize(self, size: int) -> None:
+        if size <= self.size:
+            return
+        for name, dtype in self.COLUMNS.items():
+            column = np.zeros(size, dtype=dtype)
+            column[: self.size] = getattr(self, name)
+            setattr(self, name, column)
+
+    def apply(self, tick: int, size: int, delta: dict[str, np.ndarray]) -> None:
+        """
+        Advance the frame by the delta of a tick.
+
+        Args:
+            tick (int): The tick of the delta.
+            size (int): The number of cell slots at that tick.
+            delta (dict[str, np.ndarray]): The arrays of the delta chunk.
+        """
+        self._resize(size)
+        self.tick = tick
+        self.alive[slots(delta["deaths"])] = False
+        births = slots(delta["births"])
+        self.type_code[births] = delta["birth_type"]
+        self.x[births] = delta["birth_x"]
+        self.y[births] = delta["birth_y"]
+        self.energy[births] = delta["birth_energy"]
+        self.alive[births] = True
+        moves = slots(delta["moves"])
+        self.x[moves] = delta["move_x"]
+        self.y[moves] = delta["move_y"]
+        self.type_code[slots(delta["retyped"])] = delta["retype"]
+        if "energy_slots" in delta:
+            self.energy[slots(delta["energy_slots"])] = delta["energy"]
+        else:
+            self.energy[:] = delta["energy"]
+
+
+def capture(store) -> dict[str, np.ndarray]:
+    """
+    Copy the recorded columns of a cell store, and the birth ticks that tell a
+    reused slot from a surviving cell.
+
+    Args:
+        store (CellStore): The store.
+
+    Returns:
+        dict[str, np.ndarray]: The Frame columns and "birth_tick", over the
+            slots below the store size.
+    """
+    size = store.size
+    columns = {
+        name: getattr(store, name)[:size].astype(dtype)
+        for name, dtype in Frame.COLUMNS.items()
+    }
+    columns["birth_tick"] = store.birth_tick[:size].copy()
+    return columns
+
+
+def diff(previous: dict[str, np.ndarray], current: dict[str, np.ndarray]) -> dict:
+    """
+    Compute the delta between two captures of a store, the current one being at
+    least as large: the slots of the cells that died and were born, the new
+    position of the cells that moved, the new type of the cells that changed
+    type and the energy of the cells whose energy changed.
+
+    A slot freed and reused between the captures counts as a death and a birth.
+    Slot indices are encoded by gaps.
+
+    Args:
+        previous (dict[str, np.ndarray]): The earlier capture.
+        current (dict[str, np.ndarray]): The later capture.
+
+    Returns:
+        dict: The arrays of the delta.
+    """
+    size = len(previous["alive"])
+    was_alive = previous["alive"]
+    alive = current["alive"]
+    reborn = (
+        was_alive
+        & alive[:size]
+        & (current["birth_tick"][:size] != previous["birth_tick"])
+    )
+    kept = was_alive & alive[:size] & ~reborn
+    born = alive.copy()
+    born[:size] &= ~was_alive | reborn
+
+    deaths = np.flatnonzero(was_alive & ~kept)
+    births = np.flatnonzero(born)
+    x, y = current["x"], current["y"]
+    moved = np.flatnonzero(
+        kept & ((x[:size] != previous["x"]) | (y[:size] != previous["y"]))
+    )
+    retyped = np.flatnonzero(
+        kept & (current["type_code"][:size] != previous["type_code"])
+    )
+    energy = current["energy"]
+    changed = kept & (energy[:size] != previous["energy"])
+
+    delta = {
+        "deaths": gaps(deaths),
+        "births": gaps(births),
+        "birth_type": current["type_code"][births],
+        "birth_x": x[births],
+        "birth_y": y[births],
+        "birth_energy": energy[births],
+        "moves": gaps(moved),
+        "move_x": x[moved],
+        "move_y": y[moved],
+        "retyped": gaps(retyped),
+        "retype": current["type_code"][retyped],
+    }
+    if np.count_nonzero(changed) > DENSE_ENERGY * np.count_nonzero(kept):
+        delta["energy"] = energy
+    else:
+        changed = np.flatnonzero(changed)
+        delta["energy_slots"] = gaps(changed)
+        delta["energy"] = energy[changed]
+    return delta
+
+
+def encode_chunk(
+    kind: int, tick: int, arrays: dict[str, np.ndarray], size: int, compress: bool
+) -> bytes:
+    """
+    Encode a chunk: its fixed-size head, a JSON header giving the dtype and
+    length of every array, and the arrays back to back, zlib-compressed as one
+    payload if `compress`.
+
+    Args:
+        kind (int): KEYFRAME or DELTA.
+        tick (int): The tick of the chunk.
+        arrays (dict[str, np.ndarray]): The one-dimensional arrays to store.
+        size (int): The number of cell slots at the tick.
+        compress (bool): Compress the payload.
+
+    Returns:
+        bytes: The chunk.
+    """
+    header = {
+        "size": size,
+        "compressed": compress,
+        "arrays": [
+            [name, array.dtype.str, len(array)] for name, array in arrays.items()
+        ],
+    }
+    payload = b"".join(np.ascontiguousarray(array).data for array in arrays.values())
+    if compress:
+        payload = zlib.compress(payload, COMPRESSION_LEVEL)
+    encoded = json.dumps(header).encode()
+    head = _CHUNK.pack(CHUNK_TAG, kind, tick, len(encoded), len(payload))
+    return b"".join((head, encoded, payload))
+
+
+def decode_payload(header: dict, payload: bytes) -> dict[str, np.ndarray]:
+    """
+    Decode the arrays of a chunk, as read-only views of the payload.
+
+    Args:
+        header (dict): The JSON header of the chunk.
+        payload (bytes): The payload of the chunk.
+
+    Returns:
+        dict[str, np.ndarray]: The arrays by name.
+    """
+    if header["compressed"]:
+        payload = zlib.decompress(payload)
+    arrays = {}
+    offset = 0
+    for name, dtype, length in header["arrays"]:
+        dtype = np.dtype(dtype)
+        arrays[name] = np.frombuffer(payload, dtype=dtype, count=length, offset=offset)
+        offset += dtype.itemsize * length
+    return arrays
+
+
+class Recorder:
+    """
+    The Recorder streams the history of a simulation to an append-only file, so
+    long runs can be replayed and analyzed without storing a full frame per tick.
+
+    Each recorded tick is one chunk: a keyframe holding the Frame columns of
+    every cell slot, written every `keyframe_interval` ticks and after the store
+    is compacted, or otherwise a delta holding the births, deaths, moves, type
+    and energy changes since the previous tick recorded; see diff. Energy is
+    stored as a whole column when most cells changed, as the slot indices would
+    double its size.
+
+    The tick loop only captures the columns and computes the delta; compressing
+    and writing happen on a background thread, fed through a bounded queue. When
+    the disk falls behind and the queue is full, record blocks until a chunk is
+    written, so nothing is dropped and the time blocked shows in `stall`.
+    Errors of the writer are raised by the next record or by close.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        compress: bool = True,
+        metadata: dict | None = None,
+    ):
+        """
+        Create the history file and start the writer thread.
+
+        Args:
+            path (str): The path of the history file, overwritten if it exists.
+            keyframe_interval (int): The number of ticks between two keyframes.
+            queue_size (int): The number of chunks waiting to be written before
+                record blocks.
+            compress (bool): Compress the chunks with zlib.
+            metadata (dict | None): Extra JSON-serializable metadata to store.
+        """
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.compress = compress
+        self.keyframes = 0
+        self.deltas = 0
+        self.bytes_written = 0
+        self.stall = 0.0  # Seconds record spent blocked on a full queue
+        self.encoding = 0.0  # Seconds record spent capturing and diffing
+        self._previous = None
+        self._last_keyframe = 0
+        self._keyframe_due = True
+        self._error: BaseException | None = None
+
+        header = json.dumps(
+            {
+                "version": VERSION,
+                "keyframe_interval": keyframe_interval,
+                "metadata": metadata or {},
+            }
+        ).encode()
+        self._file = open(path, "wb")
+        self._file.write(_PREAMBLE.pack(MAGIC, len(header)) + header)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name="recorder", daemon=True)
+        self._thread.start()
+
+    def on_compaction(self, remap: np.ndarray) -> None:
+        """
+        Write a keyframe on the next record, as the "compaction" observer: the
+        cells have moved to new slots.
+
+        Args:
+            remap (np.ndarray): The new index of each old index, or -1.
+        """
+        self._keyframe_due = True
+
+    def record(self, world, tick: int) -> None:
+        """
+        Record the cells of a world at a tick, as a keyframe or a delta.
+
+        Args:
+            world (World): The world.
+            tick (int): The tick, increasing from one call to the next.
+        """
+        if self._error is not None:
+            raise self._error
+        start = time.perf_counter()
+        current = capture(world.cells)
+        size = len(current["alive"])
+        previous = self._previous
+        if (
+            self._keyframe_due
+            or previous is None
+            or size < len(previous["alive"])
+            or tick - self._last_keyframe >= self.keyframe_interval
+        ):
+            kind = KEYFRAME
+            arrays = {name: current[name] for name in Frame.COLUMNS}
+            self._last_keyframe = tick
+            self._keyframe_due = False
+            self.keyframes += 1
+        else:
+            kind = DELTA
+            arrays = diff(previous, current)
+            self.deltas += 1
+        self._previous = current
+        self.encoding += time.perf_counter() - start
+
+        start = time.perf_counter()
+        self._queue.put((kind, tick, arrays, size))
+        self.stall += time.perf_counter() - start
+
+    def _run(self) -> None:
+        while (item := self._queue.get()) is not None:
+            if self._error is not None:
+                continue
+            try:
+                chunk = encode_chunk(*item, self.compress)
+                self._file.write(chunk)
+                self._file.flush()
+                self.bytes_written += len(chunk)
+            except BaseException as error:  # Raised in the tick loop instead
+                self._error = error
+
+    def close(self) -> None:
+        """
+        Write the chunks still queued, stop the writer thread and close the file.
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._file.close()
+        if self._error is not None:
+            raise self._error
+
+
+class HistoryReader:
+    """
+    The HistoryReader replays a history file written by a Recorder.
+
+    Opening the file scans the heads of its chunks into an index of their ticks
+    and offsets; a chunk cut short by a crash ends the history. frame seeks to
+    any recorded tick by loading the keyframe at or before it and applying the
+    deltas after it, and frames streams consecutive frames, applying one delta
+    per tick.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open a history file and index its chunks.
+
+        Args:
+            path (str): The path of the history file.
+        """
+        self._file = open(path, "rb")
+        magic, length = _PREAMBLE.unpack(self._file.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a history file")
+        self.header = json.loads(self._file.read(length))
+        if self.header["version"] != VERSION:
+            raise ValueError(
+                f"Unsupported history version {self.header['version']}, "
+                f"expected {VERSION}"
+            )
+
+        ticks, kinds, offsets = [], [], []
+        offset = self._file.tell()
+        end = self._file.seek(0, 2)
+        while offset + _CHUNK.size <= end:
+            self._file.seek(offset)
+            tag, kind, tick, header_length, payload_length = _CHUNK.unpack(
+                self._file.read(_CHUNK.size)
+            )
+            following = offset + _CHUNK.size + header_length + payload_length
+            if tag != CHUNK_TAG or following > end:
+                break
+            ticks.append(tick)
+            kinds.append(kind)
+            offsets.append(offset)
+            offset = following
+        self.ticks = np.array(ticks, dtype=np.int64)
+        self.kinds = np.array(kinds, dtype=np.uint8)
+        self.offsets = np.array(offsets, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.ticks)
+
+    def __enter__(self) -> "HistoryReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the history file.
+        """
+        self._file.close()
+
+    def _read(self, position: int) -> tuple[int, dict, dict[str, np.ndarray]]:
+        self._file.seek(self.offsets[position])
+        _, kind, _, header_length, payload_length = _CHUNK.unpack(
+            self._file.read(_CHUNK.size)
+        )
+        header = json.loads(self._file.read(header_length))
+        return kind, header, decode_payload(header, self._file.read(payload_length))
+
+    def _position(self, tick: int) -> int:
+        position = int(np.searchsorted(self.ticks, tick))
+        if position == len(self.ticks) or self.ticks[position] != tick:
+            raise KeyError(f"Tick {tick} was not recorded")
+        return position
+
+    def _advance(self, frame: Frame | None, position: int) -> Frame:
+        # Load the chunk at `position` over the frame of the previous chunk
+        kind, header, arrays = self._read(position)
+        tick = int(self.ticks[position])
+        if kind == KEYFRAME:
+            return Frame(tick, {name: arrays[name].copy() for name in Frame.COLUMNS})
+        frame.apply(tick, header["size"], arrays)
+        return frame
+
+    def frame(self, tick: int) -> Frame:
+        """
+        Rebuild the frame of a recorded tick from the keyframe before it.
+
+        Args:
+            tick (int): The tick.
+
+        Returns:
+            Frame: The frame.
+        """
+        position = self._position(tick)
+        keyframes = np.flatnonzero(self.kinds[: position + 1] == KEYFRAME)
+        frame = None
+        for current in range(keyframes[-1], position + 1):
+            frame = self._advance(frame, current)
+        return frame
+
+    def frames(
+        self, start: int | None = None, stop: int | None = None
+    ) -> Iterator[Frame]:
+        """
+        Stream the frames of the recorded ticks from `start` up to, but not
+        including, `stop`.
+
+        The frame yielded is updated in place by the next step; copy it to keep
+        it.
+
+        Args:
+            start (int | None): The first tick, which must have been recorded;
+                the first recorded tick if omitted.
+            stop (int | None): The tick to stop at; the end of the history if
+                omitted.
+
+        Yields:
+            Frame: The frame of each recorded tick.
+        """
+        if len(self.ticks) == 0:
+            return
+        first = self._position(start) if start is not None else 0
+        last = (
+            len(self.ticks) if stop is None else int(np.searchsorted(self.ticks, stop))
+        )
+        if first >= last:
+            return
+        frame = self.frame(int(self.ticks[first]))
+        yield frame
+        for position in range(first + 1, last):
+            frame = self._advance(frame, position)
+            yield frame
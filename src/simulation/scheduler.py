@@ -0,0 +1,680 @@
+# src/simulation/scheduler.py
+
+import time
+from typing import Callable
+
+import numpy as np
+
+from src.cells.cell_store import NO_CONNECTION
+from src.cells.cell_type import CellType
+from src.cells.kernels import OFFSPRING_ENERGY, brain_builds, brain_tick
+from src.core.canopy import CanopyMap
+from src.core.environment import Environment
+from src.core.fields import EnvironmentFields
+from src.core.world import World
+from src.dynamics.communication import AntennaNetwork
+from src.dynamics.energy import EnergyManager
+from src.dynamics.interaction import InteractionEngine
+from src.dynamics.ledger import EXTERNAL, EnergyLedger
+from src.dynamics.lifecycle import Lifecycle
+from src.dynamics.organisms import OrganismRegistry
+from src.dynamics.phenotype import BUILDABLE_TYPES, PhenotypeDecoder
+from src.dynamics.transport import TransportEngine
+from src.simulation.checkpoint import (
+    DEFAULT_INTERVAL,
+    DEFAULT_KEEP,
+    Checkpointer,
+    load_checkpoint,
+)
+from src.simulation.event import EventQueue
+from src.simulation.recorder import (
+    DEFAULT_KEYFRAME_INTERVAL,
+    DEFAULT_QUEUE_SIZE,
+    Recorder,
+)
+from src.simulation.sequence import Sequence
+from src.utils.metrics import (
+    DEFAULT_HISTOGRAM_INTERVAL,
+    DEFAULT_INTERVAL as DEFAULT_METRICS_INTERVAL,
+    SimulationMetrics,
+)
+from src.utils.profiler import Profiler
+
+
+class Scheduler:
+    """
+    The Scheduler drives the simulation with a fixed-timestep main loop.
+
+    Each tick runs the phases of its Sequence in order:
+    environment -> production -> transport -> interaction -> communication ->
+    brain -> lifecycle.
+    The environment phase also updates the per-pixel EnvironmentFields and the
+    CanopyMap, which the production phase samples. With enable_ledger, every
+    energy transfer is recorded in an EnergyLedger and conservation is checked
+    after each phase.
+    Phases operate on the world's CellStore in bulk. Cells that should die and
+    cells to be born are collected during the tick by a Lifecycle and applied in
+    one batch by the lifecycle phase at the end of it. An OrganismRegistry keeps
+    the organism of every cell up to date; when a brain dies, its whole
+    organism dies in the same batch. The brains read their phenotypes from a
+    PhenotypeDecoder, by genome handle.
+
+    Per-phase wall times are written into a preallocated ring buffer, so a
+    headless run performs no per-tick allocation besides cell births and the
+    temporaries of the NumPy kernels.
+
+    Sparse events go through an EventQueue: sector weather fires at sampled
+    future ticks, and the lifecycle phase emits "cell_death" and "conduit_death"
+    topics with the indices of the cells that died, "cell_birth" with the
+    indices of the newborn cells and of their parent brains, "cell_promotion"
+    with the seeds promoted to brains, and "compaction" with the index remap
+    after the cell store is compacted. Seeds alive at construction or born
+    later are registered under their conduit and germinate into brains when it
+    dies, without being polled.
+
+    With enable_checkpoints, a Checkpointer writes the world to disk every few
+    ticks from a background thread, with the lineage tables of the attached
+    EvolutionEngine if any; resume builds a scheduler from a checkpoint.
+    With enable_recording, a Recorder streams the cells of every tick to a
+    history file as keyframes and deltas, for replay with a HistoryReader.
+    With enable_metrics, SimulationMetrics samples populations, energy, births,
+    deaths and phase timings into a MetricsRegistry.
+    With enable_profiling, or the SOL_PROFILE environment variable, a Profiler
+    times every phase and every batch of cells of one type; see Profiler.
+    """
+
+    def __init__(
+        self,
+        world: World,
+        environment: Environment | None = None,
+        transport_mode: str = "hop",
+        history: int = 1024,
+        events: EventQueue | None = None,
+        fields: EnvironmentFields | None = None,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            world (World): The world to simulate.
+            environment (Environment | None): The environment of the world; a
+                default one is created if omitted.
+            transport_mode (str): The TransportEngine mode, "hop" or "direct".
+            history (int): The number of ticks kept in the timing ring buffer.
+            events (EventQueue | None): The event queue; a new one is created and
+                drives the world's random and weather events if omitted.
+            fields (EnvironmentFields | None): The per-pixel environment fields
+                sampled by the producers; default fields are created if omitted.
+        """
+        self.world = world
+        self.environment = environment or Environment(world)
+        self.fields = fields or EnvironmentFields(world)
+        self.transport = TransportEngine(world.cells)
+        self.transport_mode = transport_mode
+        self.tick = 0
+        self.history = history
+        self.sequence = self.default_sequence()
+        self.observers: list[Callable[[int], None]] = []
+        self._reset_timings()
+
+        if events is None:
+            events = EventQueue(world.rng.stream("events"))
+            world.schedule_random_events(events)
+            self.environment.schedule_weather_events(events)
+        self.events = events
+        self.lifecycle = Lifecycle(world, self.transport, events)
+        self.organisms = OrganismRegistry(world, self.transport, events)
+        self.lifecycle.organisms = self.organisms
+        self.interaction = InteractionEngine(
+            world, self.transport, organisms=self.organisms, events=events
+        )
+        self.network = AntennaNetwork(world, self.transport, organisms=self.organisms)
+        self.canopy = CanopyMap(world, events)
+        # Compiled phenotypes of the brains' genomes; see its stats to size it
+        self.decoder = PhenotypeDecoder()
+        self.energy = EnergyManager(world, self.fields, self.canopy, history)
+        self.ledger = None
+        self.checkpointer = None
+        self.recorder = None
+        self.metrics = None
+        self.profiler = None
+        # Attached by EvolutionEngine; restored is the header of the checkpoint
+        # resumed from, if any, which the engine restores its tables from
+        self.evolution = None
+        self.restored: dict | None = None
+        self.seeds_by_conduit: dict[int, list[int]] = {}
+        self.register_seeds(world.cells.alive_indices(CellType.SEED))
+        events.subscribe("cell_birth", self.on_birth)
+        events.subscribe("conduit_death", self.germinate_seeds)
+        events.subscribe("compaction", self.remap_seeds)
+        profiler = Profiler.from_environment()
+        if profiler is not None:
+            self.enable_profiling(profiler)
+
+    def default_sequence(self) -> Sequence:
+        """
+        Build the default phase sequence.
+
+        Returns:
+            Sequence: The phases in their default order.
+        """
+        sequence = Sequence()
+        sequence.add("environment", self.run_environment)
+        sequence.add("production", self.run_production)
+        sequence.add("transport", self.run_transport)
+        sequence.add("interaction", self.run_interaction)
+        sequence.add("communication", self.run_communication)
+        sequence.add("brain", self.run_brains)
+        sequence.add("lifecycle", self.run_lifecycle)
+        return sequence
+
+    def _reset_timings(self) -> None:
+        phases = len(self.sequence)
+        self.timings = np.zeros((self.history, phases), dtype=np.float64)
+        self.phase_totals = np.zeros(phases, dtype=np.float64)
+        # Phase of each column of the timings, see _resize_timings
+        self.timed_phases = list(self.sequence.names)
+        self.ticks_run = 0
+        self.cell_updates = 0
+        self.elapsed = 0.0
+
+    def _resize_timings(self) -> None:
+        # Follow the phases added to or removed from the sequence, e.g. by the
+        # EvolutionEngine, keeping the times of the phases that remain
+        names = self.sequence.names
+        timings = np.zeros((self.history, len(names)), dtype=np.float64)
+        totals = np.zeros(len(names), dtype=np.float64)
+        for position, name in enumerate(names):
+            if name in self.timed_phases:
+                previous = self.timed_phases.index(name)
+                timings[:, position] = self.timings[:, previous]
+                totals[position] = self.phase_totals[previous]
+        self.timings = timings
+        self.phase_totals = totals
+        self.timed_phases = list(names)
+
+    def add_observer(self, observer: Callable[[int], None]) -> None:
+        """
+        Register a callable run after every tick of a non-headless run, e.g. for
+        rendering.
+
+        Args:
+            observer (Callable[[int], None]): The callable, given the tick number.
+        """
+        self.observers.append(observer)
+
+    def enable_ledger(self, ledger: EnergyLedger | None = None) -> EnergyLedger:
+        """
+        Record every energy transfer and check conservation after each phase.
+
+        Args:
+            ledger (EnergyLedger | None): The ledger to use; a new one if omitted.
+
+        Returns:
+            EnergyLedger: The ledger.
+        """
+        self.disable_ledger()
+        self.ledger = ledger or EnergyLedger(self.world.cells, history=self.history)
+        for component in self.ledger_components():
+            component.ledger = self.ledger
+        self.events.subscribe("compaction", self.ledger.on_compaction)
+        return self.ledger
+
+    def ledger_components(self) -> tuple:
+        """
+        Return the components moving energy, which hold a `ledger` attribute.
+        """
+        return (self.energy, self.transport, self.interaction, self.lifecycle)
+
+    def disable_ledger(self) -> None:
+        """
+        Stop recording energy transfers.
+        """
+        if self.ledger is None:
+            return
+        for component in self.ledger_components():
+            component.ledger = None
+        self.events.unsubscribe("compaction", self.ledger.on_compaction)
+        self.ledger = None
+
+    def enable_checkpoints(
+        self, directory: str, interval: int = DEFAULT_INTERVAL, keep: int = DEFAULT_KEEP
+    ) -> Checkpointer:
+        """
+        Write a checkpoint of the world every `interval` ticks, in the background.
+
+        Args:
+            directory (str): The directory of the checkpoints.
+            interval (int): The number of ticks between two checkpoints.
+            keep (int): The number of checkpoints kept on disk.
+
+        Returns:
+            Checkpointer: The checkpointer.
+        """
+        self.disable_checkpoints()
+        self.checkpointer = Checkpointer(directory, interval, keep)
+        return self.checkpointer
+
+    def disable_checkpoints(self) -> None:
+        """
+        Stop writing checkpoints, after the one being written is on disk.
+        """
+        if self.checkpointer is not None:
+            self.checkpointer.close()
+            self.checkpointer = None
+
+    def enable_recording(
+        self,
+        path: str,
+        keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ) -> Recorder:
+        """
+        Record the cells after every tick to a history file, starting with the
+        current tick.
+
+        Args:
+            path (str): The path of the history file.
+            keyframe_interval (int): The number of ticks between two keyframes.
+            queue_size (int): The number of chunks waiting to be written before
+                the tick loop blocks.
+
+        Returns:
+            Recorder: The recorder.
+        """
+        self.disable_recording()
+        metadata = {"width": self.world.width, "height": self.world.height}
+        self.recorder = Recorder(path, keyframe_interval, queue_size, metadata=metadata)
+        self.events.subscribe("compaction", self.recorder.on_compaction)
+        self.recorder.record(self.world, self.tick)
+        return self.recorder
+
+    def disable_recording(self) -> None:
+        """
+        Stop recording, after the chunks queued are written.
+        """
+        if self.recorder is None:
+            return
+        self.events.unsubscribe("compaction", self.recorder.on_compaction)
+        self.recorder.close()
+        self.recorder = None
+
+    def enable_metrics(
+        self,
+        interval: int = DEFAULT_METRICS_INTERVAL,
+        histogram_interval: int = DEFAULT_HISTOGRAM_INTERVAL,
+    ) -> SimulationMetrics:
+        """
+        Sample the metrics of the simulation after every tick.
+
+        Args:
+            interval (int): The number of ticks between two samples of the series.
+            histogram_interval (int): The number of ticks between two samples of
+                the cell energy histogram.
+
+        Returns:
+            SimulationMetrics: The metrics, whose `registry` exports them.
+        """
+        self.disable_metrics()
+        self.metrics = SimulationMetrics(self, interval, histogram_interval)
+        return self.metrics
+
+    def disable_metrics(self) -> None:
+        """
+        Stop sampling metrics and serving them, if served.
+        """
+        if self.metrics is not None:
+            self.metrics.registry.stop_serving()
+            self.metrics = None
+
+    def enable_profiling(self, profiler: Profiler | None = None) -> Profiler:
+        """
+        Time every phase and every batch of cells of one type processed by the
+        components, until disable_profiling.
+
+        Args:
+            profiler (Profiler | None): The profiler to use; a new one if omitted.
+                Call its start_sampling to sample call stacks too.
+
+        Returns:
+            Profiler: The profiler.
+        """
+        self.disable_profiling()
+        self.profiler = profiler or Profiler()
+        for component in self.profiled_components():
+            component.profiler = self.profiler
+        return self.profiler
+
+    def profiled_components(self) -> tuple:
+        """
+        Return the components timing their batches, which hold a `profiler`
+        attribute.
+        """
+        return (self.energy, self.lifecycle)
+
+    def disable_profiling(self) -> None:
+        """
+        Stop timing, and stop sampling call stacks if sampling.
+        """
+        if self.profiler is None:
+            return
+        for component in self.profiled_components():
+            component.profiler = None
+        self.profiler.stop_sampling()
+        self.profiler = None
+
+    @classmethod
+    def resume(cls, path: str, mmap: bool = True, **kwargs) -> "Scheduler":
+        """
+        Build a scheduler from a checkpoint, continuing at its tick.
+
+        The world, its random streams and the tick are restored; the event queue
+        is scheduled afresh from the tick and the components are rebuilt from the
+        world, so the run continues from the saved state but is not bit-for-bit
+        the run that wrote the checkpoint.
+
+        Args:
+            path (str): The path of the checkpoint.
+            mmap (bool): Memory-map the checkpoint, see load_checkpoint.
+            **kwargs: Further arguments of the Scheduler, e.g. transport_mode.
+
+        Returns:
+            Scheduler: The scheduler.
+        """
+        world, header = load_checkpoint(path, mmap)
+        tick = header["tick"]
+        events = EventQueue(world.rng.stream("events"))
+        world.schedule_random_events(events, world.random_event_probability, tick)
+        environment = Environment(world)
+        environment.schedule_weather_events(events, start=tick)
+        kwargs.setdefault(
+            "transport_mode", header["metadata"].get("transport_mode", "hop")
+        )
+        scheduler = cls(world, environment, events=events, **kwargs)
+        scheduler.tick = tick
+        scheduler.restored = header
+        return scheduler
+
+    def checkpoint_state(self) -> tuple[dict, dict[str, np.ndarray]]:
+        """
+        Return what a checkpoint stores besides the world: the transport mode as
+        metadata, and the state of the EvolutionEngine if one is attached.
+
+        Returns:
+            tuple[dict, dict[str, np.ndarray]]: The metadata and the extra arrays.
+        """
+        metadata = {"transport_mode": self.transport_mode}
+        if self.evolution is None:
+            return metadata, {}
+        metadata["evolution"], extra = self.evolution.state()
+        return metadata, extra
+
+    def mark_dying(self, indices: np.ndarray) -> None:
+        """
+        Queue cells to be removed by the lifecycle phase of the current tick.
+
+        Args:
+            indices (np.ndarray): The indices of the cells.
+        """
+        self.lifecycle.kill(indices)
+
+    def register_seeds(self, seeds: np.ndarray) -> None:
+        """
+        Make seeds germinate when the conduit they are connected to dies.
+
+        Seeds alive when the scheduler is built and seeds born through the
+        Lifecycle are registered automatically; seeds added to the world directly
+        afterwards, e.g. with World.add_cell, must be registered with this.
+
+        Args:
+            seeds (np.ndarray): The indices of the seed cells.
+        """
+        conduits = self.world.cells.connection[seeds]
+        connected = conduits != NO_CONNECTION
+        for seed, conduit in zip(
+            seeds[connected].tolist(), conduits[connected].tolist()
+        ):
+            self.seeds_by_conduit.setdefault(conduit, []).append(seed)
+
+    def on_birth(self, born: np.ndarray, parents: np.ndarray) -> None:
+        """
+        Register the newborn seeds, as the "cell_birth" observer.
+
+        Args:
+            born (np.ndarray): The indices of the newborn cells.
+            parents (np.ndarray): The indices of their parent brains.
+        """
+        cells = self.world.cells
+        self.register_seeds(born[cells.type_code[born] == CellType.SEED])
+
+    def germinate_seeds(self, dead_conduits: np.ndarray) -> None:
+        """
+        Turn the living seeds of dead conduits into brain cells, in place.
+
+        Args:
+            dead_conduits (np.ndarray): The indices of the conduits that died.
+        """
+        seeds = []
+        for conduit in dead_conduits.tolist():
+            seeds.extend(self.seeds_by_conduit.pop(conduit, ()))
+        self.lifecycle.promote(np.array(seeds, dtype=np.int64))
+
+    def remap_seeds(self, remap: np.ndarray) -> None:
+        """
+        Rewrite the registered seeds after the cell store was compacted.
+
+        Args:
+            remap (np.ndarray): The new index of each old index, or -1.
+        """
+        seeds_by_conduit = {}
+        for conduit, seeds in self.seeds_by_conduit.items():
+            seeds = [s for s in remap[seeds].tolist() if s != NO_CONNECTION]
+            if remap[conduit] != NO_CONNECTION and seeds:
+                seeds_by_conduit[int(remap[conduit])] = seeds
+        self.seeds_by_conduit = seeds_by_conduit
+
+    def run_environment(self, tick: int) -> None:
+        """
+        Fire due events, update seasons, weather, sunlight and organic matter, then
+        the per-pixel fields and the canopy columns changed by the last tick.
+        """
+        profiler = self.profiler
+        if profiler is None:
+            self.events.run_due(tick)
+            self.world.update_environment()
+            self.environment.update_environment()
+            self.fields.update(tick)
+            self.canopy.update()
+            return
+        for name, action in (
+            ("events", lambda: self.events.run_due(tick)),
+            ("world", self.world.update_environment),
+            ("weather", self.environment.update_environment),
+            ("fields", lambda: self.fields.update(tick)),
+            ("canopy", self.canopy.update),
+        ):
+            profiler.begin(name)
+            action()
+            profiler.end()
+
+    def run_production(self, tick: int) -> None:
+        """
+        Run the energy sources of the EnergyManager: leaves sampling the light
+        field through the canopy, roots the organic matter field, and antennas.
+        """
+        self.mark_dying(self.energy.update_energy_distribution(tick))
+
+    def run_transport(self, tick: int) -> None:
+        """
+        Forward energy through the conduit networks.
+        """
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.begin("forward", CellType.CONDUIT, len(self.transport.conduits))
+        self.mark_dying(self.transport.step(self.transport_mode))
+        if profiler is not None:
+            profiler.end()
+
+    def run_interaction(self, tick: int) -> None:
+        """
+        Resolve the bites and collisions between adjacent organisms.
+        """
+        self.interaction.step(tick)
+
+    def run_communication(self, tick: int) -> None:
+        """
+        Broadcast the messages of the communicating antennas to the brains.
+        """
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.begin("broadcast", CellType.ANTENNA)
+        report = self.network.step(tick)
+        if profiler is not None:
+            profiler.end(report["broadcasters"])
+
+    def run_brains(self, tick: int) -> None:
+        """
+        Run the brain kernel and queue the cells the brains create, of the type and
+        at the position their phenotype gives, connected to their brain.
+        """
+        cells = self.world.cells
+        profiler = self.profiler
+        if self.ledger is not None:
+            brains = cells.alive_indices(CellType.BRAIN)
+            before = cells.energy[brains]
+        if profiler is not None:
+            brains = cells.alive_indices(CellType.BRAIN)
+            profiler.begin("actions", CellType.BRAIN, len(brains))
+        parents, dead = brain_tick(cells)
+        if profiler is not None:
+            profiler.end()
+        if self.ledger is not None:
+            paid = before - cells.energy[brains]
+            self.ledger.record("metabolism", brains, EXTERNAL, paid)
+        self.mark_dying(dead)
+        if profiler is not None:
+            profiler.begin("reproduction", CellType.BRAIN, len(parents))
+        types, xs, ys = brain_builds(cells, parents, self.decoder)
+        for cell_type in BUILDABLE_TYPES.tolist():
+            built = types == cell_type
+            self.lifecycle.spawn(
+                cell_type,
+                xs[built],
+                ys[built],
+                OFFSPRING_ENERGY,
+                connections=parents[built],
+                parents=parents[built],
+            )
+        if profiler is not None:
+            profiler.end()
+
+    def run_lifecycle(self, tick: int) -> None:
+        """
+        Remove the cells that died during the tick and add the newborn cells.
+        """
+        self.lifecycle.apply(tick)
+
+    def step(self) -> None:
+        """
+        Run a single tick, recording the wall time of each phase.
+        """
+        if self.timed_phases != self.sequence.names:
+            self._resize_timings()
+        row = self.timings[self.tick % self.history]
+        totals = self.phase_totals
+        clock = time.perf_counter
+        ledger = self.ledger
+        profiler = self.profiler
+        self.cell_updates += len(self.world.cells)
+        if ledger is not None:
+            ledger.begin_tick(self.tick)
+        if profiler is not None:
+            profiler.begin("tick")
+        for position, action in enumerate(self.sequence.actions):
+            if ledger is not None:
+                ledger.begin_phase(self.sequence.names[position])
+            if profiler is not None:
+                profiler.begin(self.sequence.names[position])
+            start = clock()
+            action(self.tick)
+            elapsed = clock() - start
+            row[position] = elapsed
+            totals[position] += elapsed
+            if profiler is not None:
+                profiler.end()
+            if ledger is not None:
+                ledger.end_phase()
+        if ledger is not None:
+            ledger.end_tick()
+        self.tick += 1
+        self.ticks_run += 1
+        if profiler is not None:
+            profiler.begin("after_tick")
+        # Each hook is timed in its own scope inside "after_tick"
+        if self.checkpointer is not None:
+            if profiler is not None:
+                profiler.begin("checkpoint")
+            self.checkpointer.after_tick(
+                self.world, self.tick, *self.checkpoint_state()
+            )
+            if profiler is not None:
+                profiler.end()
+        if self.recorder is not None:
+            if profiler is not None:
+                profiler.begin("recording")
+            self.recorder.record(self.world, self.tick)
+            if profiler is not None:
+                profiler.end()
+        if self.metrics is not None:
+            if profiler is not None:
+                profiler.begin("metrics")
+            self.metrics.after_tick(self.tick)
+            if profiler is not None:
+                profiler.end()
+        if profiler is not None:
+            profiler.end()
+            profiler.end()
+            profiler.end_tick()
+
+    def run(self, ticks: int, headless: bool = True) -> dict:
+        """
+        Run a number of ticks as fast as possible.
+
+        Args:
+            ticks (int): The number of ticks to run.
+            headless (bool): Skip the per-tick observers when True.
+
+        Returns:
+            dict: The performance report, see report().
+        """
+        start = time.perf_counter()
+        if headless:
+            for _ in range(ticks):
+                self.step()
+        else:
+            for _ in range(ticks):
+                self.step()
+                for observer in self.observers:
+                    observer(self.tick)
+        self.elapsed += time.perf_counter() - start
+        return self.report()
+
+    def report(self) -> dict:
+        """
+        Summarize the performance of the ticks run so far.
+
+        Returns:
+            dict: The number of ticks, ticks per second, cell updates per second,
+                and the mean wall time per tick of each phase in milliseconds.
+        """
+        ticks = max(self.ticks_run, 1)
+        elapsed = max(self.elapsed, 1e-12)
+        return {
+            "ticks": self.ticks_run,
+            "ticks_per_second": self.ticks_run / elapsed,
+            "cell_updates_per_second": self.cell_updates / elapsed,
+            "phase_ms": {
+                name: total * 1e3 / ticks
+                for name, total in zip(self.sequence.names, self.phase_totals)
+            },
+        }
@@ -0,0 +1,76 @@
+# src/simulation/sequence.py
+
+from typing import Callable, Iterator
+
+
+class Sequence:
+    """
+    The Sequence class is an ordered list of named phases. Each phase is a callable
+    taking the current tick number, and the Scheduler runs them in order once per tick.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty sequence.
+        """
+        self.names: list[str] = []
+        self.actions: list[Callable[[int], None]] = []
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[tuple[str, Callable[[int], None]]]:
+        return iter(zip(self.names, self.actions))
+
+    def index(self, name: str) -> int:
+        """
+        Return the position of a phase.
+
+        Args:
+            name (str): The name of the phase.
+
+        Returns:
+            int: The position of the phase in the sequence.
+        """
+        try:
+            return self.names.index(name)
+        except ValueError:
+            raise KeyError(f"Unknown phase: {name}") from None
+
+    def add(
+        self, name: str, action: Callable[[int], None], before: str | None = None
+    ) -> None:
+        """
+        Add a phase at the end of the sequence, or before another phase.
+
+        Args:
+            name (str): The name of the phase.
+            action (Callable[[int], None]): The callable run with the tick number.
+            before (str | None): The name of the phase to insert before.
+        """
+        if name in self.names:
+            raise ValueError(f"Phase '{name}' already exists")
+        position = len(self.names) if before is None else self.index(before)
+        self.names.insert(position, name)
+        self.actions.insert(position, action)
+
+    def replace(self, name: str, action: Callable[[int], None]) -> None:
+        """
+        Replace the action of an existing phase.
+
+        Args:
+            name (str): The name of the phase.
+            action (Callable[[int], None]): The new callable.
+        """
+        self.actions[self.index(name)] = action
+
+    def remove(self, name: str) -> None:
+        """
+        Remove a phase.
+
+        Args:
+            name (str): The name of the phase.
+        """
+        position = self.index(name)
+        del self.names[position]
+        del self.actions[position]
@@ -0,0 +1,568 @@
+# src/utils/metrics.py
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from src.cells.cell_type import CellType
+
+# Samples kept by a RingSeries before the oldest are overwritten.
+DEFAULT_CAPACITY = 4096
+
+# Ticks between two samples of the time series.
+DEFAULT_INTERVAL = 10
+
+# Ticks between two samples of the cell energy histogram, a full pass over the
+# living cells.
+DEFAULT_HISTOGRAM_INTERVAL = 100
+
+# Prefix of the metric names in the Prometheus text format.
+PREFIX = "sol_"
+
+# Port of the local Prometheus endpoint.
+DEFAULT_PORT = 9464
+
+# Upper bounds of the buckets of the cell energy histogram.
+ENERGY_BUCKETS = (0.0, 1.0, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0)
+
+# Upper bounds in seconds of the buckets of the tick duration histogram.
+TICK_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Cell types sampled, EMPTY excepted.
+_CELL_TYPES = tuple(cell_type for cell_type in CellType if cell_type != CellType.EMPTY)
+
+
+class RingSeries:
+    """
+    A time series of named values sampled together, kept in a preallocated ring
+    buffer: appending a sample writes one row and never allocates, and once the
+    buffer is full each sample overwrites the oldest.
+    """
+
+    def __init__(
+        self,
+        names,
+        capacity: int = DEFAULT_CAPACITY,
+        label: str = "name",
+        description: str = "",
+    ):
+        """
+        Initialize an empty series.
+
+        Args:
+            names: The names of the values of a sample.
+            capacity (int): The number of samples kept.
+            label (str): The Prometheus label telling the values apart.
+            description (str): The description of the series.
+        """
+        self.names = tuple(names)
+        self.label = label
+        self.description = description
+        self.ticks = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros((capacity, len(self.names)), dtype=np.float64)
+        self.count = 0
+
+    @property
+    def capacity(self) -> int:
+        """
+        The number of samples kept.
+        """
+        return len(self.ticks)
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, tick: int, values) -> None:
+        """
+        Add a sample.
+
+        Args:
+            tick (int): The tick of the sample.
+            values: One value per name.
+        """
+        row = self.count % self.capacity
+        self.ticks[row] = tick
+        self.values[row] = values
+        self.count += 1
+
+    def latest(self) -> dict[str, float]:
+        """
+        Return the last sample by name, empty if there is none.
+        """
+        if self.count == 0:
+            return {}
+        row = self.values[(self.count - 1) % self.capacity]
+        return dict(zip(self.names, row.tolist()))
+
+    def columns(self) -> dict[str, np.ndarray]:
+        """
+        Return the samples kept, oldest first, as one array per name.
+
+        Returns:
+            dict[str, np.ndarray]: The "tick" column and one column per name.
+        """
+        rows = np.arange(self.count - len(self), self.count) % self.capacity
+        columns = {"tick": self.ticks[rows]}
+        values = self.values[rows]
+        for position, name in enumerate(self.names):
+            columns[name] = values[:, position]
+        return columns
+
+    def with_names(self, names) -> "RingSeries":
+        """
+        Return a copy of the series holding other names, e.g. after a phase is
+        added to the scheduler. The samples kept are copied for the names in
+        both; the new names read 0 in them.
+
+        Args:
+            names: The names of the values of a sample.
+
+        Returns:
+            RingSeries: The new series.
+        """
+        series = RingSeries(names, self.capacity, self.label, self.description)
+        series.ticks[:] = self.ticks
+        series.count = self.count
+        for position, name in enumerate(series.names):
+            if name in self.names:
+                series.values[:, position] = self.values[:, self.names.index(name)]
+        return series
+
+
+class Counter:
+    """
+    A monotonic count, either incremented or set from a cumulative count kept
+    by a component, such as Lifecycle.births.
+    """
+
+    def __init__(self, description: str = ""):
+        """
+        Initialize the counter at 0.
+
+        Args:
+            description (str): The description of the counter.
+        """
+        self.description = description
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """
+        Add to the count.
+
+        Args:
+            amount (float): The non-negative amount added.
+        """
+        self.value += amount
+
+    def set(self, value: float) -> None:
+        """
+        Set the count from a cumulative count.
+
+        Args:
+            value (float): The count.
+        """
+        self.value = float(value)
+
+
+class Histogram:
+    """
+    A histogram over fixed buckets, each counting the observations at most its
+    upper bound and above the previous one; the last bucket has no upper bound.
+    Observations are binned in bulk with one searchsorted and one bincount.
+    """
+
+    def __init__(self, bounds, description: str = ""):
+        """
+        Initialize an empty histogram.
+
+        Args:
+            bounds: The increasing upper bounds of the buckets.
+            description (str): The description of the histogram.
+        """
+        self.bounds = np.asarray(bounds, dtype=np.float64)
+        self.description = description
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Drop the observations, e.g. to hold the distribution of one sample.
+        """
+        self.buckets = np.zeros(len(self.bounds) + 1, dtype=np.int64)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, values) -> None:
+        """
+        Add observations.
+
+        Args:
+            values: A value or an array of values.
+        """
+        values = np.atleast_1d(values)
+        positions = np.searchsorted(self.bounds, values)
+        self.buckets += np.bincount(positions, minlength=len(self.buckets))
+        self.count += len(values)
+        self.sum += float(values.sum())
+
+
+class MetricsRegistry:
+    """
+    The MetricsRegistry holds named time series, counters and histograms, and
+    exports them: time series to CSV files or to one columnar .npz archive with
+    an array per column, and everything to the Prometheus text format, which
+    serve publishes on a local HTTP endpoint.
+
+    The endpoint thread reads the metrics while the simulation updates them, so
+    a scrape may mix values of two consecutive samples.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty registry.
+        """
+        self.series: dict[str, RingSeries] = {}
+        self.counters: dict[str, Counter] = {}
+        self.histograms: dict[str, Histogram] = {}
+        self.server = None
+
+    def add_series(
+        self,
+        name: str,
+        names,
+        capacity: int = DEFAULT_CAPACITY,
+        label: str = "name",
+        description: str = "",
+    ) -> RingSeries:
+        """
+        Register a time series.
+
+        Args:
+            name (str): The name of the series.
+            names: The names of the values of a sample.
+            capacity (int): The number of samples kept.
+            label (str): The Prometheus label telling the values apart.
+            description (str): The description of the series.
+
+        Returns:
+            RingSeries: The series.
+        """
+        self.series[name] = RingSeries(names, capacity, label, description)
+        return self.series[name]
+
+    def add_counter(self, name: str, description: str = "") -> Counter:
+        """
+        Register a counter.
+
+        Args:
+            name (str): The name of the counter.
+            description (str): The description of the counter.
+
+        Returns:
+            Counter: The counter.
+        """
+        self.counters[name] = Counter(description)
+        return self.counters[name]
+
+    def add_histogram(self, name: str, bounds, description: str = "") -> Histogram:
+        """
+        Register a histogram.
+
+        Args:
+            name (str): The name of the histogram.
+            bounds: The increasing upper bounds of the buckets.
+            description (str): The description of the histogram.
+
+        Returns:
+            Histogram: The histogram.
+        """
+        self.histograms[name] = Histogram(bounds, description)
+        return self.histograms[name]
+
+    def write_csv(self, directory: str) -> list[str]:
+        """
+        Write each time series to `<directory>/<name>.csv`, with a header row
+        and one row per sample kept.
+
+        Args:
+            directory (str): The directory, which must exist.
+
+        Returns:
+            list[str]: The paths written.
+        """
+        paths = []
+        for name, series in self.series.items():
+            columns = series.columns()
+            path = f"{directory}/{name}.csv"
+            np.savetxt(
+                path,
+                np.column_stack(list(columns.values())),
+                delimiter=",",
+                header=",".join(columns),
+                comments="",
+                fmt=["%d"] + ["%.9g"] * len(series.names),
+            )
+            paths.append(path)
+        return paths
+
+    def write_columnar(self, path: str) -> None:
+        """
+        Write every time series to a .npz archive holding one array per column,
+        named "<series>.<column>", so a column loads without the others.
+
+        Args:
+            path (str): The path of the archive.
+        """
+        arrays = {}
+        for name, series in self.series.items():
+            for column, values in series.columns().items():
+                arrays[f"{name}.{column}"] = values
+        np.savez(path, **arrays)
+
+    def prometheus_text(self) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format: the last
+        sample of every series as a gauge labelled by value name, the counters,
+        and the histograms with cumulative buckets.
+
+        Returns:
+            str: The exposition.
+        """
+        lines = []
+        for name, series in self.series.items():
+            metric = PREFIX + name
+            lines += [f"# HELP {metric} {series.description}", f"# TYPE {metric} gauge"]
+            for key, value in series.latest().items():
+                lines.append(f'{metric}{{{series.label}="{key}"}} {value!r}')
+        for name, counter in self.counters.items():
+            metric = f"{PREFIX}{name}_total"
+            lines += [
+                f"# HELP {metric} {counter.description}",
+                f"# TYPE {metric} counter",
+            ]
+            lines.append(f"{metric} {counter.value!r}")
+        for name, histogram in self.histograms.items():
+            metric = PREFIX + name
+            lines += [
+                f"# HELP {metric} {histogram.description}",
+                f"# TYPE {metric} histogram",
+            ]
+            cumulative = np.cumsum(histogram.buckets).tolist()
+            bounds = [repr(bound) for bound in histogram.bounds.tolist()] + ["+Inf"]
+            for bound, count in zip(bounds, cumulative):
+                lines.append(f'{metric}_bucket{{le="{bound}"}} {count}')
+            lines.append(f"{metric}_sum {histogram.sum!r}")
+            lines.append(f"{metric}_count {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int = DEFAULT_PORT, host: str = "127.0.0.1"):
+        """
+        Publish the Prometheus text on http://host:port/metrics from a daemon
+        thread, until stop_serving.
+
+        Args:
+            port (int): The port; 0 picks a free one, see server.server_address.
+            host (str): The address to bind, local only by default.
+
+        Returns:
+            ThreadingHTTPServer: The server.
+        """
+        self.stop_serving()
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(
+            target=self.server.serve_forever, name="metrics", daemon=True
+        ).start()
+        return self.server
+
+    def stop_serving(self) -> None:
+        """
+        Stop the HTTP endpoint, if serving.
+        """
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+class SimulationMetrics:
+    """
+    SimulationMetrics samples the state of a running simulation into a
+    MetricsRegistry after every tick:
+        - every `interval` ticks, the "population" and "energy" of living cells
+          by type, the "births" and "deaths" per tick and the mean wall time
+          per tick of each phase since the previous sample;
+        - every `histogram_interval` ticks, the "cell_energy" histogram, reset
+          to the distribution of the living cells at that tick;
+        - every tick, the "tick_seconds" histogram of tick durations, and the
+          counters mirrored from the components.
+
+    Aggregates come from the CellStore columns in bulk. Populations are the
+    lengths of the cached alive_indices arrays, which the next tick's phases
+    reuse as no cell is born or dies in between, and energies are summed over
+    them; see bench_metrics for the cost per tick. The phase series follows the
+    phases added to or removed from the scheduler's sequence.
+    """
+
+    def __init__(
+        self,
+        scheduler,
+        interval: int = DEFAULT_INTERVAL,
+        histogram_interval: int = DEFAULT_HISTOGRAM_INTERVAL,
+        capacity: int = DEFAULT_CAPACITY,
+        registry: MetricsRegistry | None = None,
+    ):
+        """
+        Register the metrics of a scheduler.
+
+        Args:
+            scheduler (Scheduler): The scheduler to sample.
+            interval (int): The number of ticks between two samples of the series.
+            histogram_interval (int): The number of ticks between two samples of
+                the cell energy histogram.
+            capacity (int): The number of samples kept by each series.
+            registry (MetricsRegistry | None): The registry to fill; a new one if
+                omitted.
+        """
+        self.scheduler = scheduler
+        self.interval = interval
+        self.histogram_interval = histogram_interval
+        self.registry = registry or MetricsRegistry()
+        registry = self.registry
+        types = [cell_type.name.lower() for cell_type in _CELL_TYPES]
+        self.population = registry.add_series(
+            "population", types, capacity, "cell_type", "Living cells by type."
+        )
+        self.energy = registry.add_series(
+            "energy", types, capacity, "cell_type", "Energy of living cells by type."
+        )
+        self.lifecycle = registry.add_series(
+            "lifecycle",
+            ("births", "deaths"),
+            capacity,
+            "event",
+            "Births and deaths per tick since the previous sample.",
+        )
+        self.phases = registry.add_series(
+            "phase_seconds",
+            scheduler.timed_phases,
+            capacity,
+            "phase",
+            "Mean wall time per tick of each phase since the previous sample.",
+        )
+        self.cell_energy = registry.add_histogram(
+            "cell_energy", ENERGY_BUCKETS, "Energy of the living cells."
+        )
+        self.tick_seconds = registry.add_histogram(
+            "tick_seconds", TICK_BUCKETS, "Wall time of the ticks."
+        )
+        self.sources = {}
+        for name, component, attribute, description in (
+            ("ticks", scheduler, "ticks_run", "Ticks run."),
+            ("births", scheduler.lifecycle, "births", "Cells born."),
+            ("deaths", scheduler.lifecycle, "deaths", "Cells dead."),
+            ("compactions", scheduler.lifecycle, "compactions", "Compactions."),
+            ("contacts", scheduler.interaction, "contacts", "Contacts."),
+            ("bites", scheduler.interaction, "bites", "Bites between organisms."),
+            ("messages", scheduler.network, "delivered", "Messages delivered."),
+            (
+                "organism_deaths",
+                scheduler.organisms,
+                "organism_deaths",
+                "Organisms dead with their brain.",
+            ),
+        ):
+            self.sources[name] = (
+                registry.add_counter(name, description),
+                component,
+                attribute,
+            )
+        self._baseline(scheduler.tick)
+
+    def _baseline(self, tick: int) -> None:
+        lifecycle = self.scheduler.lifecycle
+        self._last = (tick, lifecycle.births, lifecycle.deaths)
+        scheduler = self.scheduler
+        self._phase_totals = dict(
+            zip(scheduler.timed_phases, scheduler.phase_totals.tolist())
+        )
+
+    def after_tick(self, tick: int) -> None:
+        """
+        Sample the metrics due, as called after every tick.
+
+        Args:
+            tick (int): The number of ticks run.
+        """
+        scheduler = self.scheduler
+        self.tick_seconds.observe(
+            scheduler.timings[(tick - 1) % scheduler.history].sum()
+        )
+        for counter, component, attribute in self.sources.values():
+            counter.set(getattr(component, attribute))
+        if tick % self.interval == 0:
+            self.sample(tick)
+        if tick % self.histogram_interval == 0:
+            self.sample_histograms()
+
+    def sample(self, tick: int) -> None:
+        """
+        Append a sample to every time series.
+
+        Args:
+            tick (int): The tick of the sample.
+        """
+        scheduler = self.scheduler
+        store = scheduler.world.cells
+        energy = store.energy
+        population = np.empty(len(_CELL_TYPES))
+        totals = np.empty(len(_CELL_TYPES))
+        for position, cell_type in enumerate(_CELL_TYPES):
+            cells = store.alive_indices(cell_type)
+            population[position] = len(cells)
+            totals[position] = energy[cells].sum()
+        self.population.append(tick, population)
+        self.energy.append(tick, totals)
+
+        lifecycle = scheduler.lifecycle
+        last_tick, births, deaths = self._last
+        ticks = max(tick - last_tick, 1)
+        self.lifecycle.append(
+            tick,
+            ((lifecycle.births - births) / ticks, (lifecycle.deaths - deaths) / ticks),
+        )
+        names = scheduler.timed_phases
+        if tuple(names) != self.phases.names:
+            self.phases = self.phases.with_names(names)
+            self.registry.series["phase_seconds"] = self.phases
+        previous = self._phase_totals
+        elapsed = [
+            total - previous.get(name, 0.0)
+            for name, total in zip(names, scheduler.phase_totals.tolist())
+        ]
+        self.phases.append(tick, np.array(elapsed) / ticks)
+        self._baseline(tick)
+
+    def sample_histograms(self) -> None:
+        """
+        Reset the cell energy histogram to the energy of the living cells.
+        """
+        store = self.scheduler.world.cells
+        self.cell_energy.reset()
+        self.cell_energy.observe(store.energy[store.alive_indices()])
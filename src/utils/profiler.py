@@ -0,0 +1,275 @@
+# src/utils/profiler.py
+
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from src.cells.cell_type import CellType
+
+# Environment variable enabling the scoped timers of every new Scheduler.
+PROFILE_ENV = "SOL_PROFILE"
+
+# Environment variable enabling stack sampling too; its value is the number of
+# seconds between two samples.
+SAMPLING_ENV = "SOL_PROFILE_SAMPLING"
+
+# Seconds between two samples of the call stack.
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+# Key of the scopes that process no particular cell type in the report.
+ANY_TYPE = "any"
+
+# Report key of each CellType code, looked up without going through the enum.
+_TYPE_NAMES = {int(cell_type): cell_type.name.lower() for cell_type in CellType}
+_TYPE_NAMES[None] = ANY_TYPE
+
+
+class Profiler:
+    """
+    The Profiler times nested scopes of the simulation and, optionally, samples
+    the Python call stack of the simulation thread.
+
+    Scopes are opened and closed with begin and end, or the scope context
+    manager, and are keyed by their path, e.g. "tick;production;sunlight". A
+    scope may name the cell type it processes and the number of cells in the
+    batch, which the report breaks the time down by. Components call the
+    profiler only when one is set as their `profiler` attribute, so a simulation
+    without one pays a None check per batch; see Scheduler.enable_profiling.
+
+    Both the timed scopes and the sampled stacks are written in the collapsed
+    stack format read by flamegraph.pl and speedscope: one line per stack, its
+    frames joined by ";", then a count, here the microseconds spent in the scope
+    itself or the number of samples.
+    """
+
+    def __init__(self, enabled: bool = True):
+        """
+        Initialize an empty profiler.
+
+        Args:
+            enabled (bool): Whether scopes are timed; see enable and disable.
+        """
+        self.enabled = enabled
+        self.reset()
+        self._sampler: threading.Thread | None = None
+        self._sampling = threading.Event()
+
+    @classmethod
+    def from_environment(cls) -> "Profiler | None":
+        """
+        Create a profiler if PROFILE_ENV or SAMPLING_ENV is set, sampling stacks
+        if SAMPLING_ENV is.
+
+        Returns:
+            Profiler | None: The profiler, or None if neither is set.
+        """
+        sampling = os.environ.get(SAMPLING_ENV)
+        if not os.environ.get(PROFILE_ENV) and not sampling:
+            return None
+        profiler = cls()
+        if sampling:
+            profiler.start_sampling(float(sampling))
+        return profiler
+
+    def reset(self) -> None:
+        """
+        Drop the times, calls, samples and ticks recorded so far.
+        """
+        self.times: dict[str, float] = {}
+        self.calls: dict[str, int] = {}
+        self.by_type: dict[str, list] = {}  # [seconds, calls, cells] by type
+        self.samples: dict[str, int] = {}
+        self.ticks = 0
+        # Open scopes as [path, cell type, cells, start, has nested scopes]
+        self._stack: list[list] = []
+
+    def enable(self) -> None:
+        """
+        Start timing scopes.
+        """
+        self.enabled = True
+
+    def disable(self) -> None:
+        """
+        Stop timing scopes; the scopes open are dropped.
+        """
+        self.enabled = False
+        self._stack.clear()
+
+    def begin(self, name: str, cell_type: int | None = None, cells: int = 0) -> None:
+        """
+        Open a scope inside the innermost open one.
+
+        Args:
+            name (str): The name of the scope.
+            cell_type (int | None): The CellType code of the cells processed.
+            cells (int): The number of cells processed.
+        """
+        if not self.enabled:
+            return
+        stack = self._stack
+        if stack:
+            parent = stack[-1]
+            parent[4] = True
+            path = f"{parent[0]};{name}"
+        else:
+            path = name
+        stack.append([path, cell_type, cells, time.perf_counter(), False])
+
+    def end(self, cells: int | None = None) -> None:
+        """
+        Close the innermost scope and record its time.
+
+        Args:
+            cells (int | None): The number of cells processed, if only known at
+                the end of the scope.
+        """
+        if not self._stack:
+            return
+        path, cell_type, begun, start, nested = self._stack.pop()
+        if cells is None:
+            cells = begun
+        elapsed = time.perf_counter() - start
+        self.times[path] = self.times.get(path, 0.0) + elapsed
+        self.calls[path] = self.calls.get(path, 0) + 1
+        # Scopes containing others, such as phases, count towards no cell type
+        if cell_type is None and nested:
+            return
+        key = _TYPE_NAMES[cell_type]
+        totals = self.by_type.get(key)
+        if totals is None:
+            totals = self.by_type[key] = [0.0, 0, 0]
+        totals[0] += elapsed
+        totals[1] += 1
+        totals[2] += cells
+
+    @contextmanager
+    def scope(self, name: str, cell_type: int | None = None, cells: int = 0):
+        """
+        Time a block as a scope, see begin.
+        """
+        self.begin(name, cell_type, cells)
+        try:
+            yield
+        finally:
+            self.end()
+
+    def end_tick(self) -> None:
+        """
+        Count a tick, the unit of the report.
+        """
+        if self.enabled:
+            self.ticks += 1
+
+    def start_sampling(
+        self, interval: float = DEFAULT_SAMPLE_INTERVAL, thread_id: int | None = None
+    ) -> None:
+        """
+        Sample the Python call stack of a thread every `interval` seconds from a
+        daemon thread, until stop_sampling.
+
+        Args:
+            interval (float): The number of seconds between two samples.
+            thread_id (int | None): The identifier of the thread to sample; the
+                calling thread if omitted.
+        """
+        self.stop_sampling()
+        target = thread_id if thread_id is not None else threading.get_ident()
+        self._sampling.clear()
+        self._sampler = threading.Thread(
+            target=self._sample, args=(target, interval), name="sampler", daemon=True
+        )
+        self._sampler.start()
+
+    def stop_sampling(self) -> None:
+        """
+        Stop sampling the call stack.
+        """
+        if self._sampler is not None:
+            self._sampling.set()
+            self._sampler.join()
+            self._sampler = None
+
+    def _sample(self, target: int, interval: float) -> None:
+        while not self._sampling.wait(interval):
+            frame = sys._current_frames().get(target)
+            if frame is None:
+                return
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                module = frame.f_globals.get("__name__", "?")
+                name = getattr(code, "co_qualname", code.co_name)  # Python 3.11+
+                frames.append(f"{module}.{name}")
+                frame = frame.f_back
+            stack = ";".join(reversed(frames))
+            self.samples[stack] = self.samples.get(stack, 0) + 1
+
+    def collapsed(self, samples: bool = False) -> str:
+        """
+        Return the timed scopes, or the sampled stacks, in the collapsed stack
+        format.
+
+        Args:
+            samples (bool): Return the sampled stacks instead of the scopes.
+
+        Returns:
+            str: One "frame;frame;... count" line per stack.
+        """
+        if samples:
+            counts = dict(self.samples)  # The sampler thread may add stacks
+        else:
+            # The count of a scope is its own time, without its children's
+            counts = dict(self.times)
+            for path, seconds in self.times.items():
+                parent = path.rpartition(";")[0]
+                if parent in counts:
+                    counts[parent] -= seconds
+            counts = {
+                path: round(max(seconds, 0.0) * 1e6) for path, seconds in counts.items()
+            }
+        return "".join(f"{stack} {count}\n" for stack, count in counts.items())
+
+    def write_collapsed(self, path: str, samples: bool = False) -> None:
+        """
+        Write the output of collapsed to a file, e.g. for flamegraph.pl.
+
+        Args:
+            path (str): The path of the file.
+            samples (bool): Write the sampled stacks instead of the scopes.
+        """
+        with open(path, "w") as file:
+            file.write(self.collapsed(samples))
+
+    def report(self) -> dict:
+        """
+        Summarize the time spent per tick, by scope and by cell type.
+
+        Returns:
+            dict: The number of "ticks", then for each scope path in "scopes"
+                and each cell type in "cell_types", the "ms_per_tick" and
+                "calls_per_tick"; cell types also give the "cells_per_tick" and
+                "ns_per_cell" of their batches, slowest first. Scopes without a
+                cell type that contain no other scope count as ANY_TYPE.
+        """
+        ticks = max(self.ticks, 1)
+        scopes = {
+            path: {
+                "ms_per_tick": seconds / ticks * 1e3,
+                "calls_per_tick": self.calls[path] / ticks,
+            }
+            for path, seconds in self.times.items()
+        }
+        by_time = sorted(self.by_type.items(), key=lambda item: -item[1][0])
+        cell_types = {
+            key: {
+                "ms_per_tick": seconds / ticks * 1e3,
+                "calls_per_tick": calls / ticks,
+                "cells_per_tick": cells / ticks,
+                "ns_per_cell": seconds / cells * 1e9 if cells else 0.0,
+            }
+            for key, (seconds, calls, cells) in by_time
+        }
+        return {"ticks": self.ticks, "scopes": scopes, "cell_types": cell_types}
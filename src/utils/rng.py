@@ -0,0 +1,137 @@
+# src/utils/rng.py
+
+import zlib
+
+import numpy as np
+
+
+class RandomService:
+    """
+    The RandomService hands out independent, reproducible NumPy random streams.
+
+    Every stream is identified by a subsystem name and optional integer keys, e.g.
+    ("sector", 12) or ("mutation",). Its SeedSequence is derived from the root seed
+    and that identity only, never from the order in which streams are requested, so
+    each stream yields the same numbers whichever process or worker draws from it.
+    """
+
+    def __init__(self, seed: int | None = None):
+        """
+        Initialize the service.
+
+        Args:
+            seed (int | None): The root seed; fresh OS entropy is used if omitted,
+                and can be read back from `seed` to replay the run.
+        """
+        self.seed = np.random.SeedSequence(seed).entropy
+        self._streams: dict[tuple, np.random.Generator] = {}
+
+    def seed_sequence(self, subsystem: str, *key: int) -> np.random.SeedSequence:
+        """
+        Return the SeedSequence of a stream, e.g. to seed a worker process.
+
+        Args:
+            subsystem (str): The name of the subsystem.
+            *key (int): Further integer keys, such as a sector index.
+
+        Returns:
+            np.random.SeedSequence: The seed sequence of the stream.
+        """
+        # crc32 is stable across processes, unlike hash() of a str
+        spawn_key = (zlib.crc32(subsystem.encode()), *key)
+        return np.random.SeedSequence(self.seed, spawn_key=spawn_key)
+
+    def stream(self, subsystem: str, *key: int) -> np.random.Generator:
+        """
+        Return the random stream of a subsystem, creating it on first use.
+
+        Args:
+            subsystem (str): The name of the subsystem.
+            *key (int): Further integer keys, such as a sector index.
+
+        Returns:
+            np.random.Generator: The generator of the stream.
+        """
+        identity = (subsystem, *key)
+        generator = self._streams.get(identity)
+        if generator is None:
+            generator = np.random.Generator(
+                np.random.PCG64(self.seed_sequence(subsystem, *key))
+            )
+            self._streams[identity] = generator
+        return generator
+
+    def get_state(self) -> list:
+        """
+        Return the state of every stream created so far, e.g. to checkpoint it.
+
+        Returns:
+            list: A [subsystem, keys, bit generator state] entry per stream.
+        """
+        return [
+            [
+                identity[0],
+                [int(key) for key in identity[1:]],
+                generator.bit_generator.state,
+            ]
+            for identity, generator in self._streams.items()
+        ]
+
+    def set_state(self, state: list) -> None:
+        """
+        Restore the state of streams, as returned by get_state.
+
+        Args:
+            state (list): A [subsystem, keys, bit generator state] entry per stream.
+        """
+        for subsystem, key, bit_generator_state in state:
+            self.stream(subsystem, *key).bit_generator.state = bit_generator_state
+
+    def bernoulli(
+        self, shape, probability: float, subsystem: str, *key: int
+    ) -> np.ndarray:
+        """
+        Draw a boolean mask in one call, e.g. the mutation mask of every gene of
+        every genome reproducing in a tick.
+
+        Args:
+            shape: The shape of the mask.
+            probability (float): The probability of each element being True.
+            subsystem (str): The name of the subsystem.
+            *key (int): Further integer keys.
+
+        Returns:
+            np.ndarray: The boolean mask.
+        """
+        return self.stream(subsystem, *key).random(shape) < probability
+
+
+_default_service: RandomService | None = None
+
+
+def default_service() -> RandomService:
+    """
+    Return the process-wide service used when no generator is passed explicitly.
+
+    Returns:
+        RandomService: The default service, unseeded unless seed_default was called.
+    """
+    global _default_service
+    if _default_service is None:
+        _default_service = RandomService()
+    return _default_service
+
+
+def seed_default(seed: int | None) -> RandomService:
+    """
+    Replace the default service with a newly seeded one.
+
+    Args:
+        seed (int | None): The root seed.
+
+    Returns:
+        RandomService: The new default service.
+    """
+    global _default_service
+    _default_service = RandomService(seed)
+    return _default_service